@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+HTTP API Encodings
+Content negotiation between the verbose JSON documents, MessagePack and a
+compact self-describing binary column table, plus the `fields=` selector.
+
+Binary tables (media type application/vnd.engine-sim.table) are little
+endian: a header of magic b'EST1', row count (uint32), column count
+(uint16), reserved (uint16) and the data timestamp (float64, UNIX seconds);
+then per column a NumPy type character (1 byte), a name length (1 byte) and
+the ASCII name; then every column's values back to back. A client decodes a
+whole table with one np.frombuffer per column (see decode_table), no matter
+how many engines or samples it holds.
+"""
+
+import struct
+
+import numpy as np
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+BINARY = 'binary'
+
+CONTENT_TYPES = {
+    JSON: 'application/json',
+    MSGPACK: 'application/msgpack',
+    BINARY: 'application/vnd.engine-sim.table',
+}
+# Accept header media types -> format, in preference order for equal quality
+_MEDIA_TYPES = {
+    'application/vnd.engine-sim.table': BINARY,
+    'application/octet-stream': BINARY,
+    'application/msgpack': MSGPACK,
+    'application/x-msgpack': MSGPACK,
+    'application/json': JSON,
+}
+
+# Engine values by wire type, the API's column order
+ENGINE_FIELDS = ('status', 'rpm', 'temp', 'fuel_flow', 'load')
+ENGINE_DTYPES = {'status': '<u2', 'rpm': '<f4', 'temp': '<f4', 'fuel_flow': '<f4', 'load': '<f4'}
+
+_MAGIC = b'EST1'
+_HEADER = struct.Struct('<4sIHHd')
+_COLUMN = struct.Struct('<cB')
+
+# msgpack, imported by the first MessagePack response so the API loads without it
+_msgpack = None
+
+
+def _import_msgpack():
+    """The msgpack module, None when the optional dependency isn't installed"""
+    global _msgpack
+    if _msgpack is None:
+        try:
+            import msgpack as _msgpack
+        except ImportError:
+            return None
+    return _msgpack
+
+
+def negotiate(query, accept):
+    """Response format from ?format= or the Accept header, None if nothing acceptable is available
+
+    ?format= wins over Accept. An explicit MessagePack request without msgpack
+    installed is not acceptable, an Accept list falls back to its next choice.
+    """
+    if not query and accept in (None, '', '*/*', 'application/json'):
+        # Plain polling clients, skip parsing
+        return JSON
+    if 'format' in query:
+        fmt = query['format'][0]
+        if fmt not in CONTENT_TYPES or (fmt == MSGPACK and _import_msgpack() is None):
+            return None
+        return fmt
+
+    choices = []
+    for position, item in enumerate((accept or '').split(',')):
+        media_type, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.strip().lower()
+        if media_type in ('*/*', 'application/*', ''):
+            choices.append((-quality, position, JSON))
+        elif media_type in _MEDIA_TYPES and quality > 0:
+            choices.append((-quality, position, _MEDIA_TYPES[media_type]))
+    if not choices:
+        return JSON
+    for _, _, fmt in sorted(choices):
+        if fmt != MSGPACK or _import_msgpack() is not None:
+            return fmt
+    return None
+
+
+def select_fields(query, available):
+    """Tuple of the ?fields= names in `available` order, all of them by default, ValueError on unknown names"""
+    if 'fields' not in query:
+        return tuple(available)
+    names = {name.strip() for value in query['fields'] for name in value.split(',') if name.strip()}
+    unknown = names.difference(available)
+    if unknown:
+        raise ValueError(f"unknown fields {', '.join(sorted(unknown))}, expected {', '.join(available)}")
+    return tuple(name for name in available if name in names)
+
+
+def encode_table(columns, timestamp):
+    """Binary column table of equally long NumPy arrays, {name: array} in column order"""
+    rows = len(next(iter(columns.values()))) if columns else 0
+    parts = [_HEADER.pack(_MAGIC, rows, len(columns), 0, timestamp)]
+    for name, values in columns.items():
+        encoded = name.encode('ascii')
+        parts.append(_COLUMN.pack(values.dtype.char.encode('ascii'), len(encoded)))
+        parts.append(encoded)
+    for values in columns.values():
+        parts.append(np.ascontiguousarray(values, dtype=values.dtype.newbyteorder('<')).tobytes())
+    return b''.join(parts)
+
+
+def decode_table(body):
+    """Inverse of encode_table: (timestamp, {name: array})"""
+    magic, rows, count, _, timestamp = _HEADER.unpack_from(body)
+    if magic != _MAGIC:
+        raise ValueError("not an engine-sim binary table")
+    offset = _HEADER.size
+    layout = []
+    for _ in range(count):
+        char, length = _COLUMN.unpack_from(body, offset)
+        offset += _COLUMN.size
+        name = body[offset:offset + length].decode('ascii')
+        layout.append((name, np.dtype(char.decode('ascii')).newbyteorder('<')))
+        offset += length
+    columns = {}
+    for name, dtype in layout:
+        columns[name] = np.frombuffer(body, dtype=dtype, count=rows, offset=offset)
+        offset += rows * dtype.itemsize
+    return timestamp, columns
+
+
+def encode_msgpack(document):
+    """MessagePack body for a JSON-compatible document"""
+    return _import_msgpack().packb(document, use_bin_type=True)
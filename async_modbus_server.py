@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Asyncio MODBUS TCP Server
+Drop-in alternative to pyModbusTCP's thread-per-connection ModbusServer. One
+event loop thread serves every connection, so idle SCADA clients cost a few
+kilobytes instead of a thread each. Transactions pipelined by a client are
+decoded from the receive buffer in one pass and their responses written back
+in order with a single send, each ADU packed by one precompiled struct.
+
+Requests go through the same pyModbusTCP DataHandler interface as the
+threaded server, so data handler hooks, unit routing and responses
+(including exception codes) stay identical. Function codes 3, 4, 6 and 16
+are decoded here, the rarer ones are handed to pyModbusTCP's own request
+engine.
+"""
+
+import asyncio
+import struct
+import threading
+from functools import lru_cache
+
+from pyModbusTCP.constants import EXP_DATA_VALUE
+from pyModbusTCP.server import DataBank, DataHandler, ModbusServer
+
+from engine_logging import get_logger
+
+logger = get_logger('modbus')
+
+READ_HOLDING_REGISTERS = 0x03
+READ_INPUT_REGISTERS = 0x04
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+_MBAP_HEADER = struct.Struct('>HHHB')
+_REQUEST = struct.Struct('>BHH')            # function code, address, quantity/value
+_WRITE_MULTIPLE = struct.Struct('>BHHB')    # function code, address, quantity, byte count
+_ECHO_RESPONSE = struct.Struct('>HHHBBHH')  # MBAP + function code, address, quantity/value
+_EXCEPT_RESPONSE = struct.Struct('>HHHBBB')  # MBAP + function code | 0x80, exception code
+
+# Stop reading from a client whose responses pile up unsent beyond this
+_WRITE_HIGH_WATER = 256 * 1024
+
+
+@lru_cache(maxsize=None)
+def _words_response(count):
+    """MBAP + function code, byte count and `count` registers in one struct"""
+    return struct.Struct(f'>HHHBBB{count}H')
+
+
+@lru_cache(maxsize=None)
+def _words_request(count):
+    return struct.Struct(f'>{count}H')
+
+
+class ClientInfo:
+    __slots__ = ('address', 'port')
+
+    def __init__(self, address, port):
+        self.address = address
+        self.port = port
+
+    def __repr__(self):
+        return f'ClientInfo(address={self.address!r}, port={self.port!r})'
+
+
+class _MBAP:
+    __slots__ = ('transaction_id', 'protocol_id', 'length', 'unit_id')
+
+    def __init__(self, transaction_id, protocol_id, length, unit_id):
+        self.transaction_id = transaction_id
+        self.protocol_id = protocol_id
+        self.length = length
+        self.unit_id = unit_id
+
+
+class _PDU:
+    __slots__ = ('func_code', 'raw')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.func_code = raw[0]
+
+
+class _Frame:
+    __slots__ = ('mbap', 'pdu')
+
+    def __init__(self, mbap, pdu):
+        self.mbap = mbap
+        self.pdu = pdu
+
+
+class ServerInfo:
+    """Same attributes the pyModbusTCP server passes to data handlers as srv_info"""
+    __slots__ = ('client', 'recv_frame')
+
+    def __init__(self, client, recv_frame):
+        self.client = client
+        self.recv_frame = recv_frame
+
+
+class _ModbusProtocol(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.data_hdl = server.data_hdl
+        self.transport = None
+        self.client = None
+        self._buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=_WRITE_HIGH_WATER)
+        peer = transport.get_extra_info('peername') or ('', 0)
+        self.client = ClientInfo(peer[0], peer[1])
+        self.server._connections.add(self)
+
+    def connection_lost(self, exc):
+        self.server._connections.discard(self)
+
+    def pause_writing(self):
+        # Client isn't reading its responses, stop accepting requests from it
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        buffer = self._buffer
+        buffer += data
+        responses = []
+        position = 0
+        size = len(buffer)
+        try:
+            # Every complete ADU in the buffer, a pipelining client may send many per segment
+            while size - position >= 7:
+                transaction_id, protocol_id, length, unit_id = _MBAP_HEADER.unpack_from(buffer, position)
+                if protocol_id != 0 or not 2 < length < 256:
+                    raise ValueError('bad MBAP header')
+                end = position + 6 + length
+                if end > size:
+                    break
+                mbap = _MBAP(transaction_id, protocol_id, length, unit_id)
+                responses.append(self._process(mbap, bytes(buffer[position + 7:end])))
+                position = end
+        except (ValueError, struct.error, ModbusServer.Error) as e:
+            # Malformed frame: drop the connection like the threaded server does
+            logger.debug(f"Closing MODBUS connection from {self.client.address}: {e}", extra={'event': 'modbus'})
+            self.transport.write(b''.join(responses))
+            self.transport.close()
+            buffer.clear()
+            return
+        del buffer[:position]
+        if responses:
+            self.transport.write(b''.join(responses))
+
+    def _process(self, mbap, pdu):
+        """Response ADU for one request"""
+        func_code = pdu[0]
+        srv_info = ServerInfo(self.client, _Frame(mbap, _PDU(pdu)))
+        hdl = self.data_hdl
+        tid = mbap.transaction_id
+        unit_id = mbap.unit_id
+
+        if func_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            _, address, quantity = _REQUEST.unpack_from(pdu)
+            if not 0x0001 <= quantity <= 0x007D:
+                return _EXCEPT_RESPONSE.pack(tid, 0, 3, unit_id, func_code | 0x80, EXP_DATA_VALUE)
+            if func_code == READ_HOLDING_REGISTERS:
+                ret = hdl.read_h_regs(address, quantity, srv_info)
+            else:
+                ret = hdl.read_i_regs(address, quantity, srv_info)
+            if not ret.ok:
+                return _EXCEPT_RESPONSE.pack(tid, 0, 3, unit_id, func_code | 0x80, ret.exp_code)
+            words = ret.data
+            return _words_response(len(words)).pack(tid, 0, 3 + quantity * 2, unit_id, func_code,
+                                                    quantity * 2, *words)
+
+        if func_code == WRITE_SINGLE_REGISTER:
+            _, address, value = _REQUEST.unpack_from(pdu)
+            ret = hdl.write_h_regs(address, [value], srv_info)
+            if not ret.ok:
+                return _EXCEPT_RESPONSE.pack(tid, 0, 3, unit_id, func_code | 0x80, ret.exp_code)
+            return _ECHO_RESPONSE.pack(tid, 0, 6, unit_id, func_code, address, value)
+
+        if func_code == WRITE_MULTIPLE_REGISTERS:
+            _, address, quantity, byte_count = _WRITE_MULTIPLE.unpack_from(pdu)
+            if not (0x0001 <= quantity <= 0x007B and byte_count == quantity * 2 and len(pdu) - 6 >= byte_count):
+                return _EXCEPT_RESPONSE.pack(tid, 0, 3, unit_id, func_code | 0x80, EXP_DATA_VALUE)
+            words = list(_words_request(quantity).unpack_from(pdu, 6))
+            ret = hdl.write_h_regs(address, words, srv_info)
+            if not ret.ok:
+                return _EXCEPT_RESPONSE.pack(tid, 0, 3, unit_id, func_code | 0x80, ret.exp_code)
+            return _ECHO_RESPONSE.pack(tid, 0, 6, unit_id, func_code, address, quantity)
+
+        return self.server.fallback_engine(mbap, pdu, self.client)
+
+
+class AsyncModbusServer:
+    def __init__(self, host='localhost', port=502, data_bank=None, data_hdl=None, reuse_port=False, backlog=4096):
+        """Same construction as pyModbusTCP's ModbusServer (always non-blocking)
+
+        reuse_port binds with SO_REUSEPORT so several processes can share the port.
+        """
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port
+        self.backlog = backlog
+        self.data_bank = data_hdl.data_bank if data_hdl else data_bank or DataBank()
+        self.data_hdl = data_hdl or DataHandler(data_bank=self.data_bank)
+
+        # Never started, only its request engine is used for the uncommon function codes
+        self._fallback = ModbusServer(host, port, no_block=True, data_hdl=self.data_hdl)
+
+        self._connections = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+        self._start_error = None
+
+    @property
+    def is_run(self):
+        return self._server is not None and self._server.is_serving()
+
+    @property
+    def connections(self):
+        """Number of open client connections"""
+        return len(self._connections)
+
+    def fallback_engine(self, mbap, pdu, client):
+        """Response ADU from pyModbusTCP's request engine, raises ModbusServer.Error on a malformed PDU"""
+        session_data = ModbusServer.SessionData()
+        session_data.client.address, session_data.client.port = client.address, client.port
+        session_data.request.mbap.transaction_id = mbap.transaction_id
+        session_data.request.mbap.length = mbap.length
+        session_data.request.mbap.unit_id = mbap.unit_id
+        session_data.request.pdu.raw = pdu
+        session_data.set_response_mbap()
+        self._fallback._engine(session_data)
+        return session_data.response.raw
+
+    def start(self):
+        """Bind and serve from a background event loop thread, raises OSError if the port can't be bound"""
+        if self.is_run:
+            return
+        self._started.clear()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._run, name='modbus-asyncio', daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error:
+            raise self._start_error
+
+    def stop(self):
+        """Close the listener and every client connection"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(loop.create_server(
+                lambda: _ModbusProtocol(self), self.host or None, self.port,
+                reuse_address=True, reuse_port=self.reuse_port or None, backlog=self.backlog
+            ))
+        except OSError as e:
+            self._start_error = e
+            self._started.set()
+            loop.close()
+            self._loop = None
+            return
+
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for protocol in list(self._connections):
+                protocol.transport.abort()
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+            self._server = None
+            self._loop = None
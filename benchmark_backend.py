@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the simulator hot paths
+Starts StandaloneEngineSimulator on loopback with unprivileged ports and measures
+tick cost, MODBUS read throughput/latency, HTTP API throughput/latency and memory
+growth. Results are written as JSON and can be compared against a baseline run.
+"""
+
+import argparse
+import contextlib
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from pyModbusTCP.client import ModbusClient
+
+from engine_logging import get_logger
+from standalone_backend import StandaloneEngineSimulator
+
+# Metric name -> True when higher is better
+METRIC_DIRECTIONS = {
+    'startup.ready_ms': False,
+    'tick.mean_us': False,
+    'tick.p99_us': False,
+    'fleet_tick.mean_us': False,
+    'fleet_tick.p99_us': False,
+    'modbus.reads_per_s': True,
+    'modbus.p50_ms': False,
+    'modbus.p99_ms': False,
+    'http.requests_per_s': True,
+    'http.p50_ms': False,
+    'http.p99_ms': False,
+    'memory.growth_kib': False,
+}
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence simulator console output so printing doesn't pollute timings"""
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            yield
+
+
+def bench_tick(simulator, ticks):
+    """Cost of one engine update + register commit"""
+    simulator._running = True
+    samples = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        simulator._calculate_engine_parameters()
+        simulator._update_modbus_registers()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'ticks': ticks,
+        'mean_us': round(sum(samples) / len(samples) * 1e6, 3),
+        'p50_us': round(percentile(samples, 0.50) * 1e6, 3),
+        'p99_us': round(percentile(samples, 0.99) * 1e6, 3),
+    }
+
+
+def bench_fleet_tick(simulator, ticks):
+    """Cost of one batched fleet step + register block commit"""
+    simulator.fleet.start()
+    samples = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        simulator._update_fleet()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'engines': simulator.fleet.size,
+        'ticks': ticks,
+        'mean_us': round(sum(samples) / len(samples) * 1e6, 3),
+        'p50_us': round(percentile(samples, 0.50) * 1e6, 3),
+        'p99_us': round(percentile(samples, 0.99) * 1e6, 3),
+    }
+
+
+def bench_modbus(host, port, duration, count):
+    """Holding register block reads over one persistent connection"""
+    client = ModbusClient(host=host, port=port, auto_open=True, auto_close=False, timeout=5)
+    if not client.open():
+        return {'error': f'could not connect to {host}:{port}'}
+
+    samples = []
+    failures = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        result = client.read_holding_registers(0, count)
+        elapsed = time.perf_counter() - start
+        if result is None:
+            failures += 1
+        else:
+            samples.append(elapsed)
+    client.close()
+
+    samples.sort()
+    return {
+        'registers_per_read': count,
+        'reads': len(samples),
+        'failures': failures,
+        'reads_per_s': round(len(samples) / duration, 1),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 4) if samples else None,
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 4) if samples else None,
+    }
+
+
+def bench_http(host, port, duration, path='/api/engine'):
+    """GET requests over one keep-alive connection"""
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    samples = []
+    failures = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+        elapsed = time.perf_counter() - start
+        if ok:
+            samples.append(elapsed)
+        else:
+            failures += 1
+    conn.close()
+
+    samples.sort()
+    return {
+        'path': path,
+        'requests': len(samples),
+        'failures': failures,
+        'requests_per_s': round(len(samples) / duration, 1),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 4) if samples else None,
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 4) if samples else None,
+    }
+
+
+def bench_memory(simulator, ticks):
+    """Python heap growth over N full simulation ticks"""
+    simulator._running = True
+    # Warm up so one-time allocations don't count as growth
+    for _ in range(100):
+        simulator._simulation_tick()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(ticks):
+        simulator._simulation_tick()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'ticks': ticks,
+        'growth_kib': round((after - before) / 1024, 2),
+        'peak_kib': round(peak / 1024, 2),
+    }
+
+
+def flatten(results):
+    """Pick the comparable metrics out of a results document"""
+    flat = {}
+    for name in METRIC_DIRECTIONS:
+        section, metric = name.split('.')
+        value = results.get(section, {}).get(metric)
+        if isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Return the metrics that regressed by more than tolerance (fraction) vs baseline"""
+    current = flatten(results)
+    previous = flatten(baseline.get('results', baseline))
+    regressions = []
+    for name, value in current.items():
+        if name not in previous or not previous[name]:
+            continue
+        old = previous[name]
+        higher_is_better = METRIC_DIRECTIONS[name]
+        change = (value - old) / abs(old)
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        if regressed:
+            regressions.append({'metric': name, 'baseline': old, 'current': value,
+                                'change_pct': round(change * 100, 1)})
+    return regressions
+
+
+def run(args):
+    """Start the simulator on loopback and run every benchmark"""
+    with quiet():
+        startup_start = time.perf_counter()
+        simulator = StandaloneEngineSimulator(
+            config_file=args.config,
+            host='127.0.0.1',
+            port=args.modbus_port,
+            fleet_size=args.fleet or None
+        )
+        # Per-tick records would be rate limited anyway, only keep errors out of the JSON report
+        get_logger().setLevel(logging.ERROR)
+        if not simulator.start_server():
+            raise RuntimeError(f"could not start MODBUS server on 127.0.0.1:{args.modbus_port}")
+        if not simulator.start_http_server(args.http_port, host='127.0.0.1'):
+            raise RuntimeError(f"could not start HTTP server on port {args.http_port}")
+        simulator.mark_ready()
+
+    # Constructor to both listeners accepting connections, as /readyz reports it
+    results = {'startup': {'ready_ms': round((time.perf_counter() - startup_start) * 1000, 2)}}
+    try:
+        with quiet():
+            # Tick benchmarks drive the simulator directly, so the loop thread isn't running yet
+            results['tick'] = bench_tick(simulator, args.ticks)
+            if simulator.fleet:
+                results['fleet_tick'] = bench_fleet_tick(simulator, args.ticks)
+            results['memory'] = bench_memory(simulator, args.memory_ticks)
+
+            # Network benchmarks run against a live simulation
+            simulator.start_simulation()
+            results['modbus'] = bench_modbus('127.0.0.1', args.modbus_port, args.duration,
+                                             len(simulator._register_words))
+            results['http'] = bench_http('127.0.0.1', args.http_port, args.duration)
+    finally:
+        with quiet():
+            simulator.shutdown()
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fleet_engines': args.fleet,
+            'duration_s': args.duration,
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the engine simulator hot paths')
+    parser.add_argument('--config', help='Simulator configuration file (default: config_linux.yaml)')
+    parser.add_argument('--modbus-port', type=int, default=15020, help='Loopback MODBUS port (default: 15020)')
+    parser.add_argument('--http-port', type=int, default=18080, help='Loopback HTTP port (default: 18080)')
+    parser.add_argument('--ticks', type=int, default=10000, help='Ticks for the tick cost benchmark')
+    parser.add_argument('--memory-ticks', type=int, default=5000, help='Ticks for the memory growth benchmark')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per network benchmark')
+    parser.add_argument('--fleet', type=int, default=0, help='Also benchmark a fleet of N engines')
+    parser.add_argument('--output', help='Write the JSON results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous JSON results file')
+    parser.add_argument('--tolerance', type=float, default=0.20,
+                        help='Allowed relative regression vs baseline (default: 0.20)')
+
+    args = parser.parse_args()
+
+    report = run(args)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(report['results'], baseline, args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+    if report.get('regressions'):
+        print(f"\n✗ {len(report['regressions'])} metric(s) regressed more than "
+              f"{args.tolerance:.0%} vs baseline", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
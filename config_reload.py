@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Configuration File Watcher
+Polls the simulator's YAML config for changes (modification time and size)
+from a background thread and hands every successfully parsed new version to
+a callback. trigger() forces a reload, e.g. from a SIGHUP handler. A file
+caught mid-write fails to parse and is retried on its next change, the
+running configuration stays in place until then.
+"""
+
+import os
+import threading
+
+import yaml
+
+from engine_logging import get_logger
+
+logger = get_logger('config')
+
+
+def load_config(path):
+    """Parsed config mapping from a YAML file, ValueError if it isn't a mapping"""
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} does not contain a configuration mapping")
+    return config
+
+
+class ConfigWatcher:
+    def __init__(self, path, on_change, interval=1.0):
+        """Call on_change(config) whenever the file at path changes
+
+        interval is the polling period in seconds, None only reloads on trigger().
+        """
+        self.path = str(path)
+        self.on_change = on_change
+        self.interval = interval
+        self._stamp = self._file_stamp()
+        self._wake = threading.Event()
+        self._forced = False
+        self._running = False
+        self._thread = None
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def trigger(self):
+        """Reload on the watcher thread right away, safe to call from a signal handler"""
+        self._forced = True
+        self._wake.set()
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._running:
+                return
+
+            stamp = self._file_stamp()
+            forced, self._forced = self._forced, False
+            if stamp is None or (stamp == self._stamp and not forced):
+                continue
+            self._stamp = stamp
+
+            try:
+                config = load_config(self.path)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                logger.error(f"Config reload skipped, cannot read {self.path}: {e}", extra={'event': 'config'})
+                continue
+            try:
+                self.on_change(config)
+            except Exception as e:
+                logger.error(f"Config reload failed: {e}", extra={'event': 'config'})
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Vectorized Engine Fleet Simulation
+Models many engines at once with NumPy arrays so a whole vessel fleet
+advances in one batched step per simulation tick
+"""
+
+import numpy as np
+
+# Engine state signals in the order register_block passes them to the register packer
+SIGNALS = ('status', 'rpm', 'temp', 'fuel_flow', 'load')
+
+
+class EngineFleet:
+    def __init__(self, engine_config, registers, size=100, base_register=100, register_stride=8,
+                 seed=None, model=None):
+        """Initialize fleet state arrays and the per-engine register block layout
+
+        registers is the compiled holding register packer (register_schema.RegisterBlock)
+        of the main engine, each engine's block is laid out the same way. model, if
+        given, is an engine_physics.EnginePhysics sized for the fleet that replaces
+        the setpoint model in step().
+        """
+        self.engine_config = engine_config
+        self.size = int(size)
+        self.base_register = int(base_register)
+        self.register_stride = int(register_stride)
+        self.model = model
+
+        # Each engine gets its own block of registers laid out like the single engine map
+        self.check_registers(registers)
+        self.registers = registers
+        if self.size < 1:
+            raise ValueError("Fleet must contain at least one engine")
+        if self.base_register + self.size * self.register_stride > 0x10000:
+            raise ValueError(
+                f"Fleet of {self.size} engines with stride {self.register_stride} "
+                f"does not fit in the register space from {self.base_register}"
+            )
+
+        self._rng = np.random.default_rng(seed)
+
+        # Engine state variables (one element per engine)
+        self.running = np.zeros(self.size, dtype=bool)
+        self.rpm = np.zeros(self.size, dtype=np.float64)
+        self.temp = np.full(self.size, float(engine_config['temp_min']), dtype=np.float64)
+        self.fuel_flow = np.zeros(self.size, dtype=np.float64)
+        self.load = np.zeros(self.size, dtype=np.float64)
+        self.status = np.zeros(self.size, dtype=np.uint16)
+
+        # Pre-allocated register image, one row per engine
+        self._block = np.zeros((self.size, self.register_stride), dtype=np.uint16)
+        self._signals = None  # Signal matrix register_block fills, sized on first use
+
+    def check_registers(self, registers):
+        """ValueError unless a register packer's block fits in register_stride"""
+        if registers.base + registers.span > self.register_stride:
+            raise ValueError(
+                f"register_stride {self.register_stride} is too small for the register map "
+                f"(registers {registers.base}-{registers.base + registers.span - 1})"
+            )
+
+    def set_registers(self, registers):
+        """Lay every engine's block out with a new register packer"""
+        self.check_registers(registers)
+        self.registers = registers
+        self._block[:] = 0
+
+    @property
+    def register_count(self):
+        """Total number of registers covered by the fleet"""
+        return self.size * self.register_stride
+
+    def engine_base(self, index):
+        """First register address of an engine's block"""
+        return self.base_register + index * self.register_stride
+
+    def start(self, index=None):
+        """Start one engine, or every engine when index is None"""
+        if index is None:
+            self.running[:] = True
+        else:
+            self.running[index] = True
+
+    def stop(self, index=None):
+        """Stop one engine, or every engine when index is None"""
+        if index is None:
+            self.running[:] = False
+        else:
+            self.running[index] = False
+
+    def emergency_stop(self, indices):
+        """Reset the given engines to safe values immediately"""
+        self.running[indices] = False
+        self.status[indices] = 0
+        self.rpm[indices] = 0
+        self.temp[indices] = self.engine_config['temp_min']
+        self.fuel_flow[indices] = 0
+        self.load[indices] = 0
+
+    def step(self):
+        """Advance every engine by one tick in a single batched update
+
+        Engines are updated in place, only the stopped or running ones draw
+        noise, and each field takes one draw whichever branch an engine is in.
+        """
+        cfg = self.engine_config
+        if self.model:
+            self.model.step(cfg['update_interval'], self.running, self.rpm, self.temp, self.fuel_flow,
+                            self.load, self.status)
+            return
+        rng = self._rng
+        running = self.running
+
+        # Engine is stopping/stopped - gradually decrease parameters
+        stopped = np.flatnonzero(~running)
+        if len(stopped):
+            n = len(stopped)
+            rpm = np.maximum(0, self.rpm[stopped] - rng.uniform(50, 100, n))
+            self.fuel_flow[stopped] = np.maximum(0, self.fuel_flow[stopped] - rng.uniform(0.1, 0.2, n))
+            self.temp[stopped] = np.maximum(cfg['temp_min'], self.temp[stopped] - rng.uniform(1, 2, n))
+            self.load[stopped] = np.maximum(0, self.load[stopped] - rng.uniform(5, 10, n))
+            self.rpm[stopped] = rpm
+
+            # When engine fully stops
+            halted = stopped[rpm < 10]
+            self.rpm[halted] = 0
+            self.fuel_flow[halted] = 0
+            self.load[halted] = 0
+            self.status[halted] = 0
+
+        # Engine is running - calculate operating parameters (a slice when all run, no gather copies)
+        engines = slice(None) if running.all() else np.flatnonzero(running)
+        rpm = self.rpm[engines]
+        n = len(rpm)
+        if not n:
+            return
+        noise = rng.random((4, n))
+
+        target_rpm = cfg['rpm_normal']
+        rpm = np.where(
+            rpm < target_rpm,
+            np.minimum(target_rpm, rpm + (80 + 70 * noise[0])),
+            np.clip(target_rpm - 30 + 60 * noise[0], cfg['rpm_min'], cfg['rpm_max'])
+        )
+
+        # Temperature calculation
+        target_temp = cfg['temp_normal']
+        temp = self.temp[engines]
+        temp = np.where(
+            temp < target_temp,
+            np.minimum(target_temp, temp + (1 + 2 * noise[1])),
+            np.clip(target_temp - 2 + 4 * noise[1], cfg['temp_min'], cfg['temp_max'])
+        )
+
+        # Fuel flow calculation (proportional to RPM)
+        rpm_ratio = rpm / cfg['rpm_max']
+        fuel_flow = rpm_ratio * cfg['fuel_flow_normal'] - 0.2 + 0.4 * noise[2]
+        np.maximum(fuel_flow, 0, out=fuel_flow)
+
+        # Load calculation, whole percent plus -5..5
+        load = np.trunc(rpm_ratio * 100)
+        load += np.floor(noise[3] * 11) - 5
+        np.clip(load, 0, 100, out=load)
+
+        # Status calculation based on temperature: 1 normal, 2 warning, 3 alarm
+        status = (temp > cfg['temp_max'] * 0.85).astype(np.uint16)
+        status += temp > cfg['temp_max'] * 0.95
+        status += 1
+
+        self.rpm[engines] = rpm
+        self.temp[engines] = temp
+        self.fuel_flow[engines] = fuel_flow
+        self.load[engines] = load
+        self.status[engines] = status
+
+    def register_block(self, extra_signals=None):
+        """Encode the whole fleet into its contiguous register image
+
+        extra_signals are further signal rows (one column per engine) following
+        SIGNALS in the packer's signal order, missing ones encode as 0.
+        """
+        registers = self.registers
+        signals = self._signals
+        if signals is None or len(signals) != registers.signal_count:
+            signals = self._signals = np.zeros((registers.signal_count, self.size), dtype=np.float64)
+        for row, values in enumerate((self.status, self.rpm, self.temp, self.fuel_flow, self.load)):
+            signals[row] = values
+        extra = len(extra_signals) if extra_signals is not None else 0
+        if extra:
+            signals[len(SIGNALS):len(SIGNALS) + extra] = extra_signals
+        signals[len(SIGNALS) + extra:] = 0
+        self._block[:, registers.base:registers.base + registers.span] = registers.encode(signals)
+        return self._block.reshape(-1)
+
+    def summary(self):
+        """Aggregate fleet state for status output"""
+        return {
+            'engines': self.size,
+            'running': int(self.running.sum()),
+            'alarms': int((self.status == 3).sum()),
+            'warnings': int((self.status == 2).sum()),
+            'mean_rpm': float(self.rpm.mean()),
+            'mean_temp': float(self.temp.mean()),
+            'total_fuel_flow': float(self.fuel_flow.sum()),
+        }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Engine Time-Series History
+Fixed-size ring buffer of per-tick engine samples backed by NumPy arrays,
+with min/max/mean downsampling for long query windows
+"""
+
+import threading
+
+import numpy as np
+
+# Column order of the sample matrix
+HISTORY_FIELDS = ('status', 'rpm', 'temp', 'fuel_flow', 'load')
+
+
+class EngineHistory:
+    def __init__(self, capacity=86400):
+        """Allocate the ring buffer once, memory stays flat no matter how long we run"""
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+
+        self._times = np.zeros(self.capacity, dtype=np.float64)
+        self._samples = np.zeros((self.capacity, len(HISTORY_FIELDS)), dtype=np.float32)
+        self._head = 0   # Next slot to write
+        self._count = 0  # Number of valid samples
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, status, rpm, temp, fuel_flow, load):
+        """Record one tick sample, overwriting the oldest when full"""
+        with self._lock:
+            head = self._head
+            self._times[head] = timestamp
+            self._samples[head] = (status, rpm, temp, fuel_flow, load)
+            self._head = (head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def _window(self, start, end):
+        """Copy out the samples with start <= time <= end, oldest first"""
+        with self._lock:
+            if self._count < self.capacity:
+                segments = [(0, self._count)]
+            else:
+                # Buffer wrapped: oldest samples run from head to the end, then from 0 to head
+                segments = [(self._head, self.capacity), (0, self._head)]
+
+            times, samples = [], []
+            for seg_start, seg_end in segments:
+                seg_times = self._times[seg_start:seg_end]
+                lo = seg_start + np.searchsorted(seg_times, start, side='left')
+                hi = seg_start + np.searchsorted(seg_times, end, side='right')
+                if hi > lo:
+                    times.append(self._times[lo:hi].copy())
+                    samples.append(self._samples[lo:hi].copy())
+
+        if not times:
+            return np.empty(0, dtype=np.float64), np.empty((0, len(HISTORY_FIELDS)), dtype=np.float32)
+        return np.concatenate(times), np.concatenate(samples)
+
+    def query(self, start=None, end=None, points=500, fields=HISTORY_FIELDS):
+        """Return the window downsampled to at most `points` min/max/mean buckets of `fields`"""
+        start = -np.inf if start is None else float(start)
+        end = np.inf if end is None else float(end)
+        points = max(1, int(points))
+
+        times, samples = self._window(start, end)
+        n = len(times)
+
+        if n <= points:
+            # Few enough samples, every bucket holds exactly one
+            bucket_times = times
+            mins = maxs = means = samples
+            per_bucket = 1
+        else:
+            edges = np.linspace(0, n, points + 1).astype(np.int64)
+            starts = edges[:-1]
+            counts = np.diff(edges).astype(np.float32)
+            bucket_times = times[starts]
+            mins = np.minimum.reduceat(samples, starts, axis=0)
+            maxs = np.maximum.reduceat(samples, starts, axis=0)
+            means = np.add.reduceat(samples, starts, axis=0) / counts[:, None]
+            per_bucket = int(np.ceil(n / points))
+
+        series = {}
+        for column, name in enumerate(HISTORY_FIELDS):
+            if name not in fields:
+                continue
+            # Round in float64 so float32 storage noise doesn't leak into the JSON
+            series[name] = {
+                'min': np.round(mins[:, column].astype(np.float64), 2).tolist(),
+                'max': np.round(maxs[:, column].astype(np.float64), 2).tolist(),
+                'mean': np.round(means[:, column].astype(np.float64), 2).tolist(),
+            }
+
+        return {
+            'from': float(times[0]) if n else None,
+            'to': float(times[-1]) if n else None,
+            'samples': n,
+            'points': len(bucket_times),
+            'samples_per_point': per_bucket,
+            'timestamps': np.round(bucket_times, 3).tolist(),
+            'series': series,
+        }
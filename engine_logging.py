@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Non-blocking Structured Logging
+Log records are queued by the calling thread and written to the console/log file
+by a background listener, so the simulation thread never blocks on I/O.
+Each record carries an event type used for per-type rate limiting.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOGGER_NAME = 'engine_simulator'
+
+# Event types switched by the boolean flags of the logging config section
+ENGINE_EVENTS = ('engine_status', 'engine')
+SECURITY_EVENTS = ('security',)
+
+# Background writer of the currently configured logger
+_listener = None
+
+
+def get_logger(name=None):
+    """Logger under the simulator hierarchy, e.g. get_logger('websocket')"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+class StructuredFormatter(logging.Formatter):
+    """timestamp level [event] message key=value ..."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(event)s] %(message)s', '%Y-%m-%d %H:%M:%S')
+
+    def format(self, record):
+        if not hasattr(record, 'event'):
+            record.event = 'general'
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Stream handler bound to whatever sys.stdout is when the record is written"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class RateLimitFilter(logging.Filter):
+    """Per event type token bucket, suppressed messages are counted and reported"""
+
+    def __init__(self, rates=None, disabled_events=()):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.disabled_events = set(disabled_events)
+        self._buckets = {}  # event -> [tokens, last refill time]
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        event = getattr(record, 'event', 'general')
+        if event in self.disabled_events:
+            return False
+
+        rate = self.rates.get(event)
+        if not rate:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(event)
+            if bucket is None:
+                bucket = self._buckets[event] = [float(rate), now]
+            # Refill, bursts up to one second worth of messages
+            bucket[0] = min(float(rate), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                return False
+            bucket[0] -= 1.0
+            suppressed = self._suppressed.pop(event, 0)
+
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+    def configure(self, rates=None, disabled_events=()):
+        """Replace the rates and disabled events, e.g. on a config reload"""
+        with self._lock:
+            self.rates = dict(rates or {})
+            self.disabled_events = set(disabled_events)
+            self._buckets = {}
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _HandlerSwap:
+    """Queued in place of a record: the listener switches to new outputs after the records before it"""
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+
+
+class SwappableQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose outputs can be replaced while it runs, on its own thread"""
+
+    def handle(self, record):
+        if isinstance(record, _HandlerSwap):
+            previous, self.handlers = self.handlers, record.handlers
+            for output in previous:
+                if output not in record.handlers:
+                    output.close()
+            return
+        super().handle(record)
+
+
+def _level(logging_config):
+    level = logging.getLevelName(str(logging_config.get('level', 'INFO')).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _disabled_events(logging_config):
+    disabled = []
+    if not logging_config.get('log_engine_events', True):
+        disabled.extend(ENGINE_EVENTS)
+    if not logging_config.get('log_unauthorized_commands', True):
+        disabled.extend(SECURITY_EVENTS)
+    return disabled
+
+
+def _file_handler(path):
+    """Formatted log file output, None (with a warning) if it can't be opened"""
+    try:
+        output = logging.FileHandler(path)
+    except OSError as e:
+        print(f"Warning: cannot open log file {path}: {e}")
+        return None
+    output.setFormatter(StructuredFormatter())
+    return output
+
+
+def setup_logging(logging_config=None):
+    """Configure the simulator logger from the config 'logging' section
+
+    Call stop_logging() on shutdown to flush pending records.
+    """
+    global _listener
+    logging_config = logging_config or {}
+    logger = get_logger()
+
+    # Reconfiguring (e.g. a second simulator in the same process) replaces the old handlers
+    stop_logging()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    logger.setLevel(_level(logging_config))
+    logger.propagate = False
+
+    console = ConsoleHandler()
+    console.setFormatter(StructuredFormatter())
+    outputs = [console]
+    if logging_config.get('log_file'):
+        output = _file_handler(logging_config['log_file'])
+        if output:
+            outputs.append(output)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=logging_config.get('queue_size', 10000)))
+    queue_handler.addFilter(RateLimitFilter(logging_config.get('rate_limits'), _disabled_events(logging_config)))
+    logger.addHandler(queue_handler)
+
+    _listener = SwappableQueueListener(queue_handler.queue, *outputs, respect_handler_level=True)
+    _listener.queue_handler = queue_handler
+    _listener.start()
+    return logger
+
+
+def reconfigure_logging(logging_config=None):
+    """Apply a changed 'logging' section without stopping the background writer
+
+    Level, event switches and rate limits change in place. A changed log
+    file is handed to the writer through the queue, so records queued before
+    the change still go to the old file and nothing is written by the
+    calling thread. queue_size only takes effect in setup_logging().
+    """
+    logging_config = logging_config or {}
+    if _listener is None:
+        return setup_logging(logging_config)
+    logger = get_logger()
+    queue_handler = _listener.queue_handler
+
+    logger.setLevel(_level(logging_config))
+    for log_filter in queue_handler.filters:
+        if isinstance(log_filter, RateLimitFilter):
+            log_filter.configure(logging_config.get('rate_limits'), _disabled_events(logging_config))
+
+    path = logging_config.get('log_file')
+    current = [output for output in _listener.handlers if isinstance(output, logging.FileHandler)]
+    if [output.baseFilename for output in current] != ([os.path.abspath(path)] if path else []):
+        outputs = [output for output in _listener.handlers if output not in current]
+        if path:
+            output = _file_handler(path)
+            if output:
+                outputs.append(output)
+        try:
+            queue_handler.queue.put_nowait(_HandlerSwap(tuple(outputs)))
+        except queue.Full:
+            # Writer far behind, switch right away; the old file closes when it is collected
+            _listener.handlers = tuple(outputs)
+    return logger
+
+
+def stop_logging():
+    """Write out every queued record and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for output in _listener.handlers:
+            output.close()
+        _listener = None
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Physics-Based Engine Model
+Optional replacement for the setpoint-jitter model: a PI speed governor
+sets fuel (torque) against a propeller-law load, the shaft speed follows the
+torque balance with rotor inertia, fuel flow comes from a fuel map over speed
+and torque, and temperature lags load with thermal inertia. Every engine of
+a fleet advances together in NumPy, integrated over a fixed number of
+sub-steps per tick, so tick cost only depends on the fleet size.
+
+Lookup tables (fuel map, torque limit curve, steady-state temperature) are
+computed once at startup.
+"""
+
+import numpy as np
+
+DEFAULTS = {
+    'sub_steps': 10,               # Integration steps per update_interval
+    'rotor_time_constant': 2.0,    # s for full torque to accelerate the shaft from 0 to rpm_max
+    'thermal_time_constant': 60.0,  # s for temperature to close 63% of the gap to steady state
+    'governor_kp': 4.0,            # Torque fraction per unit speed error (fraction of rpm_max)
+    'governor_ki': 2.0,            # Torque fraction per unit speed error and second
+    'load_mean': 0.7,              # Mean propeller demand at rpm_normal, fraction of rated torque
+    'load_volatility': 0.03,       # Demand random walk, per square root of a second
+    'load_reversion': 0.05,        # Demand pull back to load_mean, per second
+    'friction': 0.05,              # Friction torque fraction at rpm_max
+    'table_points': 64,            # Lookup table resolution per axis
+}
+
+# Lookup tables cover this multiple of rpm_max and of rated torque
+_RPM_RANGE = 1.2
+_TORQUE_RANGE = 1.2
+
+
+class EnginePhysics:
+    def __init__(self, engine_config, physics_config=None, size=1, seed=None):
+        """Model `size` engines with the rpm/temp/fuel limits from the engine config section"""
+        params = dict(DEFAULTS)
+        params.update(physics_config or {})
+        self.params = params
+        self.size = int(size)
+        self.sub_steps = max(1, int(params['sub_steps']))
+
+        cfg = engine_config
+        self.rpm_target = float(cfg['rpm_normal'])
+        self.rpm_max = float(cfg['rpm_max'])
+        self.temp_min = float(cfg['temp_min'])
+        self.temp_max = float(cfg['temp_max'])
+        self.temp_normal = float(cfg['temp_normal'])
+        self.accel = self.rpm_max / float(params['rotor_time_constant'])  # rpm/s at full torque
+
+        self._rng = np.random.default_rng(seed)
+        self._integral = np.zeros(self.size)                  # Governor integral term
+        self._demand = np.full(self.size, float(params['load_mean']))  # Propeller demand factor
+        self._build_tables(cfg)
+
+    def resume(self, previous):
+        """Continue from another model's governor and load state (same size), e.g. after retuning"""
+        if previous.size == self.size:
+            self._integral[:] = previous._integral
+            self._demand[:] = previous._demand
+            self._rng = previous._rng
+
+    def _build_tables(self, cfg):
+        """Precompute the fuel map and the 1D curves the sub-steps look up"""
+        points = int(self.params['table_points'])
+        self._rpm_step = self.rpm_max * _RPM_RANGE / (points - 1)
+        self._torque_step = _TORQUE_RANGE / (points - 1)
+        self._points = points
+        rpm_ratio = np.linspace(0, _RPM_RANGE, points)
+        torque = np.linspace(0, _TORQUE_RANGE, points)
+        self._rpm_grid = rpm_ratio * self.rpm_max
+        self._torque_grid = torque
+
+        # Full-load torque curve: peak near 80% speed, reduced at both ends
+        self._torque_limit = np.clip(1.05 - 0.8 * (rpm_ratio - 0.8) ** 2, 0.4, 1.05)
+
+        # Fuel map: idle consumption plus power over a specific consumption bowl
+        # (best near 80% torque and 75% speed), calibrated to fuel_flow_normal
+        r, t = np.meshgrid(rpm_ratio, torque, indexing='ij')
+        specific = 1 + 0.3 * (t - 0.8) ** 2 + 0.2 * (r - 0.75) ** 2
+        idle = float(cfg['fuel_flow_min']) * r
+        power = t * r * specific
+        normal_ratio = self.rpm_target / self.rpm_max
+        load_mean = float(self.params['load_mean'])
+        normal_power = load_mean * normal_ratio * (1 + 0.3 * (load_mean - 0.8) ** 2 + 0.2 * (normal_ratio - 0.75) ** 2)
+        gain = (float(cfg['fuel_flow_normal']) - float(cfg['fuel_flow_min']) * normal_ratio) / normal_power
+        self._fuel_map = idle + gain * power
+
+        # Steady-state temperature over torque, temp_normal at the mean load
+        self._temp_curve = self.temp_min + (self.temp_normal - self.temp_min) * (0.4 + 0.6 * torque / load_mean)
+
+    def _fuel_at(self, rpm, torque):
+        """Bilinear fuel map lookup"""
+        x = np.clip(rpm / self._rpm_step, 0, self._points - 1.000001)
+        y = np.clip(torque / self._torque_step, 0, self._points - 1.000001)
+        ix = x.astype(np.intp)
+        iy = y.astype(np.intp)
+        fx = x - ix
+        fy = y - iy
+        table = self._fuel_map
+        return ((table[ix, iy] * (1 - fx) + table[ix + 1, iy] * fx) * (1 - fy)
+                + (table[ix, iy + 1] * (1 - fx) + table[ix + 1, iy + 1] * fx) * fy)
+
+    def step(self, dt, running, rpm, temp, fuel_flow, load, status):
+        """Advance every engine by dt seconds, updating the state arrays in place"""
+        params = self.params
+        steps = self.sub_steps
+        h = dt / steps
+        kp = params['governor_kp']
+        ki = params['governor_ki']
+        friction = params['friction']
+        reversion = params['load_reversion']
+        load_mean = params['load_mean']
+        # Demand noise for every sub-step drawn in one call
+        noise = self._rng.standard_normal((steps, self.size)) * (params['load_volatility'] * np.sqrt(h))
+
+        integral = self._integral
+        demand = self._demand
+        integral[~running] = 0
+        torque = np.zeros(self.size)
+
+        for k in range(steps):
+            # Propeller demand factor: mean-reverting random walk
+            demand += reversion * (load_mean - demand) * h + noise[k]
+            np.clip(demand, 0.2, 1.0, out=demand)
+            speed = rpm / self.rpm_target
+            demand_torque = demand * speed * speed
+
+            # PI governor on speed error, integrator held while the torque limit saturates
+            error = (self.rpm_target - rpm) / self.rpm_max
+            limit = np.interp(rpm, self._rpm_grid, self._torque_limit)
+            command = kp * error + ki * integral
+            torque = np.where(running, np.clip(command, 0, limit), 0.0)
+            windup = ((command >= limit) & (error > 0)) | ((command <= 0) & (error < 0))
+            integral += np.where(running & ~windup, error * h, 0.0)
+
+            # Shaft: torque balance against propeller and friction
+            accel = (torque - demand_torque - friction * rpm / self.rpm_max) * self.accel
+            np.maximum(rpm + accel * h, 0, out=rpm)
+
+            # Thermal inertia: first-order lag to the steady state of the current load
+            target = np.where(running, np.interp(torque, self._torque_grid, self._temp_curve), self.temp_min)
+            temp += (target - temp) * (h / params['thermal_time_constant'])
+
+        fuel_flow[:] = np.where(running, self._fuel_at(rpm, torque), 0.0)
+        load[:] = np.clip(np.round(torque * 100), 0, 100)
+
+        # Same status rules as the setpoint model
+        temp_status = np.where(temp > self.temp_max * 0.95, 3, np.where(temp > self.temp_max * 0.85, 2, 1))
+        halted = ~running & (rpm < 10)
+        rpm[halted] = 0
+        fuel_flow[halted] = 0
+        load[halted] = 0
+        status[:] = np.where(running, temp_status, np.where(halted, 0, status))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Versioned Engine State Snapshots
+Every simulation tick publishes one immutable snapshot of the engine state,
+captured under the simulator's state lock, with a version that only ever
+grows. Readers (HTTP handlers, history, dashboards) take the whole snapshot
+with one attribute read, so a response never mixes values from two ticks.
+Long-polling clients wait on the channel's condition until a version newer
+than the one they have is published.
+"""
+
+import json
+import threading
+from datetime import datetime
+
+
+class EngineSnapshot:
+    """Engine values of one tick, plus the pre-serialized /api/engine JSON body"""
+    __slots__ = ('version', 'sim_time', 'running', 'status', 'rpm', 'temp', 'fuel_flow', 'load',
+                 'body', 'etag', 'fleet', 'variants')
+
+    def __init__(self, version, sim_time, running, status, rpm, temp, fuel_flow, load, fleet=None):
+        """fleet is {value name: array} copied from the fleet, or None without one"""
+        for name, value in (('version', version), ('sim_time', sim_time), ('running', running),
+                            ('status', status), ('rpm', rpm), ('temp', temp), ('fuel_flow', fuel_flow),
+                            ('load', load), ('etag', f'"{version}"'), ('fleet', fleet),
+                            ('variants', {})):  # Other encodings of this snapshot, filled on first request
+            object.__setattr__(self, name, value)
+        # Serialized once here, every /api/engine poller of this tick gets the same bytes
+        object.__setattr__(self, 'body', json.dumps({
+            'engine': self.engine(),
+            'timestamp': self.timestamp(),
+            'version': version,
+        }).encode())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EngineSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("EngineSnapshot is immutable")
+
+    def timestamp(self):
+        """Simulated time of the tick as the API's ISO 8601 string"""
+        return datetime.fromtimestamp(self.sim_time).isoformat()
+
+    def engine(self):
+        """Engine values as the /api/engine document reports them"""
+        return {
+            'status': self.status,
+            'rpm': int(self.rpm),
+            'temp': int(self.temp),
+            'fuel_flow': self.fuel_flow,
+            'load': int(self.load),
+        }
+
+
+class SnapshotChannel:
+    def __init__(self, initial):
+        """Latest published snapshot, and a condition long-pollers wait on for the next one"""
+        self.latest = initial
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def publish(self, snapshot):
+        """Make snapshot the latest and wake every waiting reader"""
+        with self._condition:
+            self.latest = snapshot
+            self._condition.notify_all()
+
+    def wait_newer(self, since, timeout):
+        """Latest snapshot once its version exceeds `since`, or the current one after timeout seconds
+
+        A `since` ahead of the latest version (a client that polled a previous
+        run of the simulator) returns right away.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self.latest.version != since, timeout)
+            return self.latest
+
+    def close(self):
+        """Release every waiting reader, e.g. on shutdown"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
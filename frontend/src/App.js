@@ -406,8 +406,14 @@ function App() {
           const data = JSON.parse(event.data);
           if (data.type === 'modbus') {
             setEngineData(prevData => {
+              // Frames only carry changed fields, carry the rest forward
               const newHistoryPoint = {
                 time: new Date().toLocaleTimeString(),
+                status: prevData.status,
+                rpm: prevData.rpm,
+                temperature: prevData.temperature,
+                fuel_flow: prevData.fuel_flow,
+                load: prevData.load,
                 ...data.engine,
                 exhaust_temp: prevData.history.length > 0 
                   ? prevData.history[prevData.history.length - 1].exhaust_temp 
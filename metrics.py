@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics
+Minimal dependency-free counters and histograms rendered in the Prometheus
+text exposition format. Every counter and histogram child guards its values
+with a lock of its own, so hot-path updates from different series never
+contend, and histogram buckets are preallocated when the metric is created.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+
+# Default histogram buckets in seconds
+TICK_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [(name, value) for name, value in zip(names, values)] + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()  # Only taken when a new label combination shows up
+
+    def labels(self, *values):
+        """Child for one label combination, cache it on hot paths"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('_value', '_lock')
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+
+class Counter(_Metric):
+    """Monotonic integer counter"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._default = self.labels()
+            self.inc = self._default.inc
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _render_child(self, values, child):
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', '_buckets', 'sum', '_lock')
+
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        # Last slot is the +Inf bucket
+        self._buckets = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self._buckets[index] += 1
+            self.sum += value
+
+    def read(self):
+        """(bucket counts, sum) as of one moment"""
+        with self._lock:
+            return list(self._buckets), self.sum
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram, buckets are allocated per label combination up front"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._default = self.labels()
+            self.observe = self._default.observe
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def _render_child(self, values, child):
+        cumulative = 0
+        counts, total = child.read()
+        for bound, count in zip(self.upper_bounds + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, [('le', _format_value(float(bound)))])
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric(_Metric):
+    """Counter or gauge whose value is read from the simulator at scrape time"""
+
+    def __init__(self, name, documentation, kind, callback):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}",
+                f"{self.name} {_format_value(self.callback())}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Collection of metrics rendered together by /metrics"""
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name, documentation, callback):
+        return self.register(CallbackMetric(name, documentation, 'gauge', callback))
+
+    def counter_callback(self, name, documentation, callback):
+        return self.register(CallbackMetric(name, documentation, 'counter', callback))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ('\n'.join(lines) + '\n').encode()
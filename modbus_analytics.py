@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Streaming MODBUS Request Analytics
+Per-client request rates, write bursts and register scan patterns over a
+sliding time window, kept in fixed-size count-min sketches so memory does
+not grow with the number of clients or requests. Every request is O(1).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Function codes that modify the data bank
+WRITE_FUNCTION_CODES = frozenset((5, 6, 15, 16, 23))
+
+# Registers per block when counting how much of the address space a client touched
+SCAN_BLOCK_SIZE = 16
+
+# 64-bit multipliers for the per-row hash functions
+_HASH_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                     0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9)
+_MASK64 = (1 << 64) - 1
+
+
+class SlidingCountMin:
+    def __init__(self, width=4096, depth=4, slots=10):
+        """Count-min sketch over the last `slots` time slots
+
+        Each slot has its own counter matrix, `_total` is their running sum so
+        an update or estimate touches `depth` cells and expiring a slot is one
+        vectorized subtraction. Single cells are accessed through memoryviews,
+        which is much cheaper than NumPy scalar indexing.
+        """
+        if depth > len(_HASH_MULTIPLIERS):
+            raise ValueError(f"Sketch depth must be at most {len(_HASH_MULTIPLIERS)}")
+        self.width = int(width)
+        self.depth = int(depth)
+        self._slots = np.zeros((slots, depth * self.width), dtype=np.uint32)
+        self._total = np.zeros(depth * self.width, dtype=np.uint32)
+        self._slot_views = [memoryview(row) for row in self._slots]
+        self._total_view = memoryview(self._total)
+        # Row r of the flattened matrix starts at r * width
+        self._offsets = [(m, row * self.width) for row, m in enumerate(_HASH_MULTIPLIERS[:depth])]
+
+    def indices(self, key):
+        """Flat cell index of `key` in every row"""
+        h = hash(key) & _MASK64
+        width = self.width
+        return [offset + (((h * m) & _MASK64) >> 32) % width for m, offset in self._offsets]
+
+    def add(self, slot, cells, count=1):
+        """Add to the current slot, returns the new windowed estimate"""
+        current = self._slot_views[slot]
+        total = self._total_view
+        estimate = None
+        for cell in cells:
+            current[cell] += count
+            value = total[cell] = total[cell] + count
+            if estimate is None or value < estimate:
+                estimate = value
+        return estimate
+
+    def estimate(self, cells):
+        """Windowed count, never an underestimate"""
+        total = self._total_view
+        return min(total[cell] for cell in cells)
+
+    def expire(self, slot):
+        """Drop a slot that has fallen out of the window"""
+        self._total -= self._slots[slot]
+        self._slots[slot] = 0
+
+
+class ModbusTrafficAnalyzer:
+    def __init__(self, window=10.0, slots=10, width=4096, depth=4, top_clients=20,
+                 flood_requests=2000, write_burst=50, scan_blocks=64, error_requests=50,
+                 on_alert=None):
+        """Track per-client traffic over `window` seconds and flag abusive clients
+
+        on_alert(event, description, risk_level, client, function_code, register)
+        fires at most once per window for each client and alert type.
+        """
+        self.window = float(window)
+        self.slots = int(slots)
+        self.slot_length = self.window / self.slots
+        self.thresholds = {
+            'flood_requests': flood_requests,
+            'write_burst': write_burst,
+            'scan_blocks': scan_blocks,
+            'error_requests': error_requests,
+        }
+        self.on_alert = on_alert
+
+        self._requests = SlidingCountMin(width, depth, slots)
+        self._writes = SlidingCountMin(width, depth, slots)
+        self._errors = SlidingCountMin(width, depth, slots)
+        # Distinct register blocks per client, and the (client, block) pairs already counted
+        self._blocks = SlidingCountMin(width, depth, slots)
+        self._pairs = SlidingCountMin(width * 4, depth, slots)
+
+        # Heavy hitters: the top_clients clients by windowed request estimate
+        self.top_clients = int(top_clients)
+        self._top = {}
+        self._top_floor = 0
+
+        # (client, alert) -> monotonic time of the last alert, bounded LRU
+        self._alerted = OrderedDict()
+        self._alerted_limit = 4096
+        self.alerts = 0
+
+        self.requests_total = 0
+        self._slot_number = int(time.monotonic() / self.slot_length)
+        self._lock = threading.Lock()
+
+    def _advance(self, now):
+        """Expire the slots that left the window since the last request"""
+        slot_number = int(now / self.slot_length)
+        elapsed = slot_number - self._slot_number
+        if elapsed <= 0:
+            return
+        for step in range(1, min(elapsed, self.slots) + 1):
+            slot = (self._slot_number + step) % self.slots
+            for sketch in (self._requests, self._writes, self._errors, self._blocks, self._pairs):
+                sketch.expire(slot)
+        self._slot_number = slot_number
+
+        # Estimates only decay here, refresh the heavy hitters so quiet clients make room
+        top = self._top
+        for client in list(top):
+            requests = self._requests.estimate(self._requests.indices(client))
+            if requests:
+                top[client] = requests
+            else:
+                del top[client]
+        self._top_floor = min(top.values()) if len(top) >= self.top_clients else 0
+
+    def observe(self, client, function_code, address, ok=True, now=None):
+        """Account one request, O(1) in the number of clients and requests seen"""
+        now = time.monotonic() if now is None else now
+        alerts = []
+
+        with self._lock:
+            self._advance(now)
+            slot = self._slot_number % self.slots
+            self.requests_total += 1
+
+            client_cells = self._requests.indices(client)
+            requests = self._requests.add(slot, client_cells)
+
+            if requests > self._top_floor or client in self._top:
+                self._update_top(client, requests)
+
+            thresholds = self.thresholds
+            if requests > thresholds['flood_requests']:
+                alerts.append('flood')
+
+            if function_code in WRITE_FUNCTION_CODES:
+                writes = self._writes.add(slot, client_cells)
+                if writes > thresholds['write_burst']:
+                    alerts.append('write_burst')
+
+            if not ok:
+                errors = self._errors.add(slot, client_cells)
+                if errors > thresholds['error_requests']:
+                    alerts.append('scan')
+
+            # Count the block only the first time this client touches it in the window
+            pair_cells = self._pairs.indices((client, address // SCAN_BLOCK_SIZE))
+            if self._pairs.add(slot, pair_cells) == 1:
+                blocks = self._blocks.add(slot, client_cells)
+                if blocks > thresholds['scan_blocks']:
+                    alerts.append('scan')
+
+            alerts = [alert for alert in alerts if self._should_alert(client, alert, now)]
+
+        for alert in alerts:
+            self._raise_alert(alert, client, function_code, address)
+
+    def _update_top(self, client, requests):
+        top = self._top
+        if client in top or len(top) < self.top_clients:
+            top[client] = requests
+        else:
+            # Replace the smallest entry, k is small so the scan is bounded
+            smallest = min(top, key=top.get)
+            if requests > top[smallest]:
+                del top[smallest]
+                top[client] = requests
+        if len(top) >= self.top_clients:
+            self._top_floor = min(top.values())
+
+    def _should_alert(self, client, alert, now):
+        key = (client, alert)
+        last = self._alerted.get(key)
+        if last is not None and now - last < self.window:
+            return False
+        self._alerted[key] = now
+        self._alerted.move_to_end(key)
+        if len(self._alerted) > self._alerted_limit:
+            self._alerted.popitem(last=False)
+        return True
+
+    def _raise_alert(self, alert, client, function_code, address):
+        self.alerts += 1
+        if not self.on_alert:
+            return
+        window = f"{self.window:g}s"
+        if alert == 'flood':
+            self.on_alert('MODBUS_REQUEST_FLOOD',
+                          f"Client exceeded {self.thresholds['flood_requests']} MODBUS requests in {window}",
+                          'HIGH', client, function_code, address)
+        elif alert == 'write_burst':
+            self.on_alert('MODBUS_WRITE_BURST',
+                          f"Client exceeded {self.thresholds['write_burst']} MODBUS writes in {window}",
+                          'HIGH', client, function_code, address)
+        else:
+            self.on_alert('MODBUS_REGISTER_SCAN',
+                          f"Client probed more than {self.thresholds['scan_blocks']} register blocks "
+                          f"or triggered more than {self.thresholds['error_requests']} exceptions in {window}",
+                          'MEDIUM', client, function_code, address)
+
+    def client_stats(self, client):
+        """Windowed estimates for one client"""
+        with self._lock:
+            self._advance(time.monotonic())
+            cells = self._requests.indices(client)
+            return {
+                'client': client,
+                'requests': self._requests.estimate(cells),
+                'writes': self._writes.estimate(cells),
+                'errors': self._errors.estimate(cells),
+                'register_blocks': self._blocks.estimate(cells),
+            }
+
+    def snapshot(self):
+        """Heavy hitters and totals for the current window"""
+        with self._lock:
+            self._advance(time.monotonic())
+            clients = list(self._top)
+        top = sorted((self.client_stats(client) for client in clients), key=lambda c: c['requests'], reverse=True)
+        return {
+            'window_seconds': self.window,
+            'thresholds': dict(self.thresholds),
+            'requests_total': self.requests_total,
+            'alerts_total': self.alerts,
+            'top_clients': [stats for stats in top if stats['requests']],
+        }
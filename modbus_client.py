@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Pooled MODBUS TCP Client
+Client side for scripts and dashboards that read the simulator: a small pool
+of persistent connections instead of one TCP session per poll, register
+reads merged into as few block reads as the address layout allows, a short
+TTL cache shared by every thread using the pool (concurrent callers asking
+for the same block wait for one request instead of each sending their own),
+and reconnects with exponential backoff while the server is unreachable.
+
+    pool = ModbusClientPool('192.168.20.192', 502)
+    values = pool.read_registers([0, 1, 2, 3, 4])  # One FC3 request, {address: value}
+    pool.write_register(4, 75)
+    pool.close()
+"""
+
+import queue
+import random
+import threading
+import time
+
+from pyModbusTCP.client import ModbusClient
+from pyModbusTCP.constants import MB_EXCEPT_ERR
+
+# Largest block one request may carry, per register space (MODBUS application protocol limits)
+MAX_BLOCK = {'holding': 125, 'input': 125, 'coil': 2000}
+_READERS = {
+    'holding': 'read_holding_registers',
+    'input': 'read_input_registers',
+    'coil': 'read_coils',
+}
+
+
+class ModbusUnavailable(ConnectionError):
+    """The server can't be reached, or is in its reconnect backoff window"""
+
+
+class ModbusRequestError(Exception):
+    def __init__(self, message, exception_code):
+        """The server answered with a MODBUS exception response"""
+        super().__init__(message)
+        self.exception_code = exception_code
+
+
+class _Flight:
+    """One block read in progress, the callers that want the same block wait for its result"""
+    __slots__ = ('done', 'values', 'error', 'generation')
+
+    def __init__(self, generation):
+        self.done = threading.Event()
+        self.values = None
+        self.error = None
+        self.generation = generation  # Writes to the space seen when the read was sent
+
+
+class ModbusClientPool:
+    def __init__(self, host='127.0.0.1', port=502, unit_id=1, size=4, timeout=5.0, cache_ttl=0.1,
+                 max_gap=0, backoff_initial=0.5, backoff_max=10.0):
+        """Up to `size` persistent connections to one MODBUS server
+
+        cache_ttl is how long (seconds) a block read answers other reads of
+        the same registers, 0 disables the cache but keeps concurrent callers
+        sharing one in-flight request. max_gap is how many unwanted registers
+        may sit between two wanted ones and still be read in the same block.
+        """
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_gap = max(0, int(max_gap))
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self._idle = queue.LifoQueue()  # Most recently used connection first, so spares can time out
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()   # Cache, in-flight reads, backoff state and counters
+        self._cache = {}                # (space, address, count) -> (expires, values)
+        self._flights = {}              # (space, address, count) -> _Flight
+        self._generations = dict.fromkeys(_READERS, 0)  # Space -> writes made through the pool
+        self._retry_at = 0.0
+        self._backoff = 0.0
+        self._closed = False
+        self.counters = {
+            'requests': 0,      # Requests sent to the server
+            'reads': 0,         # Registers asked for by callers
+            'cache_hits': 0,    # Blocks answered from the cache
+            'shared': 0,        # Blocks answered by another caller's in-flight request
+            'connects': 0,
+            'connect_failures': 0,
+        }
+
+    # Connections
+
+    def _open(self):
+        """New connected client, ModbusUnavailable on failure or during backoff"""
+        with self._lock:
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                raise ModbusUnavailable(f"{self.host}:{self.port} unreachable, retrying in {wait:.1f}s")
+        client = ModbusClient(host=self.host, port=self.port, unit_id=self.unit_id, timeout=self.timeout,
+                              auto_open=False, auto_close=False)
+        opened = client.open()
+        with self._lock:
+            if opened:
+                self.counters['connects'] += 1
+                self._backoff = 0.0
+                return client
+            self.counters['connect_failures'] += 1
+            # Exponential backoff with jitter, so several scripts don't reconnect in step
+            self._backoff = min(self.backoff_max, self._backoff * 2 if self._backoff else self.backoff_initial)
+            self._retry_at = time.monotonic() + self._backoff * random.uniform(0.8, 1.2)
+        raise ModbusUnavailable(f"Cannot connect to {self.host}:{self.port}: {client.last_error_as_txt}")
+
+    def _request(self, method, *args):
+        """Run one client call on a pooled connection, retried once on a fresh one if the socket died"""
+        if self._closed:
+            raise ModbusUnavailable("Client pool is closed")
+        self._slots.acquire()
+        try:
+            for _ in range(2):
+                try:
+                    client = self._idle.get_nowait()
+                except queue.Empty:
+                    client = self._open()
+                with self._lock:
+                    self.counters['requests'] += 1
+                result = getattr(client, method)(*args)
+                if result is not None:
+                    self._release(client)
+                    return result
+                if client.last_error == MB_EXCEPT_ERR:
+                    self._release(client)
+                    raise ModbusRequestError(f"{method}{args}: {client.last_except_as_txt}", client.last_except)
+                # Transport error: a persistent connection may have been dropped by a server restart
+                client.close()
+            raise ModbusUnavailable(f"{method}{args} failed: {client.last_error_as_txt}")
+        finally:
+            self._slots.release()
+
+    def _release(self, client):
+        """Return a healthy connection to the pool, or close it if the pool was closed meanwhile"""
+        if self._closed:
+            client.close()
+        else:
+            self._idle.put(client)
+
+    def close(self):
+        """Close every idle connection, connections in use close when their request returns"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    # Reads
+
+    def _blocks(self, addresses, space):
+        """Sorted unique addresses merged into (start, count) block reads"""
+        limit = MAX_BLOCK[space]
+        blocks = []
+        for address in sorted(set(addresses)):
+            if blocks:
+                start, count = blocks[-1]
+                end = start + count
+                if address - end <= self.max_gap and address - start < limit:
+                    blocks[-1] = (start, address - start + 1)
+                    continue
+            blocks.append((address, 1))
+        return blocks
+
+    def _cached(self, space, address, count, now):
+        """Values of a fresh cached block covering the range, or None"""
+        values = None
+        for (cached_space, start, cached_count), (expires, cached) in self._cache.items():
+            if (cached_space == space and expires > now and start <= address
+                    and address + count <= start + cached_count):
+                values = cached[address - start:address - start + count]
+                break
+        return values
+
+    def _read_block(self, space, address, count):
+        """One block of values, from the cache, another caller's request or a new request"""
+        key = (space, address, count)
+        with self._lock:
+            now = time.monotonic()
+            values = self._cached(space, address, count, now)
+            if values is not None:
+                self.counters['cache_hits'] += 1
+                return values
+            generation = self._generations[space]
+            flight = self._flights.get(key)
+            # A read sent before a write may answer with the old values, don't join it
+            leader = flight is None or flight.generation != generation
+            if leader:
+                flight = self._flights[key] = _Flight(generation)
+            else:
+                self.counters['shared'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.values
+
+        try:
+            flight.values = self._request(_READERS[space], address, count)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                # Not cached if a write to the space finished meanwhile, it may predate the write
+                if flight.error is None and self.cache_ttl > 0 and flight.generation == self._generations[space]:
+                    now = time.monotonic()
+                    for stale in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+                        del self._cache[stale]
+                    self._cache[key] = (now + self.cache_ttl, flight.values)
+            flight.done.set()
+        return flight.values
+
+    def read_registers(self, addresses, space='holding'):
+        """{address: value} for every address, read with as few requests as the layout allows
+
+        space is 'holding', 'input' or 'coil'. Raises ModbusUnavailable or
+        ModbusRequestError if any block can't be read.
+        """
+        if space not in _READERS:
+            raise ValueError(f"space must be one of {', '.join(_READERS)}")
+        addresses = list(addresses)
+        with self._lock:
+            self.counters['reads'] += len(addresses)
+        wanted = set(addresses)
+        result = {}
+        for start, count in self._blocks(wanted, space):
+            values = self._read_block(space, start, count)
+            for offset, value in enumerate(values):
+                if start + offset in wanted:
+                    result[start + offset] = value
+        return result
+
+    def read_holding_registers(self, address, count=1):
+        """List of `count` holding register values from address"""
+        values = self.read_registers(range(address, address + count))
+        return [values[a] for a in range(address, address + count)]
+
+    def read_input_registers(self, address, count=1):
+        """List of `count` input register values from address"""
+        values = self.read_registers(range(address, address + count), space='input')
+        return [values[a] for a in range(address, address + count)]
+
+    # Writes
+
+    def _invalidate(self, space, address, count):
+        """Drop cached blocks overlapping a written range, so later reads see the write
+
+        Reads in flight are left out of the cache when they finish, see _read_block.
+        """
+        with self._lock:
+            self._generations[space] += 1
+            for key in [k for k in self._cache
+                        if k[0] == space and k[1] < address + count and address < k[1] + k[2]]:
+                del self._cache[key]
+
+    def write_register(self, address, value):
+        """Write one holding register (FC6)"""
+        try:
+            return self._request('write_single_register', address, value)
+        finally:
+            self._invalidate('holding', address, 1)
+
+    def write_registers(self, address, values):
+        """Write consecutive holding registers (FC16)"""
+        try:
+            return self._request('write_multiple_registers', address, list(values))
+        finally:
+            self._invalidate('holding', address, len(values))
+
+    def write_coil(self, address, value):
+        """Write one coil (FC5)"""
+        try:
+            return self._request('write_single_coil', address, bool(value))
+        finally:
+            self._invalidate('coil', address, 1)
+
+    def stats(self):
+        """Copy of the request, cache and connection counters"""
+        with self._lock:
+            return dict(self.counters)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+MODBUS Data Handling Hooks
+Custom pyModbusTCP data handler that reports client writes to watched
+registers the moment the server processes them, and optionally every
+request with its result. UnitRouter serves several MODBUS unit IDs, each
+with its own data handler, from one server. BlockDataBank stores the
+simulator's register blocks in one step instead of word by word.
+"""
+
+import numpy as np
+from pyModbusTCP.constants import EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND
+from pyModbusTCP.server import DataBank, DataHandler
+
+
+class BlockDataBank(DataBank):
+    """DataBank whose server-side holding register writes are one slice assignment
+
+    pyModbusTCP converts and compares every word so it can report client
+    changes. Writes from the simulator itself (no srv_info) report nothing,
+    which for a fleet block of thousands of registers is most of the tick.
+    """
+
+    def set_holding_registers(self, address, word_list, srv_info=None):
+        if srv_info is not None:
+            return super().set_holding_registers(address, word_list, srv_info)
+        if isinstance(word_list, np.ndarray):
+            # Wraps to 16 bits like int(w) & 0xffff
+            words = word_list.astype(np.uint16, copy=False).tolist()
+        else:
+            words = [int(w) & 0xffff for w in word_list]
+        with self._h_regs_lock:
+            if address < 0 or address + len(words) > len(self._h_regs):
+                return None
+            self._h_regs[address:address + len(words)] = words
+        return True
+
+
+class WatchedDataHandler(DataHandler):
+    def __init__(self, data_bank=None, on_write=None, on_request=None):
+        """Initialize handler, on_write(address, from_value, to_value, srv_info) fires per watched write
+
+        on_request(address, srv_info, ret), if set, fires after every data request.
+        """
+        super().__init__(data_bank=data_bank)
+        self.on_write = on_write
+        self.on_request = on_request
+        # One flag per holding register, so the per-write check is a single index
+        self._watched = bytearray(self.data_bank.h_regs_size)
+
+    def watch(self, address, count=1, stride=1):
+        """Watch `count` registers starting at address, `stride` apart"""
+        for n in range(count):
+            self._watched[address + n * stride] = 1
+
+    def unwatch_all(self):
+        """Stop watching every register"""
+        self._watched = bytearray(self.data_bank.h_regs_size)
+
+    def read_coils(self, address, count, srv_info):
+        ret = super().read_coils(address, count, srv_info)
+        if self.on_request:
+            self.on_request(address, srv_info, ret)
+        return ret
+
+    def read_d_inputs(self, address, count, srv_info):
+        ret = super().read_d_inputs(address, count, srv_info)
+        if self.on_request:
+            self.on_request(address, srv_info, ret)
+        return ret
+
+    def read_h_regs(self, address, count, srv_info):
+        ret = super().read_h_regs(address, count, srv_info)
+        if self.on_request:
+            self.on_request(address, srv_info, ret)
+        return ret
+
+    def read_i_regs(self, address, count, srv_info):
+        ret = super().read_i_regs(address, count, srv_info)
+        if self.on_request:
+            self.on_request(address, srv_info, ret)
+        return ret
+
+    def write_coils(self, address, bits_l, srv_info):
+        ret = super().write_coils(address, bits_l, srv_info)
+        if self.on_request:
+            self.on_request(address, srv_info, ret)
+        return ret
+
+    def write_h_regs(self, address, words_l, srv_info):
+        """Write holding registers for function codes 6/16/23, then report watched addresses"""
+        watched = self._watched
+        end = address + len(words_l)
+        hits = [a for a in range(address, min(end, len(watched))) if watched[a]] if address >= 0 else []
+
+        # Capture the values being replaced (only when a watched register is involved)
+        previous = None
+        if hits:
+            previous = self.data_bank.get_holding_registers(address, len(words_l))
+
+        ret = super().write_h_regs(address, words_l, srv_info)
+
+        if hits and ret.ok and self.on_write:
+            for reg_addr in hits:
+                offset = reg_addr - address
+                from_value = previous[offset] if previous else None
+                self.on_write(reg_addr, from_value, int(words_l[offset]) & 0xffff, srv_info)
+        if self.on_request:
+            self.on_request(address, srv_info, ret)
+        return ret
+
+
+class UnitRouter(DataHandler):
+    def __init__(self, default=None):
+        """Route requests to a per unit ID data handler, unknown unit IDs go to `default`
+
+        With no default, requests for unknown unit IDs get the gateway exception
+        "target device failed to respond", as a real MODBUS gateway would answer.
+        """
+        empty = DataBank(coils_size=0, d_inputs_size=0, h_regs_size=0, i_regs_size=0)
+        super().__init__(data_bank=default.data_bank if default else empty)
+        self.default = default
+        self.units = {}
+
+    def add_unit(self, unit_id, handler):
+        """Serve unit_id (0-255) from handler"""
+        if not 0 <= unit_id <= 255:
+            raise ValueError(f"MODBUS unit ID must be 0-255, got {unit_id}")
+        self.units[unit_id] = handler
+
+    def _route(self, srv_info):
+        return self.units.get(srv_info.recv_frame.mbap.unit_id, self.default)
+
+    def read_coils(self, address, count, srv_info):
+        handler = self._route(srv_info)
+        if handler is None:
+            return DataHandler.Return(exp_code=EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND)
+        return handler.read_coils(address, count, srv_info)
+
+    def read_d_inputs(self, address, count, srv_info):
+        handler = self._route(srv_info)
+        if handler is None:
+            return DataHandler.Return(exp_code=EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND)
+        return handler.read_d_inputs(address, count, srv_info)
+
+    def read_h_regs(self, address, count, srv_info):
+        handler = self._route(srv_info)
+        if handler is None:
+            return DataHandler.Return(exp_code=EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND)
+        return handler.read_h_regs(address, count, srv_info)
+
+    def read_i_regs(self, address, count, srv_info):
+        handler = self._route(srv_info)
+        if handler is None:
+            return DataHandler.Return(exp_code=EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND)
+        return handler.read_i_regs(address, count, srv_info)
+
+    def write_coils(self, address, bits_l, srv_info):
+        handler = self._route(srv_info)
+        if handler is None:
+            return DataHandler.Return(exp_code=EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND)
+        return handler.write_coils(address, bits_l, srv_info)
+
+    def write_h_regs(self, address, words_l, srv_info):
+        handler = self._route(srv_info)
+        if handler is None:
+            return DataHandler.Return(exp_code=EXP_GATEWAY_TARGET_DEVICE_FAILED_TO_RESPOND)
+        return handler.write_h_regs(address, words_l, srv_info)
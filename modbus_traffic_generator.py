@@ -3,15 +3,25 @@
 MODBUS TCP Traffic Generator
 This script connects to the MODBUS server and continuously reads/writes registers
 to generate actual MODBUS TCP packets that can be captured in Wireshark
+
+With --load it instead runs many concurrent asyncio MODBUS sessions to measure
+the throughput and latency limits of a simulator node
 """
 
 import time
 import random
-from pyModbusTCP.client import ModbusClient
 import argparse
 import threading
 import signal
 import sys
+import asyncio
+import bisect
+import json
+import math
+import struct
+from array import array
+
+from modbus_client import ModbusClientPool, ModbusRequestError, ModbusUnavailable
 
 class ModbusTrafficGenerator:
     def __init__(self, host="192.168.20.192", port=502):
@@ -29,16 +39,18 @@ class ModbusTrafficGenerator:
         
     def connect(self):
         """Connect to MODBUS server"""
+        if self.client is None:
+            # One persistent connection; the pool merges the register reads and reconnects with backoff
+            self.client = ModbusClientPool(host=self.host, port=self.port, size=1)
         try:
-            self.client = ModbusClient(host=self.host, port=self.port, auto_open=True, auto_close=True)
-            if self.client.open():
-                print(f"✓ Connected to MODBUS server at {self.host}:{self.port}")
-                return True
-            else:
-                print(f"✗ Failed to connect to MODBUS server at {self.host}:{self.port}")
-                return False
-        except Exception as e:
-            print(f"✗ Connection error: {e}")
+            self.client.read_registers([self.registers['status']])
+            print(f"✓ Connected to MODBUS server at {self.host}:{self.port}")
+            return True
+        except ModbusUnavailable as e:
+            print(f"✗ Failed to connect to MODBUS server at {self.host}:{self.port}: {e}")
+            return False
+        except ModbusRequestError as e:
+            print(f"✗ MODBUS server at {self.host}:{self.port} rejected the request: {e}")
             return False
     
     def generate_traffic(self):
@@ -47,57 +59,36 @@ class ModbusTrafficGenerator:
         print("This will create actual MODBUS packets visible in Wireshark")
         print("=" * 60)
         
-        packet_count = 0
+        cycle = 0
         
         while self.running:
             try:
-                if not self.client.open():
-                    print("Connection lost, attempting to reconnect...")
-                    if not self.connect():
-                        time.sleep(5)
-                        continue
-                
-                # Read all registers to generate MODBUS TCP packets
+                # All registers in as few block reads as their addresses allow - generates MODBUS TCP packets
+                values = self.client.read_registers(self.registers.values())
                 for reg_name, reg_addr in self.registers.items():
-                    try:
-                        # Read holding register - generates MODBUS TCP packet
-                        result = self.client.read_holding_registers(reg_addr, 1)
-                        packet_count += 1
-                        
-                        if result:
-                            print(f"📡 MODBUS READ: {reg_name.upper()} = {result[0]} (Register {reg_addr})")
-                        else:
-                            print(f"❌ MODBUS READ FAILED: {reg_name.upper()} (Register {reg_addr})")
-                        
-                        # Small delay between reads to make packets visible
-                        time.sleep(0.1)
-                        
-                    except Exception as e:
-                        print(f"Error reading {reg_name}: {e}")
+                    print(f"📡 MODBUS READ: {reg_name.upper()} = {values[reg_addr]} (Register {reg_addr})")
                 
                 # Write some test values occasionally
-                if packet_count % 10 == 0:
-                    try:
-                        # Write a test value to generate write packets
-                        test_value = random.randint(0, 100)
-                        success = self.client.write_single_register(self.registers['load'], test_value)
-                        if success:
-                            print(f"📤 MODBUS WRITE: LOAD = {test_value} (Register {self.registers['load']})")
-                        packet_count += 1
-                    except Exception as e:
-                        print(f"Error writing test value: {e}")
-                
-                # Close connection to simulate real client behavior
-                self.client.close()
-                
-                # Wait before next cycle
-                time.sleep(1)
+                cycle += 1
+                if cycle % 10 == 0:
+                    # Write a test value to generate write packets
+                    test_value = random.randint(0, 100)
+                    if self.client.write_register(self.registers['load'], test_value):
+                        print(f"📤 MODBUS WRITE: LOAD = {test_value} (Register {self.registers['load']})")
                 
+            except ModbusUnavailable as e:
+                print(f"Connection lost, reconnecting: {e}")
+            except ModbusRequestError as e:
+                print(f"❌ MODBUS REQUEST FAILED: {e}")
             except Exception as e:
                 print(f"Traffic generation error: {e}")
-                time.sleep(1)
+            
+            # Wait before next cycle
+            time.sleep(1)
         
-        print("MODBUS traffic generation stopped")
+        stats = self.client.stats()
+        print(f"MODBUS traffic generation stopped ({stats['requests']} requests, "
+              f"{stats['reads']} register reads, {stats['connects']} connections)")
     
     def start(self):
         """Start traffic generation"""
@@ -119,13 +110,266 @@ class ModbusTrafficGenerator:
             self.client.close()
         print("Traffic generator stopped")
 
+class AsyncModbusLoadGenerator:
+    """Many concurrent MODBUS TCP sessions with a configurable request mix and rate"""
+    
+    # MBAP header: transaction id, protocol id, length, unit id
+    MBAP = struct.Struct('>HHHB')
+    # Function code + two 16-bit fields (read: address/count, write single: address/value)
+    PDU_3 = struct.Struct('>BHH')
+    
+    def __init__(self, host="127.0.0.1", port=502, sessions=100, rate=0, duration=10,
+                 mix=None, block_size=5, registers=None, write_register=4, unit_id=1, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.sessions = sessions
+        self.rate = rate  # Total requests/s across all sessions, 0 = unlimited
+        self.duration = duration
+        self.block_size = block_size
+        self.registers = registers or [0, 1, 2, 3, 4]
+        self.write_register = write_register
+        self.unit_id = unit_id
+        self.timeout = timeout  # Seconds allowed for a connect or a response
+        
+        # Request mix as cumulative weights for O(log n) weighted choice
+        mix = mix or {'read_block': 70, 'read_single': 20, 'write': 10}
+        self.operations = [op for op, weight in mix.items() if weight > 0]
+        weights = [mix[op] for op in self.operations]
+        total = float(sum(weights))
+        self._cumulative = []
+        acc = 0.0
+        for weight in weights:
+            acc += weight / total
+            self._cumulative.append(acc)
+        
+        # Latencies in seconds per operation, compact C doubles
+        self.latencies = {op: array('d') for op in self.operations}
+        self.errors = {op: 0 for op in self.operations}
+        self.connect_errors = 0
+        self.timeouts = 0
+        self.completed = 0
+        self._stop_at = 0.0
+    
+    def _pick_operation(self):
+        return self.operations[min(bisect.bisect(self._cumulative, random.random()),
+                                   len(self.operations) - 1)]
+    
+    def _build_request(self, op, transaction_id):
+        """Encode one request frame"""
+        if op == 'read_block':
+            pdu = self.PDU_3.pack(3, self.registers[0], self.block_size)
+        elif op == 'read_single':
+            pdu = self.PDU_3.pack(3, random.choice(self.registers), 1)
+        else:
+            pdu = self.PDU_3.pack(6, self.write_register, random.randint(0, 100))
+        return self.MBAP.pack(transaction_id, 0, len(pdu) + 1, self.unit_id) + pdu
+    
+    async def _exchange(self, reader, writer, frame):
+        """Send one request and read back its complete response PDU"""
+        writer.write(frame)
+        header = await reader.readexactly(7)
+        _, _, length, _ = self.MBAP.unpack(header)
+        return await reader.readexactly(length - 1)
+    
+    async def _session(self, session_id, connect_limit):
+        """One client session: connect, then issue requests until the run ends"""
+        interval = self.sessions / self.rate if self.rate else 0.0
+        # Spread session start times over one interval so requests don't arrive in waves
+        next_send = time.perf_counter() + random.uniform(0, interval)
+        transaction_id = 0
+        writer = None
+        
+        while time.perf_counter() < self._stop_at:
+            try:
+                if writer is None:
+                    async with connect_limit:
+                        reader, writer = await asyncio.wait_for(
+                            asyncio.open_connection(self.host, self.port), self.timeout
+                        )
+                
+                if interval:
+                    delay = next_send - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    next_send += interval
+                
+                op = self._pick_operation()
+                transaction_id = (transaction_id + 1) & 0xffff
+                frame = self._build_request(op, transaction_id)
+                
+                start = time.perf_counter()
+                body = await asyncio.wait_for(self._exchange(reader, writer, frame), self.timeout)
+                elapsed = time.perf_counter() - start
+                
+                self.completed += 1
+                if body[0] & 0x80:
+                    # MODBUS exception response
+                    self.errors[op] += 1
+                else:
+                    self.latencies[op].append(elapsed)
+                    
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                else:
+                    self.connect_errors += 1
+                if writer is not None:
+                    writer.close()
+                writer = None
+                await asyncio.sleep(0.5)
+        
+        if writer is not None:
+            writer.close()
+    
+    async def _report_progress(self):
+        """Print throughput once per second while the run is active"""
+        last = 0
+        while time.perf_counter() < self._stop_at:
+            await asyncio.sleep(1)
+            print(f"  {self.completed - last} req/s, {self.completed} total, "
+                  f"{sum(self.errors.values())} exceptions, {self.connect_errors} connection errors, "
+                  f"{self.timeouts} timeouts")
+            last = self.completed
+    
+    async def run(self):
+        """Run the load test and return the summary"""
+        connect_limit = asyncio.Semaphore(256)  # Avoid SYN floods while ramping up sessions
+        self._stop_at = time.perf_counter() + self.duration
+        started = time.perf_counter()
+        
+        tasks = [asyncio.create_task(self._session(i, connect_limit)) for i in range(self.sessions)]
+        progress = asyncio.create_task(self._report_progress())
+        await asyncio.gather(*tasks)
+        progress.cancel()
+        
+        return self.summary(time.perf_counter() - started)
+    
+    @staticmethod
+    def _percentile(sorted_values, q):
+        if not sorted_values:
+            return None
+        index = max(0, math.ceil(q * len(sorted_values)) - 1)
+        return sorted_values[index] * 1000  # ms
+    
+    def summary(self, elapsed):
+        """Throughput and latency percentiles per operation and overall"""
+        def stats(values):
+            values = sorted(values)
+            return {
+                'count': len(values),
+                'p50_ms': self._percentile(values, 0.50),
+                'p99_ms': self._percentile(values, 0.99),
+                'p999_ms': self._percentile(values, 0.999),
+                'max_ms': values[-1] * 1000 if values else None,
+            }
+        
+        all_latencies = array('d')
+        for values in self.latencies.values():
+            all_latencies.extend(values)
+        
+        return {
+            'target': f"{self.host}:{self.port}",
+            'sessions': self.sessions,
+            'duration_s': round(elapsed, 3),
+            'requests': self.completed,
+            'throughput_rps': round(self.completed / elapsed, 1) if elapsed else 0.0,
+            'exceptions': sum(self.errors.values()),
+            'connection_errors': self.connect_errors,
+            'timeouts': self.timeouts,
+            'latency': stats(all_latencies),
+            'operations': {
+                op: dict(stats(values), exceptions=self.errors[op])
+                for op, values in self.latencies.items()
+            },
+        }
+
+
+def _raise_open_file_limit(sessions):
+    """Each session needs a socket, raise the soft descriptor limit if we can"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = sessions + 64
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            new_soft = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+            if new_soft < wanted:
+                print(f"Warning: open file limit {new_soft} is below {wanted}, some sessions will fail")
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _parse_mix(text):
+    """Parse 'read_block=70,read_single=20,write=10' into a weight dict"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ('read_block', 'read_single', 'write'):
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def run_load_test(args):
+    """Run the asyncio load mode and print its report"""
+    _raise_open_file_limit(args.sessions)
+    
+    generator = AsyncModbusLoadGenerator(
+        host=args.host, port=args.port, sessions=args.sessions, rate=args.rate,
+        duration=args.duration, mix=args.mix, block_size=args.block_size, timeout=args.timeout
+    )
+    
+    print("MODBUS TCP Load Test")
+    print("=" * 40)
+    print(f"Target: {args.host}:{args.port}")
+    print(f"Sessions: {args.sessions}, rate: {args.rate or 'unlimited'} req/s, duration: {args.duration}s")
+    print(f"Request mix: {args.mix}")
+    print("=" * 40)
+    
+    summary = asyncio.run(generator.run())
+    
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        latency = summary['latency']
+        print("=" * 40)
+        print(f"Requests: {summary['requests']} in {summary['duration_s']}s "
+              f"({summary['throughput_rps']} req/s)")
+        print(f"Exceptions: {summary['exceptions']}, connection errors: {summary['connection_errors']}, "
+              f"timeouts: {summary['timeouts']}")
+        if latency['count']:
+            print(f"Latency p50 {latency['p50_ms']:.3f} ms, p99 {latency['p99_ms']:.3f} ms, "
+                  f"p999 {latency['p999_ms']:.3f} ms, max {latency['max_ms']:.3f} ms")
+        for op, stats in summary['operations'].items():
+            if stats['count']:
+                print(f"  {op}: {stats['count']} ok, {stats['exceptions']} exceptions, "
+                      f"p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, "
+                      f"p999 {stats['p999_ms']:.3f} ms")
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description='MODBUS TCP Traffic Generator')
     parser.add_argument('--host', default='192.168.20.192', help='MODBUS server host')
     parser.add_argument('--port', type=int, default=502, help='MODBUS server port')
+    parser.add_argument('--load', action='store_true',
+                        help='Run a high-concurrency load test instead of the Wireshark traffic loop')
+    parser.add_argument('--sessions', type=int, default=100, help='Load test: concurrent TCP sessions')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='Load test: total requests/s across all sessions (0 = unlimited)')
+    parser.add_argument('--duration', type=float, default=10, help='Load test: duration in seconds')
+    parser.add_argument('--mix', type=_parse_mix, default='read_block=70,read_single=20,write=10',
+                        help='Load test: request mix weights (read_block, read_single, write)')
+    parser.add_argument('--block-size', type=int, default=5, help='Load test: registers per block read')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Load test: connect/response timeout (s)')
+    parser.add_argument('--json', action='store_true', help='Load test: print the report as JSON')
     
     args = parser.parse_args()
     
+    if args.load:
+        return run_load_test(args)
+    
     # Create traffic generator
     generator = ModbusTrafficGenerator(host=args.host, port=args.port)
     
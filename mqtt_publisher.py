@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+MQTT Sensor Publisher
+Simulates the auxiliary engine sensors the dashboard shows (exhaust, lube oil,
+cooling water, turbocharger) and publishes them to an MQTT broker. The
+simulation thread only hands over the latest values; a publisher thread
+serializes and sends them, coalescing ticks whenever the broker falls behind
+or is unreachable, so a slow or missing broker never stalls a tick.
+"""
+
+import json
+import threading
+import time
+
+import numpy as np
+
+from engine_logging import get_logger
+
+# paho-mqtt, imported by the first publisher start so the sensor model loads without it
+mqtt = None
+
+logger = get_logger('mqtt')
+
+# Sensor name -> unit, in the order of the rows returned by simulate_sensors
+SENSOR_UNITS = {
+    'exhaust_temp': '°C',
+    'lube_oil_pressure': 'bar',
+    'cooling_water_temp': '°C',
+    'turbocharger_speed': 'rpm',
+}
+
+# Stopped engine readings per sensor row: base + noise * scale
+_IDLE_BASE = np.array([50, 0.5, 20, 0], dtype=np.float64)
+_IDLE_NOISE = np.array([2, 0.05, 0.5, 0], dtype=np.float64)
+
+
+def simulate_sensors(running, rpm, load, temp, rng):
+    """Sensor readings for one engine or a whole fleet (NumPy arrays in, rows out)
+
+    Stopped engines sit near ambient, running ones follow speed and load.
+    """
+    running = np.asarray(running, dtype=bool)
+    rpm = np.asarray(rpm, dtype=np.float64)
+    load = np.asarray(load, dtype=np.float64)
+    temp = np.asarray(temp, dtype=np.float64)
+    noise = rng.standard_normal((4,) + rpm.shape)
+
+    readings = np.stack((
+        250 + load * 1.8 + noise[0] * 5,               # exhaust_temp
+        2.5 + rpm / 1200 * 2.5 + noise[1] * 0.1,       # lube_oil_pressure
+        temp * 0.85 + noise[2],                        # cooling_water_temp
+        rpm * 80 + load * 250 + noise[3] * 500,        # turbocharger_speed
+    ))
+    if not running.all():
+        # Idle readings only computed while some engine is stopped
+        axes = (4,) + (1,) * rpm.ndim
+        idle = noise * _IDLE_NOISE.reshape(axes) + _IDLE_BASE.reshape(axes)
+        readings = np.where(running, readings, idle)
+    np.maximum(readings[3:], 0, out=readings[3:])
+    return np.round(readings, 2, out=readings)
+
+
+def sensor_readings(values):
+    """{name: {'value', 'unit'}} for one engine's readings, the shape dashboards expect"""
+    return {name: {'value': float(value), 'unit': unit} for (name, unit), value in zip(SENSOR_UNITS.items(), values)}
+
+
+def sensor_payload(values, timestamp):
+    """MQTT message body for one engine's readings"""
+    return {'timestamp': timestamp, 'sensors': sensor_readings(values)}
+
+
+def _import_paho():
+    """The paho-mqtt client module, None when the optional dependency isn't installed"""
+    global mqtt
+    if mqtt is None:
+        try:
+            import paho.mqtt.client as mqtt
+        except ImportError:
+            return None
+    return mqtt
+
+
+def _create_client(client_id):
+    """paho-mqtt client for both the 1.x and 2.x callback APIs"""
+    if hasattr(mqtt, 'CallbackAPIVersion'):
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+    return mqtt.Client(client_id=client_id)
+
+
+class MqttSensorPublisher:
+    def __init__(self, host='localhost', port=1883, topic_prefix='engine', qos=0,
+                 client_id='engine-simulator', keepalive=30, username=None, password=None):
+        """Initialize the publisher (not connected yet)"""
+        if qos not in (0, 1, 2):
+            raise ValueError("MQTT QoS must be 0, 1 or 2")
+        self.host = host
+        self.port = port
+        self.topic_prefix = topic_prefix.rstrip('/')
+        self.qos = qos
+        self.client_id = client_id
+        self.keepalive = keepalive
+        self.username = username
+        self.password = password
+
+        self.connected = threading.Event()
+        self.published = 0   # Messages handed to the MQTT client
+        self.dropped = 0     # Messages refused because the client's QoS 1/2 queue was full
+        self.coalesced = 0   # Ticks replaced by a newer one before they were sent
+
+        self._client = None
+        self._thread = None
+        self._running = False
+        # Latest tick not yet published: (timestamp, engine readings, fleet readings)
+        self._pending = None
+        self._wakeup = threading.Condition()
+
+    def start(self):
+        """Connect in the background and start the publisher thread, returns False without paho-mqtt"""
+        if _import_paho() is None:
+            print("✗ MQTT publisher unavailable: paho-mqtt is not installed")
+            return False
+
+        client = self._client = _create_client(self.client_id)
+        if self.username:
+            client.username_pw_set(self.username, self.password)
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.reconnect_delay_set(min_delay=1, max_delay=30)
+        # QoS 1/2 messages wait for acknowledgement, allow a fleet's worth in flight
+        client.max_inflight_messages_set(1000)
+        client.max_queued_messages_set(10000)
+
+        # connect_async returns immediately, the network loop thread connects and reconnects
+        client.connect_async(self.host, self.port, keepalive=self.keepalive)
+        client.loop_start()
+
+        self._running = True
+        self._thread = threading.Thread(target=self._publish_loop, name='mqtt-publisher', daemon=True)
+        self._thread.start()
+        print(f"✓ MQTT publisher started for {self.host}:{self.port} (topic prefix '{self.topic_prefix}', "
+              f"QoS {self.qos})")
+        return True
+
+    def stop(self):
+        """Stop publishing and disconnect"""
+        if not self._running:
+            return
+        self._running = False
+        with self._wakeup:
+            self._wakeup.notify()
+        self._thread.join(timeout=2)
+        self._client.disconnect()
+        self._client.loop_stop()
+        print("MQTT publisher stopped")
+
+    def publish(self, timestamp, engine, fleet=None):
+        """Hand over one tick of readings (called from the simulation thread, never blocks on I/O)
+
+        engine is one reading per sensor, fleet (optional) a sensors x engines array.
+        """
+        with self._wakeup:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (timestamp, engine, fleet)
+            self._wakeup.notify()
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
+        if reason_code == 0:
+            self.connected.set()
+            logger.info(f"Connected to MQTT broker {self.host}:{self.port}", extra={'event': 'mqtt'})
+            with self._wakeup:
+                self._wakeup.notify()
+        else:
+            logger.warning(f"MQTT broker refused connection: {reason_code}", extra={'event': 'mqtt'})
+
+    def _on_disconnect(self, client, userdata, *args):
+        # paho 1.x passes (rc), 2.x passes (flags, reason_code, properties)
+        if self.connected.is_set():
+            logger.warning("Disconnected from MQTT broker, reconnecting in the background",
+                           extra={'event': 'mqtt'})
+        self.connected.clear()
+
+    def _publish_loop(self):
+        """Send the most recent tick whenever one is waiting and the broker is connected"""
+        while True:
+            with self._wakeup:
+                while self._running and (self._pending is None or not self.connected.is_set()):
+                    self._wakeup.wait(1.0)
+                if not self._running:
+                    return
+                timestamp, engine, fleet = self._pending
+                self._pending = None
+
+            try:
+                self._send(timestamp, engine, fleet)
+            except Exception as e:
+                logger.error(f"Error publishing MQTT sensors: {e}", extra={'event': 'mqtt'})
+                time.sleep(1)
+
+    def _send(self, timestamp, engine, fleet):
+        """One retained message per engine carrying all of its sensors"""
+        messages = [(f"{self.topic_prefix}/sensors", sensor_payload(engine, timestamp))]
+        if fleet is not None:
+            # Columns are engines, convert to Python floats in one call
+            messages.extend(
+                (f"{self.topic_prefix}/fleet/{index}/sensors", sensor_payload(values, timestamp))
+                for index, values in enumerate(fleet.T.tolist())
+            )
+
+        client = self._client
+        qos = self.qos
+        for position, (topic, payload) in enumerate(messages):
+            info = client.publish(topic, json.dumps(payload), qos=qos, retain=True)
+            if info.rc == mqtt.MQTT_ERR_QUEUE_SIZE:
+                # Broker is behind on acknowledgements, the next tick supersedes the rest
+                self.dropped += len(messages) - position
+                messages = messages[:position]
+                break
+        self.published += len(messages)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Register Timeline Recording
+Compact binary, memory-mapped recordings of the register values committed
+every tick. Each tick is one fixed-size row (timestamp + uint16 words), so
+replay indexes straight into the mapped file without parsing samples.
+
+File layout (little endian):
+    header   magic b'ENGREC02', uint32 segment count, uint64 row count,
+             float64 update interval, then (uint32 space, uint32 address,
+             uint32 count) per register segment, padded to a multiple of 8 bytes
+    rows     float64 timestamp, uint16 words of every segment in order
+
+A segment's space is an index into register_schema.SPACES (holding, input,
+coil), coils are recorded as one 0/1 word each. ENGREC01 recordings (holding
+segments without a space) are still replayed.
+"""
+
+import struct
+
+import numpy as np
+
+from register_schema import SPACES
+
+MAGIC = b'ENGREC02'
+_HEADER = struct.Struct('<8sIQd')
+_SEGMENT = struct.Struct('<III')
+# First format version, holding register segments of (address, count)
+_MAGIC_V1 = b'ENGREC01'
+_SEGMENT_V1 = struct.Struct('<II')
+_ROW_COUNT_OFFSET = 12  # Offset of the row count within the header
+
+# Rows added to the file each time the recorder runs out of space
+GROW_ROWS = 4096
+
+
+def _header_size(segment_count, segment=_SEGMENT):
+    size = _HEADER.size + segment_count * segment.size
+    return (size + 7) // 8 * 8
+
+
+def _row_dtype(word_count):
+    return np.dtype([('time', '<f8'), ('words', '<u2', (word_count,))])
+
+
+class RegisterRecorder:
+    def __init__(self, path, segments, interval):
+        """Create a recording of the given (space, address, count) register segments"""
+        self.path = str(path)
+        self.segments = [(space, int(address), int(count)) for space, address, count in segments]
+        self.interval = float(interval)
+        self.word_count = sum(count for _, _, count in self.segments)
+        self.dtype = _row_dtype(self.word_count)
+        self.header_size = _header_size(len(self.segments))
+
+        # Column slice of each segment within a row's words
+        self._slices = []
+        start = 0
+        for _, _, count in self.segments:
+            self._slices.append(slice(start, start + count))
+            start += count
+
+        header = _HEADER.pack(MAGIC, len(self.segments), 0, self.interval)
+        header += b''.join(_SEGMENT.pack(SPACES.index(space), address, count)
+                           for space, address, count in self.segments)
+        with open(self.path, 'wb') as f:
+            f.write(header.ljust(self.header_size, b'\0'))
+
+        self.rows = 0
+        self._capacity = 0
+        self._map = None
+        self._header = np.memmap(self.path, dtype=np.uint8, mode='r+', shape=(self.header_size,))
+        self._row_count = self._header[_ROW_COUNT_OFFSET:_ROW_COUNT_OFFSET + 8].view('<u8')
+        self._grow()
+
+    def _grow(self):
+        """Extend the file by GROW_ROWS rows and map it again"""
+        if self._map is not None:
+            self._map.flush()
+            del self._map, self._times, self._words
+        self._capacity += GROW_ROWS
+        with open(self.path, 'r+b') as f:
+            f.truncate(self.header_size + self._capacity * self.dtype.itemsize)
+        self._map = np.memmap(self.path, dtype=self.dtype, mode='r+',
+                              offset=self.header_size, shape=(self._capacity,))
+        self._times = self._map['time']
+        self._words = self._map['words']
+
+    def append(self, timestamp, *segment_words):
+        """Store one tick, one sequence of words per segment"""
+        if self.rows == self._capacity:
+            self._grow()
+        index = self.rows
+        self._times[index] = timestamp
+        words = self._words[index]
+        for columns, values in zip(self._slices, segment_words):
+            words[columns] = values
+        self.rows += 1
+        # Row count goes last, a reader never sees a half-written row
+        self._row_count[0] = self.rows
+
+    def close(self):
+        """Trim the preallocated tail and flush the mapping"""
+        if self._map is None:
+            return
+        self._map.flush()
+        self._header.flush()
+        del self._map, self._times, self._words, self._row_count, self._header
+        self._map = None
+        with open(self.path, 'r+b') as f:
+            f.truncate(self.header_size + self.rows * self.dtype.itemsize)
+
+
+class RegisterRecording:
+    def __init__(self, path):
+        """Open a recording for replay, rows are read straight from the mapping"""
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            magic, segment_count, rows, interval = _HEADER.unpack(f.read(_HEADER.size))
+            if magic == MAGIC:
+                segment = _SEGMENT
+                self.segments = [(SPACES[space], address, count) for space, address, count in
+                                 (_SEGMENT.unpack(f.read(_SEGMENT.size)) for _ in range(segment_count))]
+            elif magic == _MAGIC_V1:
+                segment = _SEGMENT_V1
+                self.segments = [('holding', address, count) for address, count in
+                                 (_SEGMENT_V1.unpack(f.read(_SEGMENT_V1.size)) for _ in range(segment_count))]
+            else:
+                raise ValueError(f"{self.path} is not an engine register recording")
+
+        self.interval = interval
+        self.word_count = sum(count for _, _, count in self.segments)
+        self.header_size = _header_size(segment_count, segment)
+        self.rows = rows
+
+        if rows:
+            self._map = np.memmap(self.path, dtype=_row_dtype(self.word_count), mode='r',
+                                  offset=self.header_size, shape=(rows,))
+        else:
+            self._map = np.zeros(0, dtype=_row_dtype(self.word_count))
+        self.times = self._map['time']
+        self.words = self._map['words']
+
+    def __len__(self):
+        return self.rows
+
+    def segment_words(self, index):
+        """(space, address, words) of every segment for row `index`, as views into the mapping"""
+        words = self.words[index]
+        start = 0
+        segments = []
+        for space, address, count in self.segments:
+            segments.append((space, address, words[start:start + count]))
+            start += count
+        return segments
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Register Schema Compiler
+Turns the `registers` config section into packers that encode simulator
+signals into MODBUS holding registers, input registers and coils. Every
+field's type, scale, byte order and word order is resolved once at startup
+into a byte index, so encoding a tick is one cast and one scatter per value
+type no matter how many signals the schema maps, for one engine or a whole
+fleet at once.
+
+A schema entry is either a plain holding register address (uint16) or a
+mapping with address, space, type, scale, source, byte_order and word_order.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Value type -> (big endian NumPy type, registers per value)
+TYPES = {
+    'uint16': ('>u2', 1),
+    'int16': ('>i2', 1),
+    'uint32': ('>u4', 2),
+    'int32': ('>i4', 2),
+    'float32': ('>f4', 2),
+}
+SPACES = ('holding', 'input', 'coil')
+ORDERS = ('big', 'little')
+
+RegisterField = namedtuple(
+    'RegisterField', 'name space address type scale source byte_order word_order words'
+)
+
+
+def _parse_field(name, entry, signals, default_scales):
+    """RegisterField for one schema entry, ValueError on anything invalid"""
+    if isinstance(entry, int):
+        entry = {'address': entry, 'scale': default_scales.get(name, 1)}
+    if not isinstance(entry, dict) or 'address' not in entry:
+        raise ValueError(f"Register '{name}' needs an address")
+
+    space = entry.get('space', 'holding')
+    value_type = entry.get('type', 'uint16')
+    source = entry.get('source', name)
+    byte_order = entry.get('byte_order', 'big')
+    word_order = entry.get('word_order', 'big')
+    if space not in SPACES:
+        raise ValueError(f"Register '{name}': space must be one of {', '.join(SPACES)}")
+    if value_type not in TYPES:
+        raise ValueError(f"Register '{name}': type must be one of {', '.join(TYPES)}")
+    if source not in signals:
+        raise ValueError(f"Register '{name}': unknown source '{source}', expected one of {', '.join(signals)}")
+    if byte_order not in ORDERS or word_order not in ORDERS:
+        raise ValueError(f"Register '{name}': byte_order and word_order must be 'big' or 'little'")
+
+    words = 1 if space == 'coil' else TYPES[value_type][1]
+    address = int(entry['address'])
+    if not 0 <= address <= 0x10000 - words:
+        raise ValueError(f"Register '{name}': address {address} is outside the MODBUS address space")
+    scale = float(entry.get('scale', 1))
+    if scale == 0 or not np.isfinite(scale):
+        raise ValueError(f"Register '{name}': scale must be a non-zero number")
+    return RegisterField(name, space, address, value_type, scale, source, byte_order, word_order, words)
+
+
+class RegisterBlock:
+    def __init__(self, fields, signals):
+        """Packer for the contiguous register range covering `fields` (one space)
+
+        Values are laid out as big endian bytes, the precomputed destination of
+        each byte applies the field's position, word order and byte order.
+        """
+        self.fields = sorted(fields, key=lambda field: field.address)
+        self.signal_count = len(signals)
+        self.base = self.fields[0].address
+        self.span = max(field.address + field.words for field in self.fields) - self.base
+
+        occupied = set()
+        for field in self.fields:
+            taken = set(range(field.address, field.address + field.words))
+            if occupied & taken:
+                raise ValueError(f"Register '{field.name}' overlaps another {field.space} register")
+            occupied |= taken
+        self.gaps = self.span - len(occupied)
+
+        self._sources = np.array([signals.index(field.source) for field in self.fields], dtype=np.intp)
+        self._scales = np.array([field.scale for field in self.fields], dtype=np.float64)
+
+        # One group per value type: (field rows, dtype, clip range, destination byte of every encoded byte)
+        self._groups = []
+        for value_type, (dtype, words) in TYPES.items():
+            rows = [row for row, field in enumerate(self.fields) if field.type == value_type]
+            if not rows:
+                continue
+            destinations = []
+            for row in rows:
+                field = self.fields[row]
+                offset = field.address - self.base
+                for i in range(words * 2):
+                    word, byte = divmod(i, 2)
+                    if field.word_order == 'little':
+                        word = words - 1 - word
+                    if field.byte_order == 'little':
+                        byte = 1 - byte
+                    destinations.append((offset + word) * 2 + byte)
+            dtype = np.dtype(dtype)
+            limits = None if dtype.kind == 'f' else (np.iinfo(dtype).min, np.iinfo(dtype).max)
+            self._groups.append((np.array(rows, dtype=np.intp), dtype, limits,
+                                 np.array(destinations, dtype=np.intp)))
+
+    def encode(self, signals):
+        """Register words for one signal vector, or one row per column of a signals x engines matrix"""
+        signals = np.asarray(signals, dtype=np.float64)
+        single = signals.ndim == 1
+        values = signals.reshape(signals.shape[0], -1)[self._sources] * self._scales[:, None]
+
+        wire = np.zeros((values.shape[1], self.span * 2), dtype=np.uint8)
+        for rows, dtype, limits, destinations in self._groups:
+            group = values[rows].T
+            if limits:
+                # Integer types truncate like int() and saturate instead of wrapping
+                group = np.clip(group, *limits)
+            wire[:, destinations] = group.astype(dtype, order='C').view(np.uint8).reshape(len(wire), -1)
+
+        words = wire.view('>u2')
+        return words[0] if single else words
+
+    def decode(self, words):
+        """Scaled field values (in field order) from register words, the inverse of encode
+
+        A matrix of one block per row (e.g. every fleet engine) decodes to
+        fields x blocks.
+        """
+        words = np.asarray(words, dtype='>u2')
+        single = words.ndim == 1
+        wire = np.ascontiguousarray(words.reshape(-1, self.span)).view(np.uint8)
+        values = np.zeros((len(self.fields), len(wire)), dtype=np.float64)
+        for rows, dtype, limits, destinations in self._groups:
+            values[rows] = np.ascontiguousarray(wire[:, destinations]).view(dtype).T
+        values /= self._scales[:, None]
+        return values[:, 0] if single else values
+
+
+class CoilBlock:
+    def __init__(self, fields, signals):
+        """Coils are set while their source signal is non-zero"""
+        self.fields = sorted(fields, key=lambda field: field.address)
+        for previous, field in zip(self.fields, self.fields[1:]):
+            if field.address == previous.address:
+                raise ValueError(f"Register '{field.name}' overlaps another coil register")
+        self.base = self.fields[0].address
+        self.span = self.fields[-1].address - self.base + 1
+        self._sources = np.array([signals.index(field.source) for field in self.fields], dtype=np.intp)
+        self._offsets = np.array([field.address - self.base for field in self.fields], dtype=np.intp)
+
+    def encode(self, signals):
+        bits = np.zeros(self.span, dtype=bool)
+        bits[self._offsets] = np.asarray(signals)[self._sources] != 0
+        return bits.tolist()
+
+
+class RegisterSchema:
+    def __init__(self, registers, signals, default_scales=None):
+        """Compile the `registers` config mapping against the ordered signal names
+
+        default_scales applies to plain address entries, for register maps
+        written before the schema supported scale factors.
+        """
+        signals = list(signals)
+        self.signals = tuple(signals)
+        self.fields = [_parse_field(name, entry, signals, default_scales or {})
+                       for name, entry in registers.items()]
+
+        by_space = {space: [field for field in self.fields if field.space == space] for space in SPACES}
+        self.holding = RegisterBlock(by_space['holding'], signals) if by_space['holding'] else None
+        self.input = RegisterBlock(by_space['input'], signals) if by_space['input'] else None
+        self.coils = CoilBlock(by_space['coil'], signals) if by_space['coil'] else None
+
+        self.sources = frozenset(field.source for field in self.fields)
+
+    def field(self, name):
+        for field in self.fields:
+            if field.name == name:
+                return field
+        raise KeyError(name)
+
+    def address(self, name):
+        """First address of a named register"""
+        return self.field(name).address
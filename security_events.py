@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Security Event Store
+Bounded in-memory ring of recent security events backed by an append-only
+SQLite (WAL) database, indexed by time, event type and client. Database
+writes are batched by a background thread so MODBUS handlers never wait on disk.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from engine_logging import get_logger
+
+logger = get_logger('security')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS security_events (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    event TEXT NOT NULL,
+    description TEXT,
+    risk_level TEXT,
+    client TEXT,
+    function_code INTEGER,
+    register INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_security_events_time ON security_events (timestamp);
+CREATE INDEX IF NOT EXISTS idx_security_events_event ON security_events (event, id);
+CREATE INDEX IF NOT EXISTS idx_security_events_client ON security_events (client, id);
+"""
+
+COLUMNS = ('id', 'timestamp', 'event', 'description', 'risk_level', 'client', 'function_code', 'register')
+
+# Filters accepted by query(), mapped to their SQL condition
+FILTERS = {
+    'event': 'event = ?',
+    'client': 'client = ?',
+    'risk_level': 'risk_level = ?',
+    'start': 'timestamp >= ?',
+    'end': 'timestamp <= ?',
+    'before': 'id < ?',
+}
+
+
+class SecurityEventStore:
+    def __init__(self, database=None, capacity=10000, queue_size=100000):
+        """Open (or create) the event database, database=None keeps events in memory only"""
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("Security event capacity must be at least 1")
+
+        self._recent = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self.dropped = 0  # Events that never reached the database (writer queue full)
+
+        self.database = str(database) if database else None
+        self._db = None        # Writer connection, only used by the writer thread
+        self._reader = None    # Shared by HTTP handler threads under _read_lock
+        self._read_lock = threading.Lock()
+        self._writer = None
+        self._pending = queue.Queue(maxsize=queue_size)
+        last_id = 0
+
+        if self.database:
+            self._db = self._connect()
+            self._db.executescript(SCHEMA)
+            last_id = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM security_events").fetchone()[0]
+            self._reader = self._connect()
+            self._writer = threading.Thread(target=self._write_loop, name='security-event-writer', daemon=True)
+            self._writer.start()
+
+        # Ids keep counting from the last persisted event, so cursors stay valid across restarts
+        self._next_id = last_id + 1
+
+    def _connect(self):
+        connection = sqlite3.connect(self.database, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def __len__(self):
+        """Total events recorded, including those already persisted by earlier runs"""
+        return self._next_id - 1
+
+    def record(self, event, description, risk_level, client=None, function_code=None, register=None,
+               timestamp=None):
+        """Store one event (O(1), never touches the disk)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            row = (self._next_id, timestamp, event, description, risk_level, client, function_code, register)
+            self._next_id += 1
+            self._recent.append(row)
+
+        if self._writer is not None:
+            try:
+                self._pending.put_nowait(row)
+            except queue.Full:
+                self.dropped += 1
+
+    def _write_loop(self):
+        """Batch pending events into one transaction per wakeup"""
+        while True:
+            row = self._pending.get()
+            if row is None:
+                break
+            batch = [row]
+            stop = False
+            while len(batch) < 5000:
+                try:
+                    row = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+
+            try:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    f"INSERT OR IGNORE INTO security_events ({', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(COLUMNS))})", batch
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                logger.error(f"Error writing security events: {e}", extra={'event': 'security_store'})
+                self.dropped += len(batch)
+            if stop:
+                break
+
+    def query(self, event=None, client=None, risk_level=None, start=None, end=None, before=None, limit=100):
+        """Newest-first page of events matching every given filter
+
+        `before` is the cursor returned as next_cursor by the previous page.
+        """
+        limit = max(1, min(int(limit), 1000))
+        filters = {'event': event, 'client': client, 'risk_level': risk_level,
+                   'start': start, 'end': end, 'before': before}
+        filters = {name: value for name, value in filters.items() if value is not None}
+
+        if self._reader is not None:
+            rows = self._query_database(filters, limit + 1)
+        else:
+            rows = self._query_recent(filters, limit + 1)
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'events': [self._to_dict(row) for row in rows],
+            'next_cursor': rows[-1][0] if more else None,
+            'total': len(self),
+        }
+
+    def _query_database(self, filters, limit):
+        where = ' AND '.join(FILTERS[name] for name in filters) or '1'
+        sql = (f"SELECT {', '.join(COLUMNS)} FROM security_events "
+               f"WHERE {where} ORDER BY id DESC LIMIT ?")
+        params = list(filters.values()) + [limit]
+
+        with self._read_lock:
+            # One read transaction, so the persisted boundary matches the rows we get back
+            self._reader.execute("BEGIN")
+            try:
+                persisted = self._reader.execute("SELECT COALESCE(MAX(id), 0) FROM security_events").fetchone()[0]
+                rows = self._reader.execute(sql, params).fetchall()
+            finally:
+                self._reader.execute("COMMIT")
+
+        # Events still waiting for the writer are only in the ring, and always newer than the database
+        with self._lock:
+            recent = list(self._recent)
+        unsaved = [row for row in self._query_rows(recent, filters, limit) if row[0] > persisted]
+        return (unsaved + rows)[:limit]
+
+    def _query_recent(self, filters, limit):
+        with self._lock:
+            recent = list(self._recent)
+        return self._query_rows(recent, filters, limit)
+
+    @staticmethod
+    def _query_rows(rows, filters, limit):
+        """Apply query filters to in-memory rows, newest first"""
+        event = filters.get('event')
+        client = filters.get('client')
+        risk_level = filters.get('risk_level')
+        start = filters.get('start')
+        end = filters.get('end')
+        before = filters.get('before')
+
+        matches = []
+        for row in reversed(rows):
+            if before is not None and row[0] >= before:
+                continue
+            if start is not None and row[1] < start:
+                continue
+            if end is not None and row[1] > end:
+                continue
+            if event is not None and row[2] != event:
+                continue
+            if risk_level is not None and row[4] != risk_level:
+                continue
+            if client is not None and row[5] != client:
+                continue
+            matches.append(row)
+            if len(matches) >= limit:
+                break
+        return matches
+
+    @staticmethod
+    def _to_dict(row):
+        event = dict(zip(COLUMNS, row))
+        event['timestamp'] = datetime.fromtimestamp(row[1]).isoformat()
+        return event
+
+    def close(self):
+        """Write out every pending event and close the database"""
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
+        if self._db is not None:
+            with self._read_lock:
+                self._reader.close()
+                self._reader = None
+            self._db.close()
+            self._db = None
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Multi-core MODBUS Serving
+The simulation process keeps the holding registers, input registers and coils
+in a shared-memory bank guarded by a seqlock. Worker processes listen on the same MODBUS port
+(SO_REUSEPORT, the kernel spreads connections across them) and read registers
+straight from shared memory, so reads scale across cores without IPC.
+Writes received by a worker are forwarded to the simulation process, which
+applies them through its own data handler so security hooks still fire.
+"""
+
+import multiprocessing
+import signal
+import socket
+import socketserver
+import threading
+import time
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+from pyModbusTCP.server import DataBank, ModbusServer
+
+from async_modbus_server import AsyncModbusServer
+from engine_logging import get_logger
+
+logger = get_logger('sharding')
+
+REGISTERS = 0x10000  # Addresses per space
+# uint64 sequence counter, then holding registers, input registers (uint16) and coils (uint8)
+_HOLDING_OFFSET = 8
+_INPUT_OFFSET = _HOLDING_OFFSET + REGISTERS * 2
+_COILS_OFFSET = _INPUT_OFFSET + REGISTERS * 2
+_SHM_SIZE = _COILS_OFFSET + REGISTERS
+
+
+class SharedRegisterBank(DataBank):
+    def __init__(self, name=None, forward=None):
+        """Holding registers, input registers and coils in shared memory, name=None creates a new segment
+
+        The creator is the single writer. Worker processes attach by name and
+        pass a `forward` queue: their client writes are queued for the writer
+        instead of touching shared memory. Discrete inputs stay process-local
+        as in a plain DataBank.
+        """
+        super().__init__(coils_size=0, h_regs_size=0, i_regs_size=0)
+        self.coils_size = self.h_regs_size = self.i_regs_size = REGISTERS
+        self.owner = name is None
+        self.forward = forward
+
+        self._shm = shared_memory.SharedMemory(name=name, create=self.owner, size=_SHM_SIZE if self.owner else 0)
+        self.name = self._shm.name
+        buf = self._shm.buf
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=buf)
+        self._regs = np.ndarray((REGISTERS,), dtype=np.uint16, buffer=buf, offset=_HOLDING_OFFSET)
+        self._input_regs = np.ndarray((REGISTERS,), dtype=np.uint16, buffer=buf, offset=_INPUT_OFFSET)
+        self._coil_bits = np.ndarray((REGISTERS,), dtype=np.uint8, buffer=buf, offset=_COILS_OFFSET)
+        self._write_lock = threading.Lock()
+
+    def _read(self, space, address, number):
+        """Consistent copy of a range, retried while the writer is mid-update"""
+        if address < 0 or address + number > REGISTERS:
+            return None
+        seq = self._seq
+        while True:
+            before = int(seq[0])
+            if before & 1:
+                # Odd sequence: a write is in progress
+                time.sleep(0)
+                continue
+            values = space[address:address + number].tolist()
+            if int(seq[0]) == before:
+                return values
+
+    def _write(self, space, address, values):
+        """Store a range as the single writer, readers retry instead of seeing it half done"""
+        with self._write_lock:
+            self._seq[0] += 1
+            space[address:address + len(values)] = values
+            self._seq[0] += 1
+
+    def _forward_write(self, kind, address, values, srv_info):
+        """Queue a worker's client write for the writer process"""
+        if self.forward is None or srv_info is None:
+            return None
+        self.forward.put((
+            kind, address, values, srv_info.client.address,
+            srv_info.recv_frame.pdu.func_code, srv_info.recv_frame.mbap.unit_id
+        ))
+        return True
+
+    def get_holding_registers(self, address, number=1, srv_info=None):
+        return self._read(self._regs, address, number)
+
+    def get_input_registers(self, address, number=1, srv_info=None):
+        return self._read(self._input_regs, address, number)
+
+    def get_coils(self, address, number=1, srv_info=None):
+        bits = self._read(self._coil_bits, address, number)
+        return None if bits is None else [bool(bit) for bit in bits]
+
+    def set_holding_registers(self, address, word_list, srv_info=None):
+        """Write registers (writer), or forward a client write to the writer (worker)"""
+        if address < 0 or address + len(word_list) > REGISTERS:
+            return None
+        if not self.owner:
+            return self._forward_write('holding', address, [int(w) & 0xffff for w in word_list], srv_info)
+        # One vectorized conversion instead of an int() per word
+        self._write(self._regs, address, np.asarray(word_list, dtype=np.int64) & 0xffff)
+        return True
+
+    def set_input_registers(self, address, word_list, srv_info=None):
+        """Write input registers, only the writer can (clients have no input register writes)"""
+        if not self.owner or address < 0 or address + len(word_list) > REGISTERS:
+            return None
+        self._write(self._input_regs, address, np.asarray(word_list, dtype=np.int64) & 0xffff)
+        return True
+
+    def set_coils(self, address, bit_list, srv_info=None):
+        """Write coils (writer), or forward a client write to the writer (worker)"""
+        if address < 0 or address + len(bit_list) > REGISTERS:
+            return None
+        if not self.owner:
+            return self._forward_write('coil', address, [bool(b) for b in bit_list], srv_info)
+        self._write(self._coil_bits, address, np.asarray(bit_list, dtype=bool))
+        return True
+
+    def close(self):
+        """Detach, the writer also removes the segment"""
+        del self._seq, self._regs, self._input_regs, self._coil_bits
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+def forwarded_srv_info(client, func_code, unit_id):
+    """Stand-in for pyModbusTCP's server info, carrying what the data handler hooks read"""
+    return SimpleNamespace(
+        client=SimpleNamespace(address=client, port=0),
+        recv_frame=SimpleNamespace(mbap=SimpleNamespace(unit_id=unit_id), pdu=SimpleNamespace(func_code=func_code)),
+    )
+
+
+def enable_reuse_port():
+    """Let every MODBUS listener in this process share its port (SO_REUSEPORT)"""
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise RuntimeError("Sharded MODBUS serving needs SO_REUSEPORT (Linux/BSD)")
+    # pyModbusTCP creates its listener from socketserver.ThreadingTCPServer
+    socketserver.ThreadingTCPServer.allow_reuse_port = True
+
+
+def _worker_main(shm_name, host, port, forward, ready, stop, engine):
+    """Worker process body: one MODBUS listener reading the shared bank"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The simulation process handles Ctrl+C
+    bank = SharedRegisterBank(shm_name, forward=forward)
+    if engine == 'asyncio':
+        server = AsyncModbusServer(host=host, port=port, data_bank=bank, reuse_port=True)
+    else:
+        enable_reuse_port()
+        server = ModbusServer(host=host, port=port, no_block=True, data_bank=bank)
+    server.start()
+    ready.set()
+    stop.wait()
+    server.stop()
+    bank.close()
+
+
+class ModbusWorkerPool:
+    def __init__(self, bank, host, port, workers, on_write, on_write_coils=None, engine='threaded'):
+        """N worker processes serving `bank`, on_write(address, words, srv_info) applies forwarded writes
+
+        on_write_coils(address, bits, srv_info) applies forwarded coil writes,
+        without it they are dropped. engine selects the workers' MODBUS server, 'threaded' (pyModbusTCP) or 'asyncio'.
+        """
+        self.bank = bank
+        self.host = host
+        self.port = port
+        self.workers = int(workers)
+        self.on_write = on_write
+        self.on_write_coils = on_write_coils
+        self.engine = engine
+
+        self._context = multiprocessing.get_context('spawn')  # Don't fork a threaded process
+        self._forward = self._context.Queue()
+        self._stop = self._context.Event()
+        self._processes = []
+        self._forwarder = None
+
+    def start(self, timeout=10):
+        """Spawn the workers, returns True once every one is listening"""
+        readies = []
+        for index in range(self.workers):
+            ready = self._context.Event()
+            process = self._context.Process(
+                target=_worker_main, name=f'modbus-worker-{index}', daemon=True,
+                args=(self.bank.name, self.host, self.port, self._forward, ready, self._stop, self.engine)
+            )
+            process.start()
+            self._processes.append(process)
+            readies.append(ready)
+
+        self._forwarder = threading.Thread(target=self._forward_loop, name='modbus-write-forwarder', daemon=True)
+        self._forwarder.start()
+
+        deadline = time.monotonic() + timeout
+        for ready, process in zip(readies, self._processes):
+            if not ready.wait(max(0.0, deadline - time.monotonic())):
+                print(f"✗ MODBUS worker {process.name} did not start")
+                return False
+        print(f"✓ {self.workers} MODBUS worker processes sharing port {self.port}")
+        return True
+
+    def stop(self):
+        """Stop the workers and the write forwarder"""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=3)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._forwarder:
+            self._forward.put(None)
+            self._forwarder.join(timeout=2)
+            self._forwarder = None
+
+    def _forward_loop(self):
+        """Apply client writes received by the workers, in arrival order"""
+        while True:
+            item = self._forward.get()
+            if item is None:
+                return
+            kind, address, values, client, func_code, unit_id = item
+            apply = self.on_write if kind == 'holding' else self.on_write_coils
+            if apply is None:
+                continue
+            try:
+                apply(address, values, forwarded_srv_info(client, func_code, unit_id))
+            except Exception as e:
+                logger.error(f"Error applying forwarded MODBUS write: {e}", extra={'event': 'modbus_write'})
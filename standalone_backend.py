@@ -5,113 +5,446 @@ This server runs independently and serves actual MODBUS TCP packets
 Can be deployed on separate machines (Linux VMs)
 """
 
+import copy
 import time
+from collections import deque
 import random
-import yaml
 import signal
 import sys
 import threading
+import numpy as np
+from operator import attrgetter
 from datetime import datetime
 from pathlib import Path
 from pyModbusTCP.server import ModbusServer
+from modbus_databank import BlockDataBank, WatchedDataHandler, UnitRouter
+from engine_fleet import EngineFleet, SIGNALS as FLEET_SIGNALS
+from engine_history import EngineHistory, HISTORY_FIELDS
+from security_events import SecurityEventStore
+from metrics import MetricsRegistry, TICK_BUCKETS
+from modbus_analytics import ModbusTrafficAnalyzer
+from mqtt_publisher import simulate_sensors, sensor_readings, SENSOR_UNITS
+from register_schema import RegisterSchema
+from engine_snapshot import EngineSnapshot, SnapshotChannel
+from api_encoding import (JSON, BINARY, CONTENT_TYPES, ENGINE_FIELDS, ENGINE_DTYPES, negotiate, select_fields,
+                          encode_table, encode_msgpack)
+from config_reload import ConfigWatcher, load_config
+from pyModbusTCP.constants import EXP_TXT
+from engine_logging import get_logger, setup_logging, reconfigure_logging, stop_logging
 import argparse
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import json
+import logging
+from urllib.parse import urlsplit, parse_qs
+
+logger = get_logger()
+
+# Fixed label values keep /metrics cardinality bounded
+HTTP_ROUTES = frozenset((
+    '/api/engine', '/api/status', '/api/fleet', '/api/history', '/api/security', '/api/analytics',
+    '/api/engine/start', '/api/engine/stop', '/metrics', '/healthz', '/readyz',
+))
+MODBUS_RESULTS = {code: 'ok' if not code else text.replace(' ', '_') for code, text in EXP_TXT.items()}
+# MODBUS clients labelled by address in /metrics by default, later ones are counted as 'other'
+MODBUS_CLIENT_LABELS = 20
+
+# Engine state attribute behind each engine signal, in the fleet's signal order
+ENGINE_SIGNALS = dict(zip(FLEET_SIGNALS, ('status', 'current_rpm', 'current_temp', 'current_fuel_flow', 'current_load')))
+# Every signal a register schema entry can map, engine state first, then the auxiliary sensors
+SIGNALS = FLEET_SIGNALS + tuple(SENSOR_UNITS)
+# Scale of plain address entries in register maps that predate the schema
+LEGACY_REGISTER_SCALES = {'fuel_flow': 100}
+# Config sections a reload applies to the running simulator, edits to any other section need a restart
+RELOADABLE_SECTIONS = frozenset(('engine', 'physics', 'simulation', 'registers', 'logging'))
+# The analytics keys a reload applies, window and sketch sizes are fixed at startup
+RELOADABLE_ANALYTICS = ('flood_requests', 'write_burst', 'scan_blocks', 'error_requests')
+# Encoded /api/engine and /api/fleet variants cached per tick
+REPRESENTATION_CACHE_SIZE = 64
+# Long-poll waits (?since=) in seconds, default and upper bound
+LONG_POLL_TIMEOUT = 30.0
+LONG_POLL_MAX_TIMEOUT = 120.0
+# Engine section values the engine models read, all required
+ENGINE_LIMITS = ('rpm_min', 'rpm_max', 'rpm_normal', 'temp_min', 'temp_max', 'temp_normal',
+                 'fuel_flow_min', 'fuel_flow_max', 'fuel_flow_normal', 'update_interval')
 
 class EngineDataHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections so polling dashboards don't reconnect every request
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes, don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    
+    def _metered_simulator(self):
+        """The simulator when /metrics instrumentation is enabled, else None"""
+        simulator = getattr(self.server, 'simulator', None)
+        return simulator if simulator and simulator.metrics else None
+    
+    def setup(self):
+        super().setup()
+        simulator = self._metered_simulator()
+        if simulator:
+            simulator._http_connections_opened.inc()
+    
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            simulator = self._metered_simulator()
+            if simulator:
+                simulator._http_connections_closed.inc()
+    
+    def handle_one_request(self):
+        start = time.perf_counter()
+        self.command = None
+        super().handle_one_request()
+        simulator = self._metered_simulator()
+        if self.command and simulator:
+            route = urlsplit(self.path).path
+            route = route if route in HTTP_ROUTES else 'other'
+            simulator._http_latency.labels(route).observe(time.perf_counter() - start)
+    
+    def log_message(self, format, *args):
+        # Access lines go through the queued logger instead of blocking on stderr
+        logger.debug(format, *args, extra={'event': 'http_access', 'fields': {'client': self.client_address[0]}})
+    
+    def _send_body(self, body, status=200, content_type='application/json', headers=None):
+        """Send a complete response with an explicit Content-Length"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+    
     def do_OPTIONS(self):
         # Handle CORS preflight requests
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_GET(self):
-        if self.path == '/api/engine' or self.path == '/api/status':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
+        url = urlsplit(self.path)
+        route = url.path
+        
+        if route == '/api/engine' or route == '/api/status':
             # Get current engine data from the simulator
             if hasattr(self.server, 'simulator'):
-                data = {
-                    'engine': {
-                        'status': self.server.simulator.status,
-                        'rpm': int(self.server.simulator.current_rpm),
-                        'temp': int(self.server.simulator.current_temp),
-                        'fuel_flow': self.server.simulator.current_fuel_flow,
-                        'load': int(self.server.simulator.current_load)
-                    },
-                    'timestamp': datetime.now().isoformat()
-                }
-                self.wfile.write(json.dumps(data).encode())
+                self._send_engine(parse_qs(url.query) if url.query else {})
             else:
-                self.wfile.write(json.dumps({'error': 'Simulator not available'}).encode())
+                self._send_body(json.dumps({'error': 'Simulator not available'}).encode())
+        elif route == '/api/fleet':
+            self._send_fleet(parse_qs(url.query))
+        elif route == '/api/history':
+            self._send_history(parse_qs(url.query))
+        elif route == '/api/security':
+            self._send_security_events(parse_qs(url.query))
+        elif route == '/api/analytics':
+            self._send_analytics(parse_qs(url.query))
+        elif route == '/healthz' or route == '/readyz':
+            self._send_probe(route == '/readyz')
+        elif route == '/metrics' and self._metered_simulator():
+            self._send_body(self.server.simulator.metrics.render(),
+                            content_type='text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self._send_body(b'', status=404)
+    
+    def _negotiate(self, query, available):
+        """(format, fields) for this request, None once a 406/400 error has been sent"""
+        fmt = negotiate(query, self.headers.get('Accept'))
+        if fmt is None:
+            error = {'error': 'No acceptable encoding: json, binary or msgpack (needs the msgpack package)'}
+            self._send_body(json.dumps(error).encode(), status=406)
+            return None
+        try:
+            return fmt, select_fields(query, available)
+        except ValueError as e:
+            self._send_body(json.dumps({'error': str(e)}).encode(), status=400)
+            return None
+    
+    def _send_cached(self, body, etag, fmt):
+        """Send a per-tick representation, 304 if the client already has it"""
+        cache_headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+        if self.headers.get('If-None-Match') == etag:
+            self._send_body(b'', status=304, headers=cache_headers)
+        else:
+            self._send_body(body, content_type=CONTENT_TYPES[fmt], headers=cache_headers)
+    
+    def _send_engine(self, query):
+        """Serve the latest engine snapshot, with ?since=<version> once a newer one is published"""
+        negotiated = self._negotiate(query, ENGINE_FIELDS)
+        if negotiated is None:
+            return
+        fmt, fields = negotiated
+        simulator = self.server.simulator
+        
+        snapshot = simulator.snapshot
+        if 'since' in query:
+            try:
+                since = int(query['since'][0])
+                timeout = min(float(query.get('timeout', [LONG_POLL_TIMEOUT])[0]), LONG_POLL_MAX_TIMEOUT)
+            except ValueError:
+                self._send_body(json.dumps({'error': 'since must be an integer and timeout seconds'}).encode(),
+                                status=400)
+                return
+            # Long-poll: hold the request until a tick newer than the client's version is published
+            snapshot = simulator.snapshots.wait_newer(since, max(0.0, timeout))
+            if snapshot.version == since:
+                self._send_body(b'', status=304, headers={'ETag': snapshot.etag, 'Cache-Control': 'no-cache'})
+                return
+        
+        if fmt == JSON and fields == ENGINE_FIELDS:
+            # Body is serialized once per tick by the simulation loop
+            body, etag = snapshot.body, snapshot.etag
+        else:
+            body, etag = simulator.engine_representation(snapshot, fmt, fields)
+        self._send_cached(body, etag, fmt)
+    
+    def _send_fleet(self, query):
+        """Serve every fleet engine, or ?offset=&limit= of them, in one response"""
+        simulator = getattr(self.server, 'simulator', None)
+        if not simulator or not simulator.fleet:
+            self._send_body(json.dumps({'error': 'Fleet mode not enabled'}).encode(), status=404)
+            return
+        
+        negotiated = self._negotiate(query, ENGINE_FIELDS)
+        if negotiated is None:
+            return
+        try:
+            offset = max(0, int(query.get('offset', ['0'])[0]))
+            limit = int(query['limit'][0]) if 'limit' in query else None
+        except ValueError:
+            self._send_body(json.dumps({'error': 'offset and limit must be integers'}).encode(), status=400)
+            return
+        
+        body, etag = simulator.fleet_representation(simulator.snapshot, *negotiated, offset, limit)
+        self._send_cached(body, etag, negotiated[0])
+    
+    def _send_probe(self, readiness):
+        """Liveness (/healthz) or readiness (/readyz) probe, 503 when failing"""
+        simulator = getattr(self.server, 'simulator', None)
+        if simulator is None:
+            self._send_body(json.dumps({'status': 'unavailable'}).encode(), status=503)
+            return
+        checks = simulator.readiness() if readiness else simulator.health()
+        ok = all(checks.values())
+        data = {'status': 'ok' if ok else 'failing', 'checks': checks}
+        if readiness and simulator.startup_seconds is not None:
+            data['startup_ms'] = round(simulator.startup_seconds * 1000, 1)
+        self._send_body(json.dumps(data).encode(), status=200 if ok else 503,
+                        headers={'Cache-Control': 'no-store'})
+    
+    def _send_history(self, query):
+        """Serve the downsampled engine history window (?from=&to=&points=&fields=)"""
+        if not hasattr(self.server, 'simulator'):
+            self._send_body(json.dumps({'error': 'Simulator not available'}).encode())
+            return
+        
+        negotiated = self._negotiate(query, HISTORY_FIELDS)
+        if negotiated is None:
+            return
+        fmt, fields = negotiated
+        try:
+            start = float(query['from'][0]) if 'from' in query else None
+            end = float(query['to'][0]) if 'to' in query else None
+            points = min(int(query.get('points', ['500'])[0]), 10000)
+        except ValueError:
+            error = {'error': 'from/to must be UNIX timestamps and points an integer'}
+            self._send_body(json.dumps(error).encode(), status=400)
+            return
+        
+        data = self.server.simulator.history.query(start, end, points, fields)
+        if fmt == BINARY:
+            # One row per bucket: timestamp, then min/max/mean of every selected field
+            columns = {'timestamp': np.array(data['timestamps'], dtype='<f8')}
+            for name, stats in data['series'].items():
+                for stat in ('min', 'max', 'mean'):
+                    columns[f'{name}.{stat}'] = np.array(stats[stat], dtype='<f4')
+            body = encode_table(columns, data['to'] or 0.0)
+        elif fmt == JSON:
+            body = json.dumps(data).encode()
+        else:
+            body = encode_msgpack(data)
+        self._send_body(body, content_type=CONTENT_TYPES[fmt], headers={'Vary': 'Accept'})
+    
+    def _send_security_events(self, query):
+        """Serve one newest-first page of security events
+
+        Filters: ?event=&client=&risk_level=&from=&to=, page with ?limit= and
+        ?cursor= (the next_cursor of the previous page).
+        """
+        if not hasattr(self.server, 'simulator'):
+            self._send_body(json.dumps({'error': 'Simulator not available'}).encode())
+            return
+        
+        try:
+            page = self.server.simulator.security_events.query(
+                event=query['event'][0] if 'event' in query else None,
+                client=query['client'][0] if 'client' in query else None,
+                risk_level=query['risk_level'][0] if 'risk_level' in query else None,
+                start=float(query['from'][0]) if 'from' in query else None,
+                end=float(query['to'][0]) if 'to' in query else None,
+                before=int(query['cursor'][0]) if 'cursor' in query else None,
+                limit=int(query.get('limit', ['100'])[0])
+            )
+        except ValueError:
+            error = {'error': 'from/to must be UNIX timestamps, cursor and limit integers'}
+            self._send_body(json.dumps(error).encode(), status=400)
+            return
+        
+        self._send_body(json.dumps(page).encode())
+    
+    def _send_analytics(self, query):
+        """Serve the MODBUS traffic heavy hitters, or one client's estimates with ?client="""
+        simulator = getattr(self.server, 'simulator', None)
+        if not simulator or not simulator.traffic_analyzer:
+            self._send_body(json.dumps({'error': 'Traffic analytics not enabled'}).encode(), status=404)
+            return
+        
+        if 'client' in query:
+            data = simulator.traffic_analyzer.client_stats(query['client'][0])
         else:
-            self.send_response(404)
-            self.end_headers()
+            data = simulator.traffic_analyzer.snapshot()
+        self._send_body(json.dumps(data).encode())
     
     def do_POST(self):
         if self.path == '/api/engine/start' or self.path == '/api/engine/stop':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
             # Handle engine start/stop commands
             if hasattr(self.server, 'simulator'):
-                if 'start' in self.path:
-                    self.server.simulator._running = True
-                    self.server.simulator.status = 1
-                    message = "Engine started"
-                else:
-                    self.server.simulator._running = False
-                    self.server.simulator.status = 0
-                    message = "Engine stopped"
+                simulator = self.server.simulator
+                with simulator._state_lock:
+                    if 'start' in self.path:
+                        simulator._running = True
+                        simulator.status = 1
+                        message = "Engine started"
+                    else:
+                        simulator._running = False
+                        simulator.status = 0
+                        message = "Engine stopped"
+                
+                # Make the new status visible to pollers without waiting for the next tick
+                snapshot = simulator._publish_snapshot()
                 
                 data = {
                     'status': 'success',
                     'message': message,
-                    'engine_status': self.server.simulator.status
+                    'engine_status': snapshot.status,
+                    'version': snapshot.version
                 }
-                self.wfile.write(json.dumps(data).encode())
+                self._send_body(json.dumps(data).encode())
             else:
-                self.wfile.write(json.dumps({'error': 'Simulator not available'}).encode())
+                self._send_body(json.dumps({'error': 'Simulator not available'}).encode())
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_body(b'', status=404)
 
 class StandaloneEngineSimulator:
-    def __init__(self, config_file=None, host="0.0.0.0", port=502):
+    def __init__(self, config_file=None, host="0.0.0.0", port=502, fleet_size=None,
+                 record_file=None, replay_file=None, workers=None):
         """Initialize the standalone engine simulator with MODBUS TCP server"""
+        # Startup time is measured from here to the ready signal
+        self._init_started = time.perf_counter()
+        self.ready = threading.Event()
+        self.startup_seconds = None
         
         # Load configuration
         if config_file is None:
             config_file = Path(__file__).parent / 'config_linux.yaml'
+        self.config_file = Path(config_file)
         
         try:
-            with open(config_file, 'r') as f:
-                self.config = yaml.safe_load(f)
+            self.config = load_config(self.config_file)
         except FileNotFoundError:
             print(f"Warning: Config file {config_file} not found, using defaults")
             self.config = self._default_config()
+        # The file as loaded, before command line overrides; reloads only apply the sections edited since
+        self._file_config = copy.deepcopy(self.config)
+        self._pending_config = None
+        self.config_watcher = None
+        
+        # Runtime messages are queued and written by a background thread
+        setup_logging(self.config.get('logging'))
         
         # Override host/port if provided
         if host != "0.0.0.0":
             self.config['modbus']['host'] = host
         if port != 502:
             self.config['modbus']['port'] = port
+        if fleet_size:
+            self.config.setdefault('fleet', {})
+            self.config['fleet']['enabled'] = True
+            self.config['fleet']['engines'] = fleet_size
+        if record_file or replay_file:
+            self.config.setdefault('recording', {})
+            self.config['recording']['mode'] = 'record' if record_file else 'replay'
+            self.config['recording']['file'] = record_file or replay_file
+        if workers is not None:
+            self.config.setdefault('serving', {})['modbus_workers'] = workers
             
         print(f"Initializing MODBUS TCP Server on {self.config['modbus']['host']}:{self.config['modbus']['port']}")
         
+        # Prometheus counters for /metrics, updated lock-free on the hot paths
+        self.metrics = None
+        if self.config.get('metrics', {}).get('enabled', True):
+            self._create_metrics()
+        
+        # Per-client request analytics in fixed-size sketches, alerts become security events
+        self.traffic_analyzer = None
+        analytics_config = self.config.get('analytics', {})
+        if analytics_config.get('enabled', True):
+            self.traffic_analyzer = ModbusTrafficAnalyzer(
+                window=analytics_config.get('window', 10.0),
+                width=analytics_config.get('sketch_width', 4096),
+                depth=analytics_config.get('sketch_depth', 4),
+                top_clients=analytics_config.get('top_clients', 20),
+                flood_requests=analytics_config.get('flood_requests', 2000),
+                write_burst=analytics_config.get('write_burst', 50),
+                scan_blocks=analytics_config.get('scan_blocks', 64),
+                error_requests=analytics_config.get('error_requests', 50),
+                on_alert=self._on_traffic_alert
+            )
+        
+        # With worker processes the register spaces live in shared memory they read directly
+        self.modbus_workers = int(self.config.get('serving', {}).get('modbus_workers', 0) or 0)
+        self.shared_bank = None
+        self.worker_pool = None
+        if self.modbus_workers:
+            if self.config.get('fleet', {}).get('unit_ids', False):
+                raise ValueError("serving.modbus_workers cannot be combined with fleet.unit_ids")
+            from sharded_server import SharedRegisterBank
+            self.shared_bank = SharedRegisterBank()
+        
         # Initialize Modbus server for actual TCP communication
-        self.server = ModbusServer(
-            host=self.config['modbus']['host'],
-            port=self.config['modbus']['port'],
-            no_block=True  # Non-blocking operation
+        # Client writes to watched registers are reported by the data handler as they happen
+        self.data_handler = WatchedDataHandler(
+            data_bank=self.shared_bank or BlockDataBank(),
+            on_write=self._on_modbus_write,
+            on_request=self._on_modbus_request if self.metrics or self.traffic_analyzer else None
         )
+        # Unit IDs without a device of their own are served from the main register bank
+        self.unit_router = UnitRouter(default=self.data_handler)
+        self.modbus_engine = self.config['modbus'].get('engine', 'threaded')
+        if self.modbus_engine == 'asyncio':
+            # One event loop for every connection, pipelined requests answered in bulk
+            from async_modbus_server import AsyncModbusServer
+            self.server = AsyncModbusServer(
+                host=self.config['modbus']['host'],
+                port=self.config['modbus']['port'],
+                data_hdl=self.unit_router,
+                reuse_port=bool(self.modbus_workers)
+            )
+        elif self.modbus_engine == 'threaded':
+            self.server = ModbusServer(
+                host=self.config['modbus']['host'],
+                port=self.config['modbus']['port'],
+                no_block=True,  # Non-blocking operation
+                data_hdl=self.unit_router
+            )
+        else:
+            raise ValueError(f"Unknown modbus.engine '{self.modbus_engine}', expected 'threaded' or 'asyncio'")
         
         # Engine state variables
         self._running = False
@@ -121,106 +454,437 @@ class StandaloneEngineSimulator:
         self.current_load = 0
         self.status = 0  # 0: Stopped, 1: Running, 2: Warning, 3: Alarm
         
+        # Engine model: setpoints with random jitter, or governor/thermal/fuel map physics
+        self.engine_model = self.config['engine'].get('model', 'simple')
+        self.physics = self._create_physics(self.config)
+        # One-engine state arrays the physics model integrates in place
+        self._physics_state = (np.zeros(1, dtype=bool), np.zeros(1), np.zeros(1), np.zeros(1),
+                               np.zeros(1), np.zeros(1, dtype=np.uint16))
+        
         # Security monitoring
-        self.last_status_check = time.time()
         self.unauthorized_attempts = 0
-        self.security_events = []
+        # Recent events stay in a bounded ring, the full record goes to an append-only database
+        security_config = self.config.get('security', {})
+        self.security_events = SecurityEventStore(
+            security_config.get('event_database'),
+            capacity=security_config.get('event_capacity', 10000)
+        )
+        
+        # Serializes engine state changes between the simulation tick and MODBUS write events
+        self._state_lock = threading.RLock()
         
         # Simulation control
         self.simulation_running = False
         self.simulation_thread = None
+        # Set to wake the loop between ticks: MODBUS writes were queued, or the simulation stopped
+        self._wake = threading.Event()
+        # Client writes to watched status registers, queued by the MODBUS server threads
+        self._modbus_writes = deque()
+        
+        # Simulated clock (UNIX seconds), advances by update_interval per tick
+        self.sim_time = time.time()
+        
+        # Scheduler statistics
+        self.tick_count = 0
+        self.tick_overruns = 0
+        self.last_tick_duration = 0.0
+        self.max_tick_lateness = 0.0
         
         # HTTP server for frontend data
         self.http_server = None
         self.http_thread = None
         
-        # MODBUS security monitoring
-        self._last_modbus_status = None
+        # WebSocket push server for live dashboards
+        self.websocket_server = None
+        
+        # Auxiliary sensors published over MQTT (and to WebSocket dashboards)
+        self.mqtt_publisher = None
+        self._sensor_rng = np.random.default_rng(self.config.get('mqtt', {}).get('seed'))
+        self._sensors = None        # This tick's main engine readings, one per sensor
+        self._fleet_sensors = None  # sensors x engines, when the register schema maps sensors
+        
+        # Per-tick sample history served by /api/history
+        self.history = EngineHistory(self.config.get('history', {}).get('capacity', 86400))
+        
+        # Immutable engine state of the latest tick with its pre-serialized /api/engine body,
+        # replaced (never modified) once per tick; long-pollers wait on the channel
+        self.snapshot = EngineSnapshot(0, self.sim_time, False, 0, 0, 0, 0, 0)
+        self.snapshots = SnapshotChannel(self.snapshot)
+        self._snapshot_lock = threading.Lock()
+        
+        # Compile the register schema into packers, each space is written as one block per tick
+        self._compile_register_layout()
+        
+        # Optional multi-engine fleet, each engine on its own register block
+        self.fleet = None
+        fleet_config = self.config.get('fleet', {})
+        if fleet_config.get('enabled', False):
+            self.fleet = EngineFleet(
+                self.config['engine'],
+                self.register_schema.holding,
+                size=fleet_config.get('engines', 100),
+                base_register=fleet_config.get('base_register', 100),
+                register_stride=fleet_config.get('register_stride', 8),
+                seed=fleet_config.get('seed'),
+                model=self._create_physics(self.config, size=fleet_config.get('engines', 100),
+                                           seed=fleet_config.get('seed'))
+            )
+            if fleet_config.get('autostart', False):
+                self.fleet.start()
+            print(f"Fleet mode: {self.fleet.size} engines on registers "
+                  f"{self.fleet.base_register}-{self.fleet.base_register + self.fleet.register_count - 1} "
+                  f"({self.fleet.register_stride} per engine)")
+        
+        # Report every client write to the engine status registers
+        self._watch_status_registers()
+        
+        # Optionally serve each fleet engine as its own MODBUS unit ID behind the same listener
+        self._unit_engines = {}  # unit ID -> fleet engine index
+        self._unit_handlers = []
+        if self.fleet and fleet_config.get('unit_ids', False):
+            self._create_unit_handlers(fleet_config.get('first_unit_id', 2))
+        
+        # Optional register timeline recording, or replay of one instead of the engine model
+        self.recorder = None
+        self.replay = None
+        self._replay_index = 0
+        self._replayed_sensors = []  # (sensor row, value) of the sensors the replayed registers hold
+        self._fleet_words = None
+        self._setup_recording()
         
         # Initialize registers to default values
         self._initialize_registers()
+        self._publish_snapshot()
         
     def _default_config(self):
         """Default configuration if config.yaml is not found"""
         return {
-            'modbus': {'host': '0.0.0.0', 'port': 502},
+            'modbus': {'host': '0.0.0.0', 'port': 502, 'engine': 'threaded'},
             'engine': {
                 'rpm_min': 600, 'rpm_max': 1200, 'rpm_normal': 900,
                 'temp_min': 70, 'temp_max': 120, 'temp_normal': 85,
                 'fuel_flow_min': 0.5, 'fuel_flow_max': 2.5, 'fuel_flow_normal': 1.5,
-                'update_interval': 1.0
+                'update_interval': 1.0, 'model': 'simple'
             },
-            'registers': {'status': 0, 'rpm': 1, 'temp': 2, 'fuel_flow': 3, 'load': 4}
+            'registers': {'status': 0, 'rpm': 1, 'temp': 2, 'fuel_flow': 3, 'load': 4},
+            'fleet': {'enabled': False},
+            'websocket': {'enabled': True, 'host': '0.0.0.0', 'port': 8000},
+            'history': {'capacity': 86400},
+            'simulation': {'time_scale': 1.0},
+            'logging': {'level': 'INFO', 'log_unauthorized_commands': True, 'log_engine_events': True},
+            'metrics': {'enabled': True},
+            'analytics': {'enabled': True},
+            'mqtt': {'enabled': False}
         }
     
+    def _create_metrics(self):
+        """Register every /metrics series, values owned by the simulator are read at scrape time"""
+        metrics = self.metrics = MetricsRegistry()
+        self._tick_duration = metrics.histogram(
+            'engine_sim_tick_duration_seconds', 'Time spent computing and publishing one simulation tick',
+            buckets=TICK_BUCKETS
+        )
+        # The engine model alone, the part of a tick that grows with the model and the fleet size
+        model_step = metrics.histogram(
+            'engine_sim_model_step_seconds', 'Time spent advancing the engine model per tick', ('target',),
+            buckets=TICK_BUCKETS
+        )
+        self._observe_engine_model = model_step.labels('engine').observe
+        self._observe_fleet_model = model_step.labels('fleet').observe
+        metrics.gauge_callback('engine_sim_startup_seconds', 'Time from initialization to ready',
+                               lambda: self.startup_seconds or 0)
+        metrics.counter_callback('engine_sim_ticks_total', 'Simulation ticks completed',
+                                 lambda: self.tick_count)
+        metrics.counter_callback('engine_sim_tick_overruns_total', 'Ticks that finished after their deadline',
+                                 lambda: self.tick_overruns)
+        metrics.gauge_callback('engine_sim_tick_max_lateness_seconds', 'Worst tick lateness seen so far',
+                               lambda: self.max_tick_lateness)
+        self._config_reloads = metrics.counter(
+            'engine_sim_config_reloads_total', 'Config file reloads by result', ('result',)
+        )
+        self._modbus_requests = metrics.counter(
+            'engine_sim_modbus_requests_total', 'MODBUS data requests served',
+            ('function_code', 'client', 'result')
+        )
+        # Client address -> label, the first client_labels clients get their own series
+        self._client_labels = {}
+        self._client_label_limit = int(self.config.get('metrics', {}).get('client_labels', MODBUS_CLIENT_LABELS))
+        self._client_label_lock = threading.Lock()
+        self._http_latency = metrics.histogram(
+            'engine_sim_http_request_duration_seconds', 'HTTP request latency by route', ('route',)
+        )
+        self._http_connections_opened = metrics.counter(
+            'engine_sim_http_connections_opened_total', 'HTTP connections accepted'
+        )
+        self._http_connections_closed = metrics.counter(
+            'engine_sim_http_connections_closed_total', 'HTTP connections closed'
+        )
+        metrics.gauge_callback(
+            'engine_sim_http_active_connections', 'Open HTTP connections',
+            lambda: self._http_connections_opened.labels().value - self._http_connections_closed.labels().value
+        )
+        metrics.gauge_callback(
+            'engine_sim_websocket_active_connections', 'Connected WebSocket dashboards',
+            lambda: len(self.websocket_server.clients) if self.websocket_server else 0
+        )
+        metrics.counter_callback('engine_sim_security_events_total', 'Security events recorded',
+                                 lambda: len(self.security_events))
+        metrics.counter_callback('engine_sim_unauthorized_attempts_total', 'Unauthorized MODBUS stop commands',
+                                 lambda: self.unauthorized_attempts)
+    
+    def _setup_recording(self):
+        """Open the recorder or the replay source selected by the recording config section"""
+        recording_config = self.config.get('recording', {})
+        mode = recording_config.get('mode', 'off')
+        path = recording_config.get('file', 'engine_recording.bin')
+        
+        if mode in ('record', 'replay'):
+            from register_recording import RegisterRecorder, RegisterRecording
+        
+        if mode == 'record':
+            # Every register space of the schema, then the fleet block
+            schema = self.register_schema
+            segments = [('holding', schema.holding.base, schema.holding.span)]
+            if schema.input:
+                segments.append(('input', schema.input.base, schema.input.span))
+            if schema.coils:
+                segments.append(('coil', schema.coils.base, schema.coils.span))
+            if self.fleet:
+                segments.append(('holding', self.fleet.base_register, self.fleet.register_count))
+            self.recorder = RegisterRecorder(path, segments, self.config['engine']['update_interval'])
+            print(f"Recording register timeline to {path}")
+        elif mode == 'replay':
+            self.replay = RegisterRecording(path)
+            # Pace the replay at the interval it was recorded with, time_scale sets the speed
+            self.config['engine']['update_interval'] = self.replay.interval
+            print(f"Replaying {len(self.replay)} ticks from {path}")
+        elif mode != 'off':
+            raise ValueError(f"Unknown recording mode: {mode}")
+    
+    def _create_unit_handlers(self, first_unit_id):
+        """Give every fleet engine a register bank of its own on consecutive unit IDs"""
+        last_unit_id = first_unit_id + self.fleet.size - 1
+        if first_unit_id < 0 or last_unit_id > 255:
+            raise ValueError(f"Fleet of {self.fleet.size} engines does not fit in MODBUS unit IDs "
+                             f"{first_unit_id}-255")
+        
+        # Each unit exposes the main engine's holding registers and nothing else
+        holding = self.register_schema.holding
+        self._unit_register_end = holding.base + holding.span
+        for index in range(self.fleet.size):
+            handler = WatchedDataHandler(
+                BlockDataBank(coils_size=0, d_inputs_size=0, h_regs_size=self._unit_register_end, i_regs_size=0),
+                on_write=self._on_modbus_write,
+                on_request=self.data_handler.on_request
+            )
+            handler.watch(self.status_register)
+            self.unit_router.add_unit(first_unit_id + index, handler)
+            self._unit_engines[first_unit_id + index] = index
+            self._unit_handlers.append(handler)
+        
+        self._update_unit_banks(self.fleet.register_block())
+        print(f"Fleet engines served as MODBUS unit IDs {first_unit_id}-{last_unit_id}")
+    
+    def _update_unit_banks(self, fleet_words):
+        """Copy each engine's slice of the fleet register block into its unit's bank"""
+        rows = fleet_words.reshape(self.fleet.size, self.fleet.register_stride)[:, :self._unit_register_end]
+        for handler, words in zip(self._unit_handlers, rows.tolist()):
+            handler.data_bank.set_holding_registers(0, words)
+    
+    def _compile_register_layout(self):
+        """Compile the register schema into per-space packers and the tick's signal gather"""
+        self._install_register_layout(self._build_register_schema(self.config['registers']))
+    
+    def _build_register_schema(self, registers):
+        """Compiled RegisterSchema for a `registers` config section, ValueError if it is invalid"""
+        schema = RegisterSchema(registers, SIGNALS, default_scales=LEGACY_REGISTER_SCALES)
+        # Start/stop commands are written to the status register, it must hold the raw status word
+        status = next((field for field in schema.fields if field.name == 'status'), None)
+        if status is None or status.space != 'holding' or status.type != 'uint16' or status.scale != 1:
+            raise ValueError("The register schema needs an unscaled uint16 holding register named 'status'")
+        return schema
+    
+    def _install_register_layout(self, schema):
+        """Make a compiled schema the one every tick encodes"""
+        self.register_schema = schema
+        self.status_register = schema.address('status')
+        
+        holding = schema.holding
+        self._register_base = holding.base
+        self._engine_state = attrgetter(*ENGINE_SIGNALS.values())
+        self._encode_registers()
+        
+        # First word of every holding field for the MODBUS TX log
+        self._traffic_fields = [(field.name, field.address - holding.base) for field in holding.fields]
+        # Sensor signals are only simulated per tick when something consumes them
+        self._schema_sensors = bool(schema.sources & set(SENSOR_UNITS))
+        
+        if holding.gaps:
+            print(f"Warning: register map has gaps, registers {holding.base}-"
+                  f"{holding.base + holding.span - 1} are all written by the simulator")
+    
+    def _watch_status_registers(self):
+        """Report client writes to the main engine's and every fleet engine's status register"""
+        self.data_handler.unwatch_all()
+        self.data_handler.watch(self.status_register)
+        if self.fleet:
+            self.data_handler.watch(
+                self.fleet.engine_base(0) + self.status_register,
+                count=self.fleet.size,
+                stride=self.fleet.register_stride
+            )
+    
+    def _create_physics(self, config, size=1, seed=None):
+        """Physics model for `size` engines if the config's engine.model selects it, otherwise None"""
+        model = config['engine'].get('model', 'simple')
+        if model not in ('simple', 'physics'):
+            raise ValueError(f"Unknown engine.model '{model}', expected 'simple' or 'physics'")
+        if model == 'physics':
+            from engine_physics import EnginePhysics
+            return EnginePhysics(config['engine'], config.get('physics'), size=size, seed=seed)
+        return None
+    
+    def _signal_vector(self):
+        """Current value of every schema signal, in SIGNALS order"""
+        signals = np.zeros(len(SIGNALS), dtype=np.float64)
+        signals[:len(ENGINE_SIGNALS)] = self._engine_state(self)
+        if self._sensors is not None:
+            signals[len(ENGINE_SIGNALS):] = self._sensors
+        return signals
+    
+    def _encode_registers(self):
+        """Encode the current engine state into the compiled block of every register space"""
+        schema = self.register_schema
+        signals = self._signal_vector()
+        self._register_words = schema.holding.encode(signals).tolist()
+        self._input_words = schema.input.encode(signals).tolist() if schema.input else None
+        self._coil_bits = schema.coils.encode(signals) if schema.coils else None
+    
+    def _write_registers(self):
+        """Commit the engine state to every register space, one bulk write per space"""
+        self._encode_registers()
+        data_bank = self.server.data_bank
+        # One bulk write under the data bank lock, so multi-register reads never see a torn tick
+        data_bank.set_holding_registers(self._register_base, self._register_words)
+        schema = self.register_schema
+        if schema.input:
+            data_bank.set_input_registers(schema.input.base, self._input_words)
+        if schema.coils:
+            data_bank.set_coils(schema.coils.base, self._coil_bits)
+    
     def _initialize_registers(self):
         """Initialize MODBUS registers with default values"""
-        registers = self.config['registers']
-        
-        # Initialize holding registers
-        initial_values = {
-            registers['status']: 0,                                    # Engine stopped
-            registers['rpm']: 0,                                      # 0 RPM
-            registers['temp']: int(self.config['engine']['temp_min']), # Minimum temperature
-            registers['fuel_flow']: 0,                                # No fuel flow
-            registers['load']: 0                                      # No load
-        }
+        # Engine starts stopped at minimum temperature, commit that state as one block per space
+        self._write_registers()
         
-        for reg_addr, value in initial_values.items():
-            self.server.data_bank.set_holding_registers(reg_addr, [value])
+        self._report_register_layout("MODBUS registers initialized")
         
-        print("MODBUS registers initialized:")
-        for name, addr in registers.items():
-            print(f"  {name.upper()}: Register {addr} = {initial_values[addr]}")
+        if self.fleet:
+            self.server.data_bank.set_holding_registers(
+                self.fleet.base_register, self.fleet.register_block().tolist()
+            )
+    
+    def _report_register_layout(self, title):
+        """One summary line per register space, every field at debug level"""
+        schema = self.register_schema
+        spaces = [f"{name} {block.base}-{block.base + block.span - 1}"
+                  for name, block in (('holding', schema.holding), ('input', schema.input), ('coils', schema.coils))
+                  if block]
+        print(f"{title}: {len(schema.fields)} fields, {', '.join(spaces)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for field in schema.fields:
+                kind = '' if field.space == 'coil' else f" ({field.type})"
+                logger.debug(f"Register {field.name}: {field.space} {field.address}{kind}", extra={'event': 'modbus'})
+    
+    def mark_ready(self):
+        """Signal readiness (MODBUS and HTTP listening) and record the startup time"""
+        if self.ready.is_set():
+            return
+        self.startup_seconds = time.perf_counter() - self._init_started
+        self.ready.set()
+        logger.info(f"Ready in {self.startup_seconds * 1000:.1f} ms", extra={
+            'event': 'simulation', 'fields': {'startup_ms': round(self.startup_seconds * 1000, 1)}
+        })
+    
+    def health(self):
+        """Liveness checks: the simulation thread, if started, hasn't died"""
+        thread = self.simulation_thread
+        return {'simulation': not (self.simulation_running and thread is not None and not thread.is_alive())}
+    
+    def readiness(self):
+        """Readiness checks: startup finished and the MODBUS listener is serving"""
+        return {
+            'started': self.ready.is_set(),
+            'modbus': bool(self.server.is_run),
+            'http': self.http_server is not None,
+            **self.health(),
+        }
     
     def start_server(self):
         """Start the MODBUS TCP server"""
         try:
-            # Attempt to start the server
-            start_result = self.server.start()
+            if self.modbus_workers:
+                # Workers bind the same port, the kernel balances connections across all listeners
+                from sharded_server import enable_reuse_port
+                enable_reuse_port()
+            
+            # Binds and listens before returning, raises if the port can't be bound
+            self.server.start()
             
-            # Give the server a moment to initialize
-            time.sleep(0.5)
+            # pyModbusTCP flags is_run once its serve thread is up, wait for that instead of sleeping
+            running = getattr(self.server, '_evt_running', None)
+            if running is not None:
+                running.wait(1.0)
             
-            # Check if server is actually running (more reliable than start() return value)
             if self.server.is_run:
-                print(f"✓ MODBUS TCP Server started successfully")
-                print(f"  Host: {self.config['modbus']['host']}")
-                print(f"  Port: {self.config['modbus']['port']}")
-                print(f"  Registers: {list(self.config['registers'].values())}")
-                print(f"  Start method returned: {start_result} (but server is running)")
+                print(f"✓ MODBUS TCP Server started on {self.config['modbus']['host']}:{self.config['modbus']['port']} "
+                      f"(registers {self._register_base}-{self._register_base + len(self._register_words) - 1})")
                 print("\nWARNING: This server is running without authentication!")
                 print("Any MODBUS client can connect and control the engine.")
                 print("This demonstrates real-world SCADA/ICS security vulnerabilities.")
+                if self.modbus_workers:
+                    return self._start_worker_pool()
                 return True
             else:
                 print(f"✗ Failed to start MODBUS TCP server")
-                print(f"  Start method returned: {start_result}")
-                print(f"  Server is_run status: {self.server.is_run}")
                 return False
         except Exception as e:
             print(f"✗ Error starting MODBUS TCP server: {e}")
             return False
     
+    def _start_worker_pool(self):
+        """Spawn the MODBUS worker processes, their client writes go through our data handler"""
+        from sharded_server import ModbusWorkerPool
+        self.worker_pool = ModbusWorkerPool(
+            self.shared_bank,
+            host=self.config['modbus']['host'],
+            port=self.config['modbus']['port'],
+            workers=self.modbus_workers,
+            on_write=self.unit_router.write_h_regs,
+            on_write_coils=self.unit_router.write_coils,
+            engine=self.modbus_engine
+        )
+        return self.worker_pool.start()
+    
     def stop_server(self):
         """Stop the MODBUS TCP server"""
+        if self.worker_pool:
+            self.worker_pool.stop()
+            self.worker_pool = None
         if self.server.is_run:
             self.server.stop()
             print("MODBUS TCP Server stopped")
     
-    def start_http_server(self, http_port=8080):
+    def start_http_server(self, http_port=8080, host='0.0.0.0'):
         """Start HTTP server for frontend data"""
         try:
-            self.http_server = HTTPServer(('0.0.0.0', http_port), EngineDataHandler)
+            self.http_server = ThreadingHTTPServer((host, http_port), EngineDataHandler)
             self.http_server.simulator = self  # Pass simulator reference to handler
             
-            def run_http_server():
-                print(f"HTTP Server started on port {http_port}")
-                self.http_server.serve_forever()
-            
-            self.http_thread = threading.Thread(target=run_http_server, daemon=True)
+            # The socket is bound and listening once the server object exists
+            self.http_thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
             self.http_thread.start()
-            print(f"✓ HTTP Server started on 0.0.0.0:{http_port}")
+            print(f"✓ HTTP Server started on {host}:{http_port}")
             return True
         except Exception as e:
             print(f"✗ Failed to start HTTP server: {e}")
@@ -233,6 +897,250 @@ class StandaloneEngineSimulator:
             self.http_server.server_close()
             print("HTTP Server stopped")
     
+    def start_websocket_server(self):
+        """Start WebSocket server that pushes live engine frames to dashboards"""
+        ws_config = self.config.get('websocket', {})
+        if not ws_config.get('enabled', True):
+            return True
+        
+        from websocket_server import EngineWebSocketServer
+        self.websocket_server = EngineWebSocketServer(
+            host=ws_config.get('host', '0.0.0.0'),
+            port=ws_config.get('port', 8000)
+        )
+        if not self.websocket_server.start():
+            self.websocket_server = None
+            return False
+        return True
+    
+    def stop_websocket_server(self):
+        """Stop WebSocket server"""
+        if self.websocket_server:
+            self.websocket_server.stop()
+            self.websocket_server = None
+    
+    def start_mqtt_publisher(self):
+        """Start publishing the auxiliary sensors to the configured MQTT broker"""
+        mqtt_config = self.config.get('mqtt', {})
+        if not mqtt_config.get('enabled', False):
+            return True
+        
+        from mqtt_publisher import MqttSensorPublisher
+        self.mqtt_publisher = MqttSensorPublisher(
+            host=mqtt_config.get('host', 'localhost'),
+            port=mqtt_config.get('port', 1883),
+            topic_prefix=mqtt_config.get('topic_prefix', 'engine'),
+            qos=mqtt_config.get('qos', 0),
+            client_id=mqtt_config.get('client_id', 'engine-simulator'),
+            keepalive=mqtt_config.get('keepalive', 30),
+            username=mqtt_config.get('username'),
+            password=mqtt_config.get('password')
+        )
+        if not self.mqtt_publisher.start():
+            self.mqtt_publisher = None
+            return False
+        return True
+    
+    def stop_mqtt_publisher(self):
+        """Stop the MQTT publisher"""
+        if self.mqtt_publisher:
+            self.mqtt_publisher.stop()
+            self.mqtt_publisher = None
+    
+    def start_config_watcher(self):
+        """Reload the config file on SIGHUP, and whenever it is saved if reload.watch is on"""
+        reload_config = self.config.get('reload', {})
+        self.config_watcher = ConfigWatcher(
+            self.config_file, self.reload_config,
+            interval=reload_config.get('interval', 1.0) if reload_config.get('watch', True) else None
+        )
+        self.config_watcher.start()
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.config_watcher.trigger())
+    
+    def stop_config_watcher(self):
+        """Stop watching the config file"""
+        if self.config_watcher:
+            self.config_watcher.stop()
+            self.config_watcher = None
+    
+    def reload_config(self, file_config=None):
+        """Validate an edited config file and swap it in between ticks, False if it is rejected
+        
+        Only sections edited since the file was last loaded change. Engine, physics,
+        simulation, registers, logging and the analytics thresholds apply to the
+        running simulator without touching client connections or engine state,
+        edits to any other section are reported and wait for a restart.
+        """
+        try:
+            if file_config is None:
+                file_config = load_config(self.config_file)
+            with self._state_lock:
+                staged = self._stage_config(file_config)
+        except Exception as e:
+            logger.error(f"Config reload rejected, keeping the running configuration: {e}",
+                         extra={'event': 'config'})
+            if self.metrics:
+                self._config_reloads.labels('rejected').inc()
+            return False
+        
+        if staged:
+            with self._state_lock:
+                self._pending_config = staged
+                # A running simulation swaps it in at the start of its next tick
+                if not self.simulation_running:
+                    self._apply_pending_config()
+        return True
+    
+    def _stage_config(self, file_config):
+        """Merge, validate and compile the edited sections, None if nothing live changes"""
+        previous = self._file_config
+        pending = self._pending_config
+        live = pending['config'] if pending else self.config
+        config = dict(live)
+        sections = []
+        
+        for section in sorted(set(file_config) | set(previous)):
+            new = file_config.get(section)
+            old = previous.get(section)
+            if new == old:
+                continue
+            if section in RELOADABLE_SECTIONS:
+                if new is None:
+                    config.pop(section, None)
+                else:
+                    config[section] = copy.deepcopy(new)
+                sections.append(section)
+            elif section == 'analytics' and isinstance(new, dict) and isinstance(old, dict):
+                analytics = config['analytics'] = dict(live.get('analytics', {}))
+                for key in set(new) | set(old):
+                    if new.get(key) == old.get(key):
+                        continue
+                    if key not in RELOADABLE_ANALYTICS:
+                        logger.warning(f"Config analytics.{key} changed, restart the simulator to apply it",
+                                       extra={'event': 'config'})
+                    elif key in new:
+                        analytics[key] = int(new[key])
+                    else:
+                        analytics.pop(key, None)
+                if analytics != live.get('analytics', {}):
+                    sections.append(section)
+            else:
+                logger.warning(f"Config section '{section}' changed, restart the simulator to apply it",
+                               extra={'event': 'config'})
+        
+        if not sections:
+            self._file_config = file_config
+            return None
+        
+        engine = config['engine']
+        missing = [key for key in ENGINE_LIMITS if not isinstance(engine.get(key), (int, float))]
+        if missing:
+            raise ValueError(f"engine section needs numeric {', '.join(missing)}")
+        if not (engine['rpm_min'] <= engine['rpm_normal'] <= engine['rpm_max']
+                and engine['temp_min'] <= engine['temp_normal'] <= engine['temp_max']
+                and engine['fuel_flow_min'] <= engine['fuel_flow_normal'] <= engine['fuel_flow_max']):
+            raise ValueError("engine normal values must lie between their min and max")
+        if self.replay and 'engine' in sections:
+            # Replay keeps pacing at the recorded interval
+            engine['update_interval'] = self.replay.interval
+        if engine['update_interval'] <= 0:
+            raise ValueError("engine.update_interval must be positive")
+        if self.recorder and engine['update_interval'] != live['engine']['update_interval']:
+            raise ValueError("engine.update_interval cannot change while recording")
+        self._time_scale(config)
+        
+        physics = pending['physics'] if pending else self.physics
+        fleet_physics = pending['fleet_physics'] if pending else self.fleet and self.fleet.model
+        if 'engine' in sections or 'physics' in sections:
+            physics = self._create_physics(config)
+            if self.fleet:
+                fleet_physics = self._create_physics(config, size=self.fleet.size)
+        
+        schema = pending['schema'] if pending else None
+        if 'registers' in sections:
+            if self.recorder or self.replay or self._unit_handlers:
+                raise ValueError("the register map cannot change while recording, replaying or serving "
+                                 "fleet unit IDs")
+            schema = self._build_register_schema(config['registers'])
+            if self.fleet:
+                self.fleet.check_registers(schema.holding)
+        
+        if 'logging' in sections:
+            level = str((config.get('logging') or {}).get('level', 'INFO')).upper()
+            if not isinstance(logging.getLevelName(level), int):
+                raise ValueError(f"Unknown logging.level '{level}'")
+        
+        self._file_config = file_config
+        if pending:
+            sections = sorted(set(pending['sections']) | set(sections))
+        return {'config': config, 'sections': sections, 'schema': schema,
+                'physics': physics, 'fleet_physics': fleet_physics}
+    
+    def _apply_pending_config(self):
+        """Swap the staged config in, True if there was one (between ticks, under the state lock)"""
+        with self._state_lock:
+            staged, self._pending_config = self._pending_config, None
+            if staged is None:
+                return False
+            
+            config = self.config = staged['config']
+            self.engine_model = config['engine'].get('model', 'simple')
+            # Retuned models continue from the governor and load state of the ones they replace
+            if staged['physics'] and self.physics and staged['physics'] is not self.physics:
+                staged['physics'].resume(self.physics)
+            self.physics = staged['physics']
+            if self.fleet:
+                if staged['fleet_physics'] and self.fleet.model and staged['fleet_physics'] is not self.fleet.model:
+                    staged['fleet_physics'].resume(self.fleet.model)
+                self.fleet.model = staged['fleet_physics']
+                self.fleet.engine_config = config['engine']
+            
+            if staged['schema'] and staged['schema'] is not self.register_schema:
+                self._swap_register_layout(staged['schema'])
+            
+            if self.traffic_analyzer and 'analytics' in staged['sections']:
+                analytics = config.get('analytics', {})
+                self.traffic_analyzer.thresholds = {
+                    'flood_requests': analytics.get('flood_requests', 2000),
+                    'write_burst': analytics.get('write_burst', 50),
+                    'scan_blocks': analytics.get('scan_blocks', 64),
+                    'error_requests': analytics.get('error_requests', 50),
+                }
+            if 'logging' in staged['sections']:
+                # Adjusted in place, the background writer keeps running
+                reconfigure_logging(config.get('logging'))
+        
+        logger.info(f"Configuration reloaded: {', '.join(staged['sections'])}", extra={'event': 'config'})
+        if self.metrics:
+            self._config_reloads.labels('applied').inc()
+        return True
+    
+    def _swap_register_layout(self, schema):
+        """Re-lay the registers out with a new schema, clearing addresses it no longer maps"""
+        old = self.register_schema
+        self._install_register_layout(schema)
+        self._watch_status_registers()
+        if self.fleet:
+            self.fleet.set_registers(schema.holding)
+        self._write_registers()
+        
+        data_bank = self.server.data_bank
+        for old_block, new_block, write, fill in (
+            (old.holding, schema.holding, data_bank.set_holding_registers, 0),
+            (old.input, schema.input, data_bank.set_input_registers, 0),
+            (old.coils, schema.coils, data_bank.set_coils, False),
+        ):
+            if not old_block:
+                continue
+            start, end = old_block.base, old_block.base + old_block.span
+            new_start, new_end = (new_block.base, new_block.base + new_block.span) if new_block else (end, end)
+            for first, last in ((start, min(end, new_start)), (max(start, new_end), end)):
+                if first < last:
+                    write(first, [fill] * (last - first))
+        
+        self._report_register_layout("MODBUS registers re-mapped")
+    
     def start_simulation(self):
         """Start the engine simulation loop"""
         if self.simulation_running:
@@ -240,6 +1148,7 @@ class StandaloneEngineSimulator:
             return
         
         self.simulation_running = True
+        self._wake.clear()
         self.simulation_thread = threading.Thread(target=self._simulation_loop, daemon=True)
         self.simulation_thread.start()
         print("✓ Engine simulation started")
@@ -247,136 +1156,508 @@ class StandaloneEngineSimulator:
     def stop_simulation(self):
         """Stop the engine simulation loop"""
         self.simulation_running = False
+        self._wake.set()
         if self.simulation_thread:
             self.simulation_thread.join(timeout=2)
+        # Writes that arrived while the loop was finishing
+        self._apply_modbus_writes()
         print("Engine simulation stopped")
     
+    def _time_scale(self, config=None):
+        """Simulated seconds per wall-clock second, 0 means as fast as possible"""
+        time_scale = ((config or self.config).get('simulation') or {}).get('time_scale', 1.0)
+        if time_scale in ('max', 'fast', None):
+            return 0.0
+        return max(0.0, float(time_scale))
+    
     def _simulation_loop(self):
-        """Main simulation loop - runs in separate thread"""
-        print("Starting simulation loop...")
-        loop_count = 0
+        """Main simulation loop - runs in separate thread
+        
+        Ticks are scheduled against absolute monotonic deadlines, so the period
+        doesn't drift by the time spent doing the tick work. Simulated time
+        advances by update_interval every tick regardless of wall-clock time.
+        """
+        logger.info("Starting simulation loop...", extra={'event': 'simulation'})
+        interval, period = self._tick_period()
+        
+        next_deadline = time.monotonic()
+        last_status_print = next_deadline
+        observe_tick = self._tick_duration.observe if self.metrics else None
         
         while self.simulation_running:
             try:
-                # Check for external MODBUS commands
-                self._check_external_commands()
+                # A reloaded config takes effect between ticks, from a fresh deadline
+                if self._pending_config is not None and self._apply_pending_config():
+                    interval, period = self._tick_period()
+                    next_deadline = time.monotonic()
                 
-                # Calculate engine parameters
-                self._calculate_engine_parameters()
+                tick_start = time.monotonic()
+                self._simulation_tick()
+                self.sim_time += interval
+                self.tick_count += 1
                 
-                # Update MODBUS registers
-                self._update_modbus_registers()
-                
-                # Force MODBUS packet generation by simulating client reads
-                self._generate_modbus_traffic()
+                now = time.monotonic()
+                self.last_tick_duration = now - tick_start
+                if observe_tick:
+                    observe_tick(self.last_tick_duration)
                 
                 # Periodic status output
-                loop_count += 1
-                if loop_count % 10 == 0:  # Every 10 seconds
+                if now - last_status_print >= 10:  # Every 10 seconds
+                    last_status_print = now
                     self._print_status()
                 
-                # Sleep for update interval
-                time.sleep(self.config['engine']['update_interval'])
+                if not period:
+                    continue
+                
+                # Wait for the next absolute deadline
+                next_deadline += period
+                delay = next_deadline - now
+                if delay > 0:
+                    self._wait_until(next_deadline)
+                else:
+                    self.tick_overruns += 1
+                    self.max_tick_lateness = max(self.max_tick_lateness, -delay)
+                    if -delay > period:
+                        # More than a whole period behind: re-anchor instead of bursting to catch up
+                        missed = int(-delay // period)
+                        logger.warning("Simulation tick overrun", extra={
+                            'event': 'tick_overrun',
+                            'fields': {'late_ms': round(-delay * 1000, 1), 'skipped': missed}
+                        })
+                        next_deadline = now
                 
             except Exception as e:
-                print(f"Error in simulation loop: {e}")
-                time.sleep(1)
+                logger.error(f"Error in simulation loop: {e}", extra={'event': 'simulation'})
+                self._wait_until(time.monotonic() + 1)
+                next_deadline = time.monotonic()
+        
+        logger.info("Simulation loop ended", extra={'event': 'simulation'})
+    
+    def _wait_until(self, deadline):
+        """Sleep until a monotonic deadline, applying queued MODBUS writes as they arrive"""
+        wake = self._wake
+        while self.simulation_running:
+            delay = deadline - time.monotonic()
+            if delay <= 0:
+                return
+            if wake.wait(delay):
+                wake.clear()
+                self._apply_modbus_writes()
+    
+    def _tick_period(self):
+        """Simulated seconds per tick and the wall-clock period between ticks (0 = unpaced)"""
+        time_scale = self._time_scale()
+        interval = self.config['engine']['update_interval']
+        if time_scale != 1.0:
+            logger.info(f"Simulation time scale: {'max' if not time_scale else f'{time_scale:g}x'}",
+                        extra={'event': 'simulation'})
+        return interval, interval / time_scale if time_scale else 0.0
+    
+    def _simulation_tick(self):
+        """Advance the simulation by one update_interval and publish the result"""
+        # HTTP commands and reloads wait while this tick computes and commits the engine state
+        with self._state_lock:
+            # MODBUS commands queued while the previous tick was computing
+            self._apply_modbus_writes()
+            
+            if self.replay:
+                # Recorded registers drive the data bank instead of the engine model
+                if not self._replay_tick():
+                    return
+                if self.mqtt_publisher or self.websocket_server:
+                    self._simulate_sensors()
+                    # Sensors the recording holds replace the simulated ones
+                    for row, value in self._replayed_sensors:
+                        self._sensors[row] = value
+            else:
+                # Calculate engine parameters
+                model_start = time.perf_counter()
+                self._calculate_engine_parameters()
+                if self.metrics:
+                    self._observe_engine_model(time.perf_counter() - model_start)
+                if self._schema_sensors or self.mqtt_publisher or self.websocket_server:
+                    self._simulate_sensors()
+                
+                # Commit the whole engine state to the MODBUS registers in one write
+                self._update_modbus_registers()
+                
+                # Advance every fleet engine in one batched step
+                if self.fleet:
+                    self._update_fleet()
+            
+            if self.recorder:
+                self._record_tick()
+        
+        # Capture this tick as one snapshot and serialize the HTTP API response once for every poller
+        snapshot = self._publish_snapshot()
+        
+        # Record the tick in the history ring buffer
+        self.history.append(
+            snapshot.sim_time, snapshot.status, snapshot.rpm, snapshot.temp, snapshot.fuel_flow, snapshot.load
+        )
+        
+        # Report the committed register block
+        self._generate_modbus_traffic()
+        
+        # Push this tick to WebSocket subscribers
+        if self.websocket_server:
+            self._publish_frame(snapshot)
         
-        print("Simulation loop ended")
+        # Auxiliary sensors, handed off without waiting on the broker
+        if self.mqtt_publisher or self.websocket_server:
+            self._publish_sensors()
+    
+    def _replay_tick(self):
+        """Commit the next recorded tick to the data bank, False once the recording is exhausted"""
+        replay = self.replay
+        if self._replay_index >= len(replay):
+            if not self.config.get('recording', {}).get('loop', False) or not len(replay):
+                logger.info(f"Replay finished after {self._replay_index} ticks", extra={'event': 'simulation'})
+                self.simulation_running = False
+                return False
+            self._replay_index = 0
+        
+        index = self._replay_index
+        self._replay_index += 1
+        self.sim_time = float(replay.times[index])
+        
+        data_bank = self.server.data_bank
+        schema = self.register_schema
+        replayed = {}
+        for space, address, words in replay.segment_words(index):
+            if space == 'input':
+                data_bank.set_input_registers(address, words.tolist())
+                if schema.input and address == schema.input.base and len(words) == schema.input.span:
+                    replayed.update(self._decode_signals(schema.input, words))
+            elif space == 'coil':
+                data_bank.set_coils(address, (words != 0).tolist())
+            else:
+                if self.fleet and address == self.fleet.base_register and len(words) == self.fleet.register_count:
+                    self._restore_fleet(words)
+                    if self._unit_handlers:
+                        self._update_unit_banks(words)
+                data_bank.set_holding_registers(address, words.tolist())
+                if address == schema.holding.base and len(words) == schema.holding.span:
+                    self._register_words[:] = words.tolist()
+                    replayed.update(self._decode_signals(schema.holding, words))
+        
+        # Decoded main engine values, so HTTP/WebSocket/history follow the replay
+        for source, attr in ENGINE_SIGNALS.items():
+            if source in replayed:
+                setattr(self, attr, replayed[source])
+        self._running = self.status != 0
+        self._replayed_sensors = [(row, replayed[name]) for row, name in enumerate(SENSOR_UNITS) if name in replayed]
+        return True
+    
+    def _decode_signals(self, block, words):
+        """{signal: value} of a register block's fields, integers for the fields that hold them exactly"""
+        return {
+            field.source: int(value) if field.type != 'float32' and field.scale == 1 else float(value)
+            for field, value in zip(block.fields, block.decode(words))
+        }
+    
+    def _restore_fleet(self, words):
+        """Decode a replayed fleet register block back into the fleet's state arrays"""
+        fleet = self.fleet
+        holding = fleet.registers
+        blocks = words.reshape(fleet.size, fleet.register_stride)[:, holding.base:holding.base + holding.span]
+        for field, values in zip(holding.fields, holding.decode(blocks)):
+            if field.source in ENGINE_SIGNALS:
+                getattr(fleet, field.source)[:] = values
+        fleet.running[:] = fleet.status != 0
+    
+    def _record_tick(self):
+        """Append this tick's words of every recorded segment, in _setup_recording's order"""
+        schema = self.register_schema
+        segments = [self._register_words]
+        if schema.input:
+            segments.append(self._input_words)
+        if schema.coils:
+            segments.append(self._coil_bits)
+        if self.fleet:
+            segments.append(self._fleet_words)
+        self.recorder.append(self.sim_time, *segments)
     
     def _generate_modbus_traffic(self):
-        """Update MODBUS registers with current engine values"""
+        """Report the register block committed for this tick"""
         try:
-            # Update all registers with current engine values
-            registers = self.config['registers']
-            
-            for reg_name, reg_addr in registers.items():
-                try:
-                    if reg_name == 'status':
-                        value = self.status
-                    elif reg_name == 'rpm':
-                        value = int(self.current_rpm)
-                    elif reg_name == 'temp':
-                        value = int(self.current_temp)
-                    elif reg_name == 'fuel_flow':
-                        value = int(self.current_fuel_flow * 100)  # Store as integer (x100)
-                    elif reg_name == 'load':
-                        value = int(self.current_load)
-                    else:
-                        value = 0
-                    
-                    # Update the register
-                    self.server.data_bank.set_holding_registers(reg_addr, [value])
-                    print(f"📡 MODBUS TX: {reg_name.upper()} = {value} (Register {reg_addr})")
-                    
-                except Exception as e:
-                    print(f"Error updating {reg_name}: {e}")
+            if not logger.isEnabledFor(logging.INFO):
+                return
+            words = self._register_words
+            fields = {name: words[offset] for name, offset in self._traffic_fields}
+            fields['registers'] = f"{self._register_base}-{self._register_base + len(words) - 1}"
+            logger.info("MODBUS TX", extra={'event': 'modbus_tx', 'fields': fields})
                     
         except Exception as e:
-            print(f"Error generating MODBUS traffic: {e}")
+            logger.error(f"Error generating MODBUS traffic: {e}", extra={'event': 'modbus_tx'})
+    
+    def _publish_snapshot(self):
+        """Capture the engine state as the next immutable snapshot and wake long-pollers"""
+        # The tick and start/stop commands both publish; one at a time, so versions are
+        # handed out and published in the same order and a newer snapshot is never replaced
+        with self._snapshot_lock:
+            with self._state_lock:
+                # Every value from the same tick, MODBUS writes can't interleave
+                state = (self.sim_time, self._running, self.status, self.current_rpm, self.current_temp,
+                         self.current_fuel_flow, self.current_load)
+                fleet = None
+                if self.fleet:
+                    # Copied, the physics model updates the fleet arrays in place
+                    fleet = {name: getattr(self.fleet, name).astype(ENGINE_DTYPES[name]) for name in ENGINE_FIELDS}
+            
+            # Serialized outside the state lock, MODBUS writes aren't held up by it
+            snapshot = EngineSnapshot(self.snapshot.version + 1, *state, fleet=fleet)
+            # Single attribute assignment, handler threads never see a body/ETag mismatch
+            self.snapshot = snapshot
+            self.snapshots.publish(snapshot)
+        return snapshot
+    
+    def engine_representation(self, snapshot, fmt, fields):
+        """(body, ETag) of a snapshot's engine values in another format or with selected fields"""
+        cache = snapshot.variants
+        key = ('engine', fmt, fields)
+        body = cache.get(key)
+        if body is None:
+            engine = snapshot.engine()
+            if fmt == BINARY:
+                body = encode_table(
+                    {name: np.array([engine[name]], dtype=ENGINE_DTYPES[name]) for name in fields}, snapshot.sim_time
+                )
+            else:
+                document = {'engine': {name: engine[name] for name in fields}, 'version': snapshot.version}
+                if fmt == JSON:
+                    document['timestamp'] = snapshot.timestamp()
+                    body = json.dumps(document).encode()
+                else:
+                    document['timestamp'] = snapshot.sim_time
+                    body = encode_msgpack(document)
+            if len(cache) < REPRESENTATION_CACHE_SIZE:
+                cache[key] = body
+        return body, f'"{snapshot.version}-{fmt}"'
+    
+    def fleet_representation(self, snapshot, fmt, fields, offset=0, limit=None):
+        """(body, ETag) of a snapshot's fleet engines offset..offset+limit as columns, one row per engine"""
+        fleet = snapshot.fleet
+        cache = snapshot.variants
+        key = ('fleet', fmt, fields, offset, limit)
+        body = cache.get(key)
+        if body is None:
+            size = len(fleet['status']) if fleet else 0
+            rows = slice(min(offset, size), size if limit is None else min(size, offset + max(0, limit)))
+            columns = {'engine': np.arange(size, dtype='<u4')[rows]}
+            columns.update((name, fleet[name][rows]) for name in fields)
+            if fmt == BINARY:
+                body = encode_table(columns, snapshot.sim_time)
+            else:
+                # Same rounding as the single engine document
+                values = {name: (np.round(column.astype(np.float64), 3) if name == 'fuel_flow'
+                                 else column.astype(np.int64)).tolist() for name, column in columns.items()}
+                document = {'engines': size, 'offset': rows.start, 'count': len(columns['engine']),
+                            'columns': values, 'version': snapshot.version}
+                if fmt == JSON:
+                    document['timestamp'] = snapshot.timestamp()
+                    body = json.dumps(document).encode()
+                else:
+                    document['timestamp'] = snapshot.sim_time
+                    body = encode_msgpack(document)
+            if len(cache) < REPRESENTATION_CACHE_SIZE:
+                cache[key] = body
+        return body, f'"{snapshot.version}-{fmt}"'
+    
+    def _publish_frame(self, snapshot):
+        """Push a snapshot's engine and PLC state to WebSocket dashboards"""
+        try:
+            engine_config = self.config['engine']
+            alarms = []
+            if snapshot.status == 3:
+                alarms.append('HIGH_TEMPERATURE_ALARM')
+            elif snapshot.status == 2:
+                alarms.append('HIGH_TEMPERATURE_WARNING')
+            
+            self.websocket_server.publish(
+                engine={
+                    'status': snapshot.status,
+                    'rpm': int(snapshot.rpm),
+                    'temperature': int(snapshot.temp),
+                    'fuel_flow': round(snapshot.fuel_flow, 2),
+                    'load': int(snapshot.load)
+                },
+                plc={
+                    'mode': 'AUTO' if snapshot.running else 'MANUAL',
+                    'alarms': alarms,
+                    'setpoints': {
+                        'rpm': engine_config['rpm_normal'],
+                        'temperature': engine_config['temp_normal']
+                    }
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error publishing WebSocket frame: {e}", extra={'event': 'websocket'})
+    
+    def _simulate_sensors(self):
+        """Simulate this tick's auxiliary sensors for the main engine"""
+        self._sensors = simulate_sensors(
+            self._running, self.current_rpm, self.current_load, self.current_temp, self._sensor_rng
+        )
     
-    def _check_external_commands(self):
-        """Check for external MODBUS commands (e.g., from vulnerability demo)"""
+    def _publish_sensors(self):
+        """Publish this tick's auxiliary sensors over MQTT and WebSocket"""
         try:
-            registers = self.config['registers']
-            current_status = self.server.data_bank.get_holding_registers(registers['status'], 1)
+            engine = self._sensors
+            if engine is None:
+                # Publisher came up mid-tick, the next tick simulates the sensors
+                return
             
-            if current_status:
-                status_value = current_status[0]
-                
-                # Only check for unauthorized commands if the status was changed externally via MODBUS
-                # Don't trigger security alerts for internal HTTP API changes
-                if hasattr(self, '_last_modbus_status'):
-                    if self._last_modbus_status != status_value:
-                        # Status was changed via MODBUS (external command)
-                        if status_value == 0 and self._running:
-                            print("\n" + "!"*80)
-                            print("!!! UNAUTHORIZED MODBUS COMMAND DETECTED !!!")
-                            print("!!! EXTERNAL CLIENT SENT STOP COMMAND !!!")
-                            print("!!! THIS DEMONSTRATES A SECURITY VULNERABILITY !!!")
-                            print("!"*80)
-                            
-                            # Log security event
-                            security_event = {
-                                'timestamp': datetime.now().isoformat(),
-                                'event': 'UNAUTHORIZED_STOP_COMMAND',
-                                'description': 'External MODBUS client sent engine stop command',
-                                'risk_level': 'CRITICAL'
-                            }
-                            self.security_events.append(security_event)
-                            self.unauthorized_attempts += 1
-                            
-                            # Emergency stop the engine
-                            self._emergency_stop()
-                            
-                        elif status_value == 1 and not self._running:
-                            print("\n" + "!"*60)
-                            print("!!! UNAUTHORIZED START COMMAND DETECTED !!!")
-                            print("!!! EXTERNAL CLIENT SENT START COMMAND !!!")
-                            print("!"*60)
-                            
-                            # Log security event
-                            security_event = {
-                                'timestamp': datetime.now().isoformat(),
-                                'event': 'UNAUTHORIZED_START_COMMAND',
-                                'description': 'External MODBUS client sent engine start command',
-                                'risk_level': 'HIGH'
-                            }
-                            self.security_events.append(security_event)
-                            
-                            # Start the engine (demonstrate vulnerability)
-                            self._running = True
-                            print("Engine started by external command (vulnerability demonstrated)")
+            if self.mqtt_publisher:
+                fleet = None
+                fleet_sensors = self.fleet and self.config.get('mqtt', {}).get('publish_fleet', True)
+                if fleet_sensors:
+                    # Already simulated for the fleet register blocks when the schema maps sensors
+                    fleet = self._fleet_sensors if self._fleet_sensors is not None else simulate_sensors(
+                        self.fleet.running, self.fleet.rpm, self.fleet.load, self.fleet.temp, self._sensor_rng
+                    )
+                self.mqtt_publisher.publish(datetime.fromtimestamp(self.sim_time).isoformat(), engine, fleet)
+            
+            if self.websocket_server:
+                self.websocket_server.publish_sensors(sensor_readings(engine))
                 
-                # Update the last known MODBUS status
-                self._last_modbus_status = status_value
-                    
         except Exception as e:
-            print(f"Error checking external commands: {e}")
+            logger.error(f"Error publishing sensors: {e}", extra={'event': 'mqtt'})
+    
+    def _on_modbus_request(self, address, srv_info, ret):
+        """Account one MODBUS data request in metrics and traffic analytics (server thread)"""
+        func_code = srv_info.recv_frame.pdu.func_code
+        client = srv_info.client.address
+        if self.metrics:
+            label = self._client_labels.get(client) or self._client_label(client)
+            self._modbus_requests.labels(func_code, label, MODBUS_RESULTS.get(ret.exp_code, 'error')).inc()
+        if self.traffic_analyzer:
+            self.traffic_analyzer.observe(client, func_code, address, ret.ok)
+    
+    def _client_label(self, client):
+        """Metrics label of a client without one yet, 'other' once the label limit is reached"""
+        if len(self._client_labels) >= self._client_label_limit:
+            return 'other'
+        with self._client_label_lock:
+            if len(self._client_labels) >= self._client_label_limit:
+                return 'other'
+            return self._client_labels.setdefault(client, client)
+    
+    def _on_traffic_alert(self, event, description, risk_level, client, func_code, register):
+        """Record a flood/scan/write burst flagged by the traffic analyzer"""
+        logger.warning(f"{event}: {description}", extra={
+            'event': 'security',
+            'fields': {'client': client, 'function_code': func_code, 'register': register}
+        })
+        self.security_events.record(event, description, risk_level, client, func_code, register)
+    
+    def _on_modbus_write(self, address, from_value, to_value, srv_info):
+        """Queue a MODBUS client write to a watched status register (runs on the server thread)
+
+        The server thread never waits for the state lock, which a tick holds
+        while it computes: the simulation thread applies the write between
+        ticks, right away when it is idle, or at the start of the next tick.
+        """
+        self._modbus_writes.append((
+            address, to_value, srv_info.client.address, srv_info.recv_frame.pdu.func_code,
+            self._unit_engines.get(srv_info.recv_frame.mbap.unit_id)
+        ))
+        if self.simulation_running:
+            self._wake.set()
+        else:
+            # No loop to hand it to
+            self._apply_modbus_writes()
+    
+    def _apply_modbus_writes(self):
+        """Apply the queued status register writes in arrival order"""
+        writes = self._modbus_writes
+        if not writes:
+            return
+        with self._state_lock:
+            while writes:
+                address, to_value, client, func_code, unit_engine = writes.popleft()
+                try:
+                    if unit_engine is not None:
+                        # Status register of a fleet engine's own unit
+                        self._handle_fleet_status_write(unit_engine, to_value, client, func_code, register=address)
+                    elif address == self.status_register:
+                        self._handle_status_write(to_value, client, func_code)
+                    elif self.fleet:
+                        index = (address - self.fleet.base_register) // self.fleet.register_stride
+                        self._handle_fleet_status_write(index, to_value, client, func_code)
+                except Exception as e:
+                    logger.error(f"Error handling MODBUS write to register {address}: {e}",
+                                 extra={'event': 'modbus_write'})
+    
+    def _handle_status_write(self, status_value, client, func_code):
+        """Apply an external start/stop command (e.g., from vulnerability demo)"""
+        register = self.status_register
+        
+        if status_value == 0 and self._running:
+            logger.critical("UNAUTHORIZED MODBUS STOP COMMAND DETECTED - this demonstrates a security vulnerability",
+                            extra={'event': 'security',
+                                   'fields': {'client': client, 'function_code': func_code, 'register': register}})
+            
+            # Log security event
+            self.security_events.record(
+                'UNAUTHORIZED_STOP_COMMAND',
+                'External MODBUS client sent engine stop command',
+                'CRITICAL', client, func_code, register
+            )
+            self.unauthorized_attempts += 1
+            
+            # Emergency stop the engine and publish the safe state right away
+            self._emergency_stop()
+            self._update_modbus_registers()
+            
+        elif status_value == 1 and not self._running:
+            logger.warning("UNAUTHORIZED MODBUS START COMMAND DETECTED",
+                           extra={'event': 'security',
+                                  'fields': {'client': client, 'function_code': func_code, 'register': register}})
+            
+            # Log security event
+            self.security_events.record(
+                'UNAUTHORIZED_START_COMMAND',
+                'External MODBUS client sent engine start command',
+                'HIGH', client, func_code, register
+            )
+            
+            # Start the engine (demonstrate vulnerability)
+            self._running = True
+            logger.info("Engine started by external command (vulnerability demonstrated)", extra={'event': 'engine'})
+    
+    def _handle_fleet_status_write(self, index, status_value, client, func_code, register=None):
+        """Apply an external start/stop command to one fleet engine"""
+        fleet = self.fleet
+        if register is None:
+            register = fleet.engine_base(index) + self.status_register
+        
+        if status_value == 0 and fleet.running[index]:
+            logger.critical(f"UNAUTHORIZED MODBUS STOP COMMAND: fleet engine {index}",
+                            extra={'event': 'security',
+                                   'fields': {'client': client, 'function_code': func_code, 'register': register}})
+            self.security_events.record(
+                'UNAUTHORIZED_STOP_COMMAND',
+                f'External MODBUS client sent stop command to fleet engine {index}',
+                'CRITICAL', client, func_code, register
+            )
+            self.unauthorized_attempts += 1
+            fleet.emergency_stop(index)
+            
+        elif status_value == 1 and not fleet.running[index]:
+            logger.warning(f"UNAUTHORIZED MODBUS START COMMAND: fleet engine {index}",
+                           extra={'event': 'security',
+                                  'fields': {'client': client, 'function_code': func_code, 'register': register}})
+            self.security_events.record(
+                'UNAUTHORIZED_START_COMMAND',
+                f'External MODBUS client sent start command to fleet engine {index}',
+                'HIGH', client, func_code, register
+            )
+            fleet.start(index)
     
     def _emergency_stop(self):
         """Perform emergency engine shutdown"""
-        print("[EMERGENCY STOP] Initiating emergency shutdown...")
+        logger.warning("EMERGENCY STOP: initiating emergency shutdown", extra={'event': 'engine'})
         self._running = False
         self.status = 0
         
@@ -386,11 +1667,15 @@ class StandaloneEngineSimulator:
         self.current_fuel_flow = 0
         self.current_load = 0
         
-        print("[EMERGENCY STOP] Engine parameters reset to safe values")
-        print("[ALARM] Multiple safety alarms would be triggered in real system")
+        logger.warning("EMERGENCY STOP: engine parameters reset to safe values "
+                       "(multiple safety alarms would be triggered in a real system)", extra={'event': 'engine'})
     
     def _calculate_engine_parameters(self):
         """Calculate realistic engine parameters based on current state"""
+        if self.physics:
+            self._step_physics()
+            return
+        
         if not self._running:
             # Engine is stopping/stopped - gradually decrease parameters
             if self.current_rpm > 0:
@@ -462,33 +1747,82 @@ class StandaloneEngineSimulator:
             else:
                 self.status = 1  # Running normally
     
+    def _step_physics(self):
+        """Integrate the physics model over one update_interval"""
+        state = self._physics_state
+        running, rpm, temp, fuel_flow, load, status = state
+        # Start/stop commands and emergency resets change the attributes between ticks
+        running[0] = self._running
+        rpm[0] = self.current_rpm
+        temp[0] = self.current_temp
+        status[0] = self.status
+
+        self.physics.step(self.config['engine']['update_interval'], *state)
+
+        self.current_rpm = float(rpm[0])
+        self.current_temp = float(temp[0])
+        self.current_fuel_flow = float(fuel_flow[0])
+        self.current_load = int(load[0])
+        self.status = int(status[0])
+
     def _update_modbus_registers(self):
         """Update MODBUS TCP registers with current engine parameters"""
-        registers = self.config['registers']
+        try:
+            self._write_registers()
+            
+        except Exception as e:
+            logger.error(f"Error updating MODBUS registers: {e}", extra={'event': 'modbus'})
+    
+    def _update_fleet(self):
+        """Advance the fleet and write its register blocks"""
+        fleet = self.fleet
         
         try:
-            # Update all registers with current values
-            self.server.data_bank.set_holding_registers(registers['status'], [self.status])
-            self.server.data_bank.set_holding_registers(registers['rpm'], [int(self.current_rpm)])
-            self.server.data_bank.set_holding_registers(registers['temp'], [int(self.current_temp)])
-            self.server.data_bank.set_holding_registers(registers['fuel_flow'], [int(self.current_fuel_flow * 100)])  # Store as integer (x100)
-            self.server.data_bank.set_holding_registers(registers['load'], [int(self.current_load)])
+            model_start = time.perf_counter()
+            fleet.step()
+            if self.metrics:
+                self._observe_fleet_model(time.perf_counter() - model_start)
+            
+            if self._schema_sensors:
+                self._fleet_sensors = simulate_sensors(
+                    fleet.running, fleet.rpm, fleet.load, fleet.temp, self._sensor_rng
+                )
+            
+            # One write covers every engine's register block
+            self._fleet_words = fleet.register_block(self._fleet_sensors)
+            self.server.data_bank.set_holding_registers(fleet.base_register, self._fleet_words)
+            if self._unit_handlers:
+                self._update_unit_banks(self._fleet_words)
             
         except Exception as e:
-            print(f"Error updating MODBUS registers: {e}")
+            logger.error(f"Error updating fleet: {e}", extra={'event': 'fleet'})
     
     def _print_status(self):
-        """Print current engine status"""
+        """Log current engine status as one structured record"""
         status_names = {0: "STOPPED", 1: "RUNNING", 2: "WARNING", 3: "ALARM"}
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ENGINE STATUS:")
-        print(f"  Status: {status_names.get(self.status, 'UNKNOWN')} ({self.status})")
-        print(f"  RPM: {self.current_rpm:.1f}")
-        print(f"  Temperature: {self.current_temp:.1f}°C")
-        print(f"  Fuel Flow: {self.current_fuel_flow:.2f} t/h")
-        print(f"  Load: {self.current_load}%")
+        fields = {
+            'sim_time': datetime.fromtimestamp(self.sim_time).strftime('%H:%M:%S'),
+            'status': status_names.get(self.status, 'UNKNOWN'),
+            'rpm': f"{self.current_rpm:.1f}",
+            'temp': f"{self.current_temp:.1f}",
+            'fuel_flow': f"{self.current_fuel_flow:.2f}",
+            'load': self.current_load,
+        }
         if self.unauthorized_attempts > 0:
-            print(f"  Security Events: {len(self.security_events)}")
-            print(f"  Unauthorized Attempts: {self.unauthorized_attempts}")
+            fields['security_events'] = len(self.security_events)
+            fields['unauthorized_attempts'] = self.unauthorized_attempts
+        if self.tick_overruns > 0:
+            fields['tick_overruns'] = self.tick_overruns
+            fields['worst_lateness_ms'] = f"{self.max_tick_lateness * 1000:.1f}"
+        if self.fleet:
+            summary = self.fleet.summary()
+            fields['fleet_running'] = f"{summary['running']}/{summary['engines']}"
+            fields['fleet_warnings'] = summary['warnings']
+            fields['fleet_alarms'] = summary['alarms']
+            fields['fleet_mean_rpm'] = f"{summary['mean_rpm']:.1f}"
+            fields['fleet_mean_temp'] = f"{summary['mean_temp']:.1f}"
+            fields['fleet_fuel_flow'] = f"{summary['total_fuel_flow']:.2f}"
+        logger.info("ENGINE STATUS", extra={'event': 'engine_status', 'fields': fields})
     
     def run_forever(self):
         """Run the server and simulation indefinitely"""
@@ -517,15 +1851,35 @@ class StandaloneEngineSimulator:
             # Start simulation
             self.start_simulation()
             
+            # Both listeners accept connections now, /readyz reports ready from here on
+            self.mark_ready()
+            
+            # Optional push channels start after readiness, ticks pick them up once they're running
+            # Start WebSocket push server (dashboards fall back to HTTP polling without it)
+            if not self.start_websocket_server():
+                print("WebSocket server unavailable, continuing with HTTP API only")
+            
+            # Start MQTT sensor publisher (the broker may come up later, it reconnects on its own)
+            if not self.start_mqtt_publisher():
+                print("MQTT publisher unavailable, continuing without MQTT sensors")
+            
+            # Apply config file edits without restarting the listeners
+            self.start_config_watcher()
+            
             print("\n" + "="*60)
             print("STANDALONE ENGINE SIMULATOR RUNNING")
             print("="*60)
             print("The engine is now controllable via MODBUS TCP:")
             print(f"  MODBUS Host: {self.config['modbus']['host']}")
             print(f"  MODBUS Port: {self.config['modbus']['port']}")
-            print(f"  Status Register: {self.config['registers']['status']}")
+            print(f"  Status Register: {self.status_register}")
             print("\nFrontend can access engine data via HTTP:")
             print(f"  HTTP API: http://{self.config['modbus']['host']}:8080/api/engine")
+            if self.websocket_server:
+                print(f"  WebSocket: ws://{self.config['modbus']['host']}:{self.websocket_server.port}/ws")
+            if self.mqtt_publisher:
+                print(f"  MQTT: {self.mqtt_publisher.host}:{self.mqtt_publisher.port} "
+                      f"topic {self.mqtt_publisher.topic_prefix}/sensors")
             print("\nTo start engine: Write 1 to status register")
             print("To stop engine: Write 0 to status register")
             print("\nPress Ctrl+C to stop the server")
@@ -547,10 +1901,23 @@ class StandaloneEngineSimulator:
     def shutdown(self):
         """Graceful shutdown"""
         print("Shutting down engine simulator...")
+        self.stop_config_watcher()
         self.stop_simulation()
+        self.stop_mqtt_publisher()
+        self.stop_websocket_server()
+        # Answer pending long-polls before the HTTP server waits for its handlers
+        self.snapshots.close()
         self.stop_http_server()
         self.stop_server()
+        self.security_events.close()
+        if self.shared_bank:
+            self.shared_bank.close()
+            self.shared_bank = None
+        if self.recorder:
+            self.recorder.close()
+            print(f"Recorded {self.recorder.rows} ticks to {self.recorder.path}")
         print("Shutdown complete")
+        stop_logging()
 
 
 def main():
@@ -559,6 +1926,17 @@ def main():
     parser.add_argument('--host', default='0.0.0.0', help='MODBUS server host (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=502, help='MODBUS server port (default: 502)')
     parser.add_argument('--config', help='Path to configuration file (default: config_linux.yaml)')
+    parser.add_argument('--fleet', type=int, metavar='N',
+                        help='Simulate a fleet of N engines in addition to the main engine')
+    parser.add_argument('--time-scale', type=float, metavar='X',
+                        help='Run simulated time X times faster than real time (0 = as fast as possible)')
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument('--record', metavar='FILE', help='Record every tick\'s registers to FILE')
+    recording.add_argument('--replay', metavar='FILE',
+                           help='Drive the registers from a recording instead of the engine model '
+                                '(speed set by --time-scale)')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='Serve MODBUS from N additional worker processes sharing the port (Linux)')
     
     args = parser.parse_args()
     
@@ -566,8 +1944,14 @@ def main():
     simulator = StandaloneEngineSimulator(
         config_file=args.config,
         host=args.host,
-        port=args.port
+        port=args.port,
+        fleet_size=args.fleet,
+        record_file=args.record,
+        replay_file=args.replay,
+        workers=args.workers
     )
+    if args.time_scale is not None:
+        simulator.config.setdefault('simulation', {})['time_scale'] = args.time_scale
     
     # Run forever
     simulator.run_forever()
@@ -3,11 +3,19 @@
 Simple test script to verify backend is working
 """
 
+import argparse
+import os
+
 import requests
 import json
 
-def test_backend():
-    backend_url = "http://192.168.20.192:8080/api/status"
+from modbus_client import ModbusClientPool, ModbusRequestError, ModbusUnavailable
+
+MODBUS_REGISTERS = {'status': 0, 'rpm': 1, 'temp': 2, 'fuel_flow': 3, 'load': 4}
+
+# Checks against a running backend, named check_* so pytest doesn't collect them as unit tests
+def check_backend(host, port=8080):
+    backend_url = f"http://{host}:{port}/api/status"
     
     print("Testing backend connection...")
     print(f"URL: {backend_url}")
@@ -32,5 +40,30 @@ def test_backend():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def check_modbus(host, port=502):
+    print(f"Testing MODBUS registers on {host}:{port}...")
+    
+    # Every engine register in one block read
+    pool = ModbusClientPool(host, port, size=1, timeout=5)
+    try:
+        values = pool.read_registers(MODBUS_REGISTERS.values())
+        print("✅ MODBUS server is working!")
+        for name, address in MODBUS_REGISTERS.items():
+            print(f"  {name} (register {address}) = {values[address]}")
+    except ModbusUnavailable as e:
+        print(f"❌ Connection failed - MODBUS server is not running or not accessible: {e}")
+    except ModbusRequestError as e:
+        print(f"❌ MODBUS server returned an exception: {e}")
+    finally:
+        pool.close()
+
 if __name__ == "__main__":
-    test_backend()
+    parser = argparse.ArgumentParser(description='Check a running engine simulator backend')
+    parser.add_argument('--host', default=os.environ.get('BACKEND_HOST', '192.168.20.192'),
+                        help='Backend host (default: $BACKEND_HOST or 192.168.20.192)')
+    parser.add_argument('--http-port', type=int, default=8080, help='HTTP API port')
+    parser.add_argument('--modbus-port', type=int, default=502, help='MODBUS server port')
+    args = parser.parse_args()
+    
+    check_backend(args.host, args.http_port)
+    check_modbus(args.host, args.modbus_port)
@@ -0,0 +1,107 @@
+import struct
+
+import numpy as np
+import pytest
+
+from register_schema import RegisterSchema
+
+SIGNALS = ('status', 'rpm', 'temp', 'fuel_flow', 'load')
+
+
+def schema(registers):
+    return RegisterSchema(registers, SIGNALS)
+
+
+@pytest.mark.parametrize('value_type, value', [
+    ('uint16', 1200), ('int16', -40), ('uint32', 70000), ('int32', -70000), ('float32', 12.5),
+])
+@pytest.mark.parametrize('byte_order', ['big', 'little'])
+@pytest.mark.parametrize('word_order', ['big', 'little'])
+def test_encode_decode_round_trip(value_type, value, byte_order, word_order):
+    block = schema({'rpm': {'address': 10, 'type': value_type, 'byte_order': byte_order,
+                            'word_order': word_order}}).holding
+    signals = np.array([0, value, 0, 0, 0], dtype=np.float64)
+
+    words = block.encode(signals)
+
+    assert block.decode(words)[0] == value
+
+
+def test_encode_byte_and_word_order():
+    registers = {
+        'rpm': {'address': 0, 'type': 'float32'},
+        'temp': {'address': 2, 'type': 'float32', 'word_order': 'little'},
+        'load': {'address': 4, 'type': 'uint32', 'byte_order': 'little', 'word_order': 'little'},
+    }
+    block = schema(registers).holding
+    high, low = struct.unpack('>HH', struct.pack('>f', 1.5))
+
+    words = block.encode(np.array([0, 1.5, 1.5, 0, 0x01020304])).tolist()
+
+    assert words[0:2] == [high, low]
+    assert words[2:4] == [low, high]
+    # Fully little endian: 04 03 02 01 on the wire
+    assert words[4:6] == [0x0403, 0x0201]
+
+
+def test_scale_and_integer_saturation():
+    block = schema({
+        'fuel_flow': {'address': 0, 'scale': 100},
+        'temp': {'address': 1, 'type': 'int16', 'scale': 10},
+    }).holding
+
+    words = block.encode(np.array([0, 0, -5000.0, 1.234, 0]))
+
+    assert words.tolist() == [123, 0x8000]
+    assert block.decode(words).tolist() == [1.23, -3276.8]
+
+
+def test_gaps_decode_and_encode_as_zero():
+    block = schema({'status': 0, 'rpm': 3}).holding
+
+    assert block.span == 4
+    assert block.gaps == 2
+    assert block.encode(np.array([1, 900, 0, 0, 0])).tolist() == [1, 0, 0, 900]
+
+
+def test_fleet_matrix_round_trip():
+    block = schema({
+        'status': 0,
+        'rpm': {'address': 1, 'type': 'float32', 'word_order': 'little'},
+        'load': {'address': 3, 'type': 'int16'},
+    }).holding
+    signals = np.array([[1, 0, 2], [900.5, 0, 1200.25], [0, 0, 0], [0, 0, 0], [55, -1, 100]])
+
+    words = block.encode(signals)
+    decoded = block.decode(words)
+
+    assert words.shape == (3, block.span)
+    assert np.array_equal(words[2], block.encode(signals[:, 2]))
+    assert np.array_equal(decoded, signals[[0, 1, 4]])
+
+
+def test_coils_follow_non_zero_signals():
+    coils = schema({'running': {'address': 2, 'space': 'coil', 'source': 'rpm'},
+                    'hot': {'address': 0, 'space': 'coil', 'source': 'temp'}}).coils
+
+    assert coils.encode([0, 900, 0, 0, 0]) == [False, False, True]
+
+
+@pytest.mark.parametrize('entry, message', [
+    ({'address': 0, 'scale': 0}, 'scale must be a non-zero number'),
+    ({'address': 0, 'scale': float('nan')}, 'scale must be a non-zero number'),
+    ({'address': 0, 'type': 'float64'}, 'type must be one of'),
+    ({'address': 0, 'byte_order': 'middle'}, "byte_order and word_order must be 'big' or 'little'"),
+    ({'address': 0xFFFF, 'type': 'uint32'}, 'outside the MODBUS address space'),
+    ({'address': 0, 'source': 'pressure'}, "unknown source 'pressure'"),
+])
+def test_invalid_fields_are_rejected(entry, message):
+    with pytest.raises(ValueError, match=message):
+        schema({'rpm': entry})
+
+
+def test_overlapping_registers_are_rejected():
+    with pytest.raises(ValueError, match='overlaps another holding register'):
+        schema({'rpm': {'address': 0, 'type': 'float32'}, 'temp': 1})
+    with pytest.raises(ValueError, match='overlaps another coil register'):
+        schema({'rpm': {'address': 4, 'space': 'coil'}, 'temp': {'address': 4, 'space': 'coil'}})
@@ -0,0 +1,94 @@
+import queue
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from sharded_server import REGISTERS, SharedRegisterBank, forwarded_srv_info
+
+
+@pytest.fixture
+def bank():
+    bank = SharedRegisterBank()
+    yield bank
+    bank.close()
+
+
+@pytest.fixture
+def worker(bank):
+    worker = SharedRegisterBank(bank.name, forward=queue.Queue())
+    yield worker
+    worker.close()
+
+
+def test_worker_reads_every_space_from_shared_memory(bank, worker):
+    assert bank.set_holding_registers(10, [1, 0x1FFFF, -1])
+    assert bank.set_input_registers(0, np.array([7, 8], dtype=np.uint16))
+    assert bank.set_coils(3, [True, False, True])
+
+    assert worker.get_holding_registers(10, 3) == [1, 0xFFFF, 0xFFFF]
+    assert worker.get_input_registers(0, 2) == [7, 8]
+    assert worker.get_coils(3, 3) == [True, False, True]
+
+
+def test_out_of_range_access_fails(bank):
+    assert bank.get_holding_registers(REGISTERS - 1, 2) is None
+    assert bank.set_holding_registers(REGISTERS - 1, [1, 2]) is None
+    assert bank.set_coils(-1, [True]) is None
+
+
+def test_read_waits_while_a_write_is_in_progress(bank, worker):
+    bank.set_holding_registers(0, [1, 1])
+    result = []
+    bank._seq[0] += 1  # Writer mid-update
+    reader = threading.Thread(target=lambda: result.append(worker.get_holding_registers(0, 2)))
+    reader.start()
+    time.sleep(0.05)
+    assert reader.is_alive()
+
+    bank._regs[0:2] = 2
+    bank._seq[0] += 1
+    reader.join(timeout=1)
+
+    assert result == [[2, 2]]
+
+
+def test_reads_never_see_a_torn_write(bank, worker):
+    stop = threading.Event()
+
+    def write():
+        value = 0
+        while not stop.is_set():
+            value = (value + 1) & 0xFFFF
+            bank.set_holding_registers(0, [value] * 64)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            words = worker.get_holding_registers(0, 64)
+            assert len(set(words)) == 1
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_worker_forwards_client_writes(bank, worker):
+    srv_info = forwarded_srv_info('10.0.0.5', 6, 1)
+
+    assert worker.set_holding_registers(4, [0x10001], srv_info)
+    assert worker.set_coils(2, [1], forwarded_srv_info('10.0.0.5', 5, 1))
+
+    assert worker.forward.get_nowait() == ('holding', 4, [1], '10.0.0.5', 6, 1)
+    assert worker.forward.get_nowait() == ('coil', 2, [True], '10.0.0.5', 5, 1)
+    # Only the simulation process writes shared memory
+    assert bank.get_holding_registers(4) == [0]
+    assert bank.get_coils(2) == [False]
+
+
+def test_worker_cannot_write_without_a_client(worker):
+    assert worker.set_holding_registers(0, [1]) is None
+    assert worker.set_input_registers(0, [1]) is None
+    assert worker.forward.empty()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+WebSocket Push Server for Live Engine Frames
+Broadcasts one frame per simulation tick to every connected dashboard,
+carrying only the fields that changed since the previous tick
+"""
+
+import asyncio
+import json
+import threading
+from datetime import datetime
+
+import websockets
+
+
+class EngineWebSocketServer:
+    def __init__(self, host="0.0.0.0", port=8000):
+        """Initialize the WebSocket server (not started yet)"""
+        self.host = host
+        self.port = port
+        self.clients = set()
+
+        # Last published values, used to compute deltas and to greet new clients
+        self._state = {'engine': {}, 'plc': {}}
+        self._sensors_frame = None
+
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_error = None
+
+    def start(self, timeout=5):
+        """Start the server on its own asyncio thread, returns True once listening"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._start_error:
+            print(f"✗ Failed to start WebSocket server: {self._start_error}")
+            return False
+        if not self._ready.is_set():
+            print("✗ WebSocket server did not start in time")
+            return False
+        print(f"✓ WebSocket Server started on ws://{self.host}:{self.port}/ws")
+        return True
+
+    def stop(self):
+        """Stop the server and close every client connection"""
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(timeout=2)
+        print("WebSocket Server stopped")
+
+    def publish(self, engine, plc=None):
+        """Queue one tick frame for broadcast (called from the simulation thread)"""
+        if not self._loop or not self._ready.is_set():
+            return
+
+        engine_delta = self._diff('engine', engine)
+        plc_delta = self._diff('plc', plc or {})
+
+        frame = {'type': 'modbus', 'engine': engine_delta, 'timestamp': datetime.now().isoformat()}
+        if plc_delta:
+            frame['plc'] = plc_delta
+
+        # Serialize once for every subscriber, then hand over to the event loop
+        message = json.dumps(frame)
+        self._loop.call_soon_threadsafe(self._broadcast, message)
+
+    def publish_sensors(self, sensors):
+        """Queue an auxiliary sensor frame, {name: {'value', 'unit'}} (called from the simulation thread)"""
+        if not self._loop or not self._ready.is_set():
+            return
+
+        # Dashboards read every sensor from each frame, so these are always sent in full
+        message = json.dumps({'type': 'mqtt', 'sensors': sensors, 'timestamp': datetime.now().isoformat()})
+        self._sensors_frame = message
+        self._loop.call_soon_threadsafe(self._broadcast, message)
+
+    def _diff(self, section, values):
+        """Return the fields that changed since the last frame and remember the new values"""
+        previous = self._state[section]
+        delta = {key: value for key, value in values.items() if previous.get(key) != value}
+        if delta:
+            self._state[section] = {**previous, **delta}
+        return delta
+
+    def _broadcast(self, message):
+        """Send a frame to all clients without waiting on slow ones"""
+        if self.clients:
+            websockets.broadcast(self.clients, message)
+
+    def _run(self):
+        """Event loop thread body"""
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            self._start_error = e
+            self._ready.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self._server = server
+            self._ready.set()
+            await server.wait_closed()
+
+    async def _handler(self, websocket):
+        """Per-client handler: send the full current state, then stream deltas"""
+        full_frame = {
+            'type': 'modbus',
+            'engine': self._state['engine'],
+            'plc': self._state['plc'],
+            'timestamp': datetime.now().isoformat()
+        }
+        # Greet and subscribe in the same loop step so no tick delta can slip in between
+        websockets.broadcast([websocket], json.dumps(full_frame))
+        if self._sensors_frame:
+            websockets.broadcast([websocket], self._sensors_frame)
+        self.clients.add(websocket)
+        try:
+            # Dashboards don't send commands over the socket, just wait for them to leave
+            async for _ in websocket:
+                pass
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(websocket)